@@ -36,8 +36,10 @@ target_metadata = Base.metadata
 
 # Add this function to tell Alembic what to include/exclude
 def include_object(object, name, type_, reflected, compare_to):
-    # Ignore SQLite FTS tables
-    if type_ == "table" and name.startswith("search_index"):
+    # Ignore SQLite FTS tables and the other search tables, managed by SearchRepository
+    if type_ == "table" and name.startswith(
+        ("search_index", "search_trigram", "search_filter", "search_vector")
+    ):
         return False
     return True
 
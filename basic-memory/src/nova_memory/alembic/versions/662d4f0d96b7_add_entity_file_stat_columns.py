@@ -0,0 +1,38 @@
+"""add entity file stat columns
+
+Revision ID: 662d4f0d96b7
+Revises: 647e7a75e2cd
+Create Date: 2025-07-14 10:12:41.503117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "662d4f0d96b7"
+down_revision: Union[str, None] = "647e7a75e2cd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store file size, mtime and inode next to the checksum.
+
+    Sync uses these to skip hashing files whose stat values haven't changed.
+    Existing rows start out null, so the first sync after upgrading hashes everything.
+    """
+    with op.batch_alter_table("entity", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("file_size", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("file_mtime_ns", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("file_inode", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("entity", schema=None) as batch_op:
+        batch_op.drop_column("file_inode")
+        batch_op.drop_column("file_mtime_ns")
+        batch_op.drop_column("file_size")
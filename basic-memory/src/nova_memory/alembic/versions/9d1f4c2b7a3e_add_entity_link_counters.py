@@ -0,0 +1,102 @@
+"""add entity link counters
+
+Revision ID: 9d1f4c2b7a3e
+Revises: 662d4f0d96b7
+Create Date: 2025-07-21 09:31:05.218734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d1f4c2b7a3e"
+down_revision: Union[str, None] = "662d4f0d96b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Count the relations to and from each entity on the entity row.
+
+    The counters are filled in from the existing relations, then kept by triggers on
+    the relation table, so hub and orphan queries read an index instead of grouping
+    every relation.
+    """
+    with op.batch_alter_table("entity", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("in_degree", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("out_degree", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("unresolved_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.execute("""
+    UPDATE entity SET
+        in_degree = (SELECT COUNT(*) FROM relation r WHERE r.to_id = entity.id),
+        out_degree = (SELECT COUNT(*) FROM relation r WHERE r.from_id = entity.id),
+        unresolved_count = (
+            SELECT COUNT(*) FROM relation r WHERE r.from_id = entity.id AND r.to_id IS NULL
+        )
+    """)
+
+    op.create_index(
+        "ix_entity_link_count", "entity", ["project_id", sa.text("(in_degree + out_degree)")]
+    )
+    op.create_index(
+        "ix_entity_orphan",
+        "entity",
+        ["project_id", "in_degree", "out_degree"],
+        sqlite_where=sa.text("in_degree = 0 AND out_degree = 0"),
+    )
+
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS relation_degree_insert AFTER INSERT ON relation
+    BEGIN
+        UPDATE entity SET out_degree = out_degree + 1,
+            unresolved_count = unresolved_count + (NEW.to_id IS NULL)
+        WHERE id = NEW.from_id;
+        UPDATE entity SET in_degree = in_degree + 1 WHERE id = NEW.to_id;
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS relation_degree_delete AFTER DELETE ON relation
+    BEGIN
+        UPDATE entity SET out_degree = out_degree - 1,
+            unresolved_count = unresolved_count - (OLD.to_id IS NULL)
+        WHERE id = OLD.from_id;
+        UPDATE entity SET in_degree = in_degree - 1 WHERE id = OLD.to_id;
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS relation_degree_update AFTER UPDATE OF from_id, to_id ON relation
+    BEGIN
+        UPDATE entity SET out_degree = out_degree - 1,
+            unresolved_count = unresolved_count - (OLD.to_id IS NULL)
+        WHERE id = OLD.from_id;
+        UPDATE entity SET out_degree = out_degree + 1,
+            unresolved_count = unresolved_count + (NEW.to_id IS NULL)
+        WHERE id = NEW.from_id;
+        UPDATE entity SET in_degree = in_degree - 1 WHERE id = OLD.to_id;
+        UPDATE entity SET in_degree = in_degree + 1 WHERE id = NEW.to_id;
+    END
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS relation_degree_update")
+    op.execute("DROP TRIGGER IF EXISTS relation_degree_delete")
+    op.execute("DROP TRIGGER IF EXISTS relation_degree_insert")
+    op.drop_index("ix_entity_orphan", table_name="entity")
+    op.drop_index("ix_entity_link_count", table_name="entity")
+
+    with op.batch_alter_table("entity", schema=None) as batch_op:
+        batch_op.drop_column("unresolved_count")
+        batch_op.drop_column("out_degree")
+        batch_op.drop_column("in_degree")
@@ -15,12 +15,14 @@ from nova_memory.api.routers import (
     knowledge,
     management,
     memory,
+    metrics,
     project,
     resource,
     search,
     prompt_router,
 )
 from nova_memory.config import app_config
+from nova_memory.repository.query_stats import query_stats
 from nova_memory.services.initialization import initialize_app, initialize_file_sync
 
 
@@ -30,6 +32,8 @@ async def lifespan(app: FastAPI):  # pragma: no cover
     # Initialize app and database
     logger.info("Starting Nova Memory API")
     await initialize_app(app_config)
+    # write query stats where the stats command reads them
+    query_stats.status_path = app_config.query_stats_path
 
     logger.info(f"Sync changes enabled: {app_config.sync_changes}")
     if app_config.sync_changes:
@@ -46,6 +50,7 @@ async def lifespan(app: FastAPI):  # pragma: no cover
         logger.info("Stopping sync...")
         app.state.sync_task.cancel()  # pyright: ignore
 
+    query_stats.write_status()
     await db.shutdown_db()
 
 
@@ -71,6 +76,7 @@ app.include_router(importer_router.router, prefix="/{project}")
 # Project resource router works accross projects
 app.include_router(project.project_resource_router)
 app.include_router(management.router)
+app.include_router(metrics.router)
 
 # Auth routes are handled by FastMCP automatically when auth is enabled
 
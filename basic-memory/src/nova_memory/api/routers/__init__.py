@@ -3,9 +3,19 @@
 from . import knowledge_router as knowledge
 from . import management_router as management
 from . import memory_router as memory
+from . import metrics_router as metrics
 from . import project_router as project
 from . import resource_router as resource
 from . import search_router as search
 from . import prompt_router as prompt
 
-__all__ = ["knowledge", "management", "memory", "project", "resource", "search", "prompt"]
+__all__ = [
+    "knowledge",
+    "management",
+    "memory",
+    "metrics",
+    "project",
+    "resource",
+    "search",
+    "prompt",
+]
@@ -7,6 +7,8 @@ from loguru import logger
 
 from nova_memory.deps import (
     EntityServiceDep,
+    EntityRepositoryDep,
+    RelationRepositoryDep,
     get_search_service,
     SearchServiceDep,
     LinkResolverDep,
@@ -17,10 +19,14 @@ from nova_memory.deps import (
     SyncServiceDep,
 )
 from nova_memory.schemas import (
+    BacklinksResponse,
     EntityListResponse,
+    EntityLinksListResponse,
+    EntityLinksResponse,
     EntityResponse,
     DeleteEntitiesResponse,
     DeleteEntitiesRequest,
+    RelationResponse,
 )
 from nova_memory.schemas.request import EditEntityRequest, MoveEntityRequest
 from nova_memory.schemas.base import Permalink, Entity
@@ -242,6 +248,56 @@ async def get_entities(
     return result
 
 
+@router.get("/hubs", response_model=EntityLinksListResponse)
+async def get_hubs(
+    entity_repository: EntityRepositoryDep,
+    limit: int = 10,
+) -> EntityLinksListResponse:
+    """Get the entities with the most relations to and from them."""
+    logger.info(f"request: get_hubs with limit={limit}")
+    entities = await entity_repository.find_hubs(limit=limit)
+    return EntityLinksListResponse(
+        entities=[EntityLinksResponse.model_validate(entity) for entity in entities]
+    )
+
+
+@router.get("/orphans", response_model=EntityLinksListResponse)
+async def get_orphans(
+    entity_repository: EntityRepositoryDep,
+    page: int = 1,
+    page_size: int = 10,
+) -> EntityLinksListResponse:
+    """Get the entities with no relations to or from them."""
+    logger.info(f"request: get_orphans with page={page} page_size={page_size}")
+    entities = await entity_repository.find_orphans(skip=(page - 1) * page_size, limit=page_size)
+    return EntityLinksListResponse(
+        entities=[EntityLinksResponse.model_validate(entity) for entity in entities]
+    )
+
+
+@router.get("/backlinks/{identifier:path}", response_model=BacklinksResponse)
+async def get_backlinks(
+    relation_repository: RelationRepositoryDep,
+    link_resolver: LinkResolverDep,
+    identifier: str,
+    page: int = 1,
+    page_size: int = 10,
+) -> BacklinksResponse:
+    """Get the relations pointing to an entity, identified by file path or permalink."""
+    logger.info(f"request: get_backlinks with identifier={identifier}")
+    entity = await link_resolver.resolve_link(identifier, load="summary")
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"Entity {identifier} not found")
+
+    relations = await relation_repository.find_backlinks(
+        entity.id, skip=(page - 1) * page_size, limit=page_size
+    )
+    return BacklinksResponse(
+        entity=EntityLinksResponse.model_validate(entity),
+        backlinks=[RelationResponse.model_validate(relation) for relation in relations],
+    )
+
+
 ## Delete endpoints
 
 
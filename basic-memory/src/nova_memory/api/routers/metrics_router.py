@@ -0,0 +1,14 @@
+"""Router for query metrics."""
+
+from fastapi import APIRouter
+
+from nova_memory.repository.query_stats import query_stats
+from nova_memory.schemas.query_stats import QueryStatsReport
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_model=QueryStatsReport)
+async def get_metrics() -> QueryStatsReport:
+    """Get the latency percentiles of queries by shape, and the recent slow queries."""
+    return query_stats.report()
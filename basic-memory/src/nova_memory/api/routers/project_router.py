@@ -3,7 +3,7 @@
 from fastapi import APIRouter, HTTPException, Path, Body
 from typing import Optional
 
-from nova_memory.deps import ProjectServiceDep
+from nova_memory.deps import ProjectIdDep, ProjectServiceDep
 from nova_memory.schemas import ProjectInfoResponse
 from nova_memory.schemas.project_info import (
     ProjectList,
@@ -22,9 +22,10 @@ project_resource_router = APIRouter(prefix="/projects", tags=["project_managemen
 @project_router.get("/info", response_model=ProjectInfoResponse)
 async def get_project_info(
     project_service: ProjectServiceDep,
+    project_id: ProjectIdDep,
 ) -> ProjectInfoResponse:
     """Get comprehensive information about the current Nova Memory project."""
-    return await project_service.get_project_info()
+    return await project_service.get_project_info(project_id)
 
 
 # Update a project
@@ -1,10 +1,18 @@
 """Router for search operations."""
 
-from fastapi import APIRouter, BackgroundTasks
+from typing import Annotated, Dict, List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 
 from nova_memory.api.routers.utils import to_search_results
-from nova_memory.schemas.search import SearchQuery, SearchResponse
-from nova_memory.deps import SearchServiceDep, EntityServiceDep
+from nova_memory.repository.search_repository import SearchCursor
+from nova_memory.schemas.search import (
+    SearchCacheStats,
+    SearchQuery,
+    SearchResponse,
+    SearchRetrieval,
+)
+from nova_memory.deps import EntityServiceDep, ProjectRepositoryDep, SearchServiceDep
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -14,18 +22,67 @@ async def search(
     query: SearchQuery,
     search_service: SearchServiceDep,
     entity_service: EntityServiceDep,
+    project_repository: ProjectRepositoryDep,
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    highlight: bool = False,
+    projects: Annotated[list[str] | None, Query()] = None,
 ):
-    """Search across all knowledge and documents."""
+    """Search across all knowledge and documents.
+
+    Pages can be fetched by number, or by passing the next_cursor of the previous
+    page as cursor, which stays fast however deep the page is. With highlight, the
+    matched terms of text searches are wrapped in ** in the result content.
+    Vector and hybrid searches are paged by number only, a cursor is rejected, and
+    they aren't counted.
+
+    Pass projects, by name or permalink, to search those projects in one query
+    instead of this one. Results are merged by score and tagged with their project.
+    """
+    try:
+        search_cursor = SearchCursor.decode(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    project_names: Optional[Dict[int, str]] = None
+    if projects:
+        project_names = {}
+        for name in projects:
+            project = await project_repository.get_by_permalink(name)
+            if not project:
+                project = await project_repository.get_by_name(name)
+            if not project:
+                raise HTTPException(status_code=404, detail=f"Project '{name}' not found.")
+            project_names[project.id] = project.name
+    project_ids: Optional[List[int]] = list(project_names) if project_names else None
+
     limit = page_size
     offset = (page - 1) * page_size
-    results = await search_service.search(query, limit=limit, offset=offset)
-    search_results = await to_search_results(entity_service, results)
+    try:
+        results = await search_service.search(
+            query,
+            limit=limit,
+            offset=offset,
+            cursor=search_cursor,
+            highlight=("**", "**") if highlight else None,
+            project_ids=project_ids,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    search_results = await to_search_results(entity_service, results, project_names)
+    ranked_by_fts = not query.text or query.retrieval == SearchRetrieval.FTS
     return SearchResponse(
         results=search_results,
         current_page=page,
         page_size=page_size,
+        next_cursor=SearchCursor.after(results[-1]).encode()
+        if ranked_by_fts and results and len(results) == page_size
+        else None,
+        total=await search_service.search_count(query, project_ids)
+        if include_total and ranked_by_fts
+        else None,
     )
 
 
@@ -34,3 +91,18 @@ async def reindex(background_tasks: BackgroundTasks, search_service: SearchServi
     """Recreate and populate the search index."""
     await search_service.reindex_all(background_tasks=background_tasks)
     return {"status": "ok", "message": "Reindex initiated"}
+
+
+@router.get("/reindex")
+async def reindex_status(search_service: SearchServiceDep):
+    """Get the progress of a running or interrupted reindex."""
+    progress = await search_service.get_reindex_progress()
+    if progress is None:
+        return {"status": "idle"}
+    return {"status": "in_progress", "progress": progress.model_dump()}
+
+
+@router.get("/cache", response_model=SearchCacheStats)
+async def cache_stats(search_service: SearchServiceDep):
+    """Get the hit and miss counters of the search result cache."""
+    return search_service.cache_stats()
@@ -1,4 +1,5 @@
-from typing import Optional, List
+from itertools import chain
+from typing import Dict, List, Mapping, Optional
 
 from nova_memory.repository import EntityRepository
 from nova_memory.repository.search_repository import SearchIndexRow
@@ -24,8 +25,18 @@ async def to_graph_context(
     page: Optional[int] = None,
     page_size: Optional[int] = None,
 ):
+    # Titles of the entities of every relation, looked up together
+    items = chain.from_iterable(
+        [item.primary_result, *item.observations, *item.related_results]
+        for item in context_result.results
+    )
+    relations = [item for item in items if item.type == SearchItemType.RELATION]
+    entities = await entity_repository.find_names_by_ids(
+        chain.from_iterable((item.from_id, item.to_id) for item in relations)
+    )
+
     # Helper function to convert items to summaries
-    async def to_summary(item: SearchIndexRow | ContextResultRow):
+    def to_summary(item: SearchIndexRow | ContextResultRow):
         match item.type:
             case SearchItemType.ENTITY:
                 return EntitySummary(
@@ -45,8 +56,8 @@ async def to_graph_context(
                     created_at=item.created_at,
                 )
             case SearchItemType.RELATION:
-                from_entity = await entity_repository.find_by_id(item.from_id)  # pyright: ignore
-                to_entity = await entity_repository.find_by_id(item.to_id) if item.to_id else None
+                from_entity = entities.get(item.from_id)  # pyright: ignore
+                to_entity = entities.get(item.to_id) if item.to_id else None  # pyright: ignore
                 return RelationSummary(
                     title=item.title,  # pyright: ignore
                     file_path=item.file_path,
@@ -63,17 +74,17 @@ async def to_graph_context(
     hierarchical_results = []
     for context_item in context_result.results:
         # Process primary result
-        primary_result = await to_summary(context_item.primary_result)
+        primary_result = to_summary(context_item.primary_result)
 
         # Process observations
         observations = []
         for obs in context_item.observations:
-            observations.append(await to_summary(obs))
+            observations.append(to_summary(obs))
 
         # Process related results
         related = []
         for rel in context_item.related_results:
-            related.append(await to_summary(rel))
+            related.append(to_summary(rel))
 
         # Add to hierarchical results
         hierarchical_results.append(
@@ -107,24 +118,50 @@ async def to_graph_context(
     )
 
 
-async def to_search_results(entity_service: EntityService, results: List[SearchIndexRow]):
+async def to_search_results(
+    entity_service: EntityService,
+    results: List[SearchIndexRow],
+    projects: Optional[Mapping[int, str]] = None,
+):
+    """Convert search index rows to search results with the permalinks of their entities.
+
+    For a search across projects, pass the names of the projects by id: each result
+    is tagged with its project, and its entities are looked up in that project.
+    """
+    repository = entity_service.repository
+    ids_by_project: Dict[int, List[Optional[int]]] = {}
+    for r in results:
+        project_id = r.project_id if projects is not None else repository.project_id
+        ids_by_project.setdefault(project_id, []).extend([r.entity_id, r.from_id, r.to_id])
+
+    # Permalinks of the entities of every result by id, looked up with a query per project
+    permalinks: Dict[int, Optional[str]] = {}
+    for project_id, entity_ids in ids_by_project.items():
+        if project_id != repository.project_id:
+            project_repository = EntityRepository(repository.session_maker, project_id=project_id)
+        else:
+            project_repository = repository
+        entities = await project_repository.find_names_by_ids(entity_ids)
+        permalinks.update((entity_id, row.permalink) for entity_id, row in entities.items())
+
     search_results = []
     for r in results:
-        entities = await entity_service.get_entities_by_id([r.entity_id, r.from_id, r.to_id])  # pyright: ignore
+        entity = permalinks.get(r.entity_id)  # pyright: ignore
         search_results.append(
             SearchResult(
                 title=r.title,  # pyright: ignore
                 type=r.type,  # pyright: ignore
                 permalink=r.permalink,
                 score=r.score,  # pyright: ignore
-                entity=entities[0].permalink if entities else None,
+                entity=entity,
                 content=r.content,
                 file_path=r.file_path,
                 metadata=r.metadata,
                 category=r.category,
-                from_entity=entities[0].permalink if entities else None,
-                to_entity=entities[1].permalink if len(entities) > 1 else None,
+                from_entity=permalinks.get(r.from_id, entity),  # pyright: ignore
+                to_entity=permalinks.get(r.to_id),  # pyright: ignore
                 relation_type=r.relation_type,
+                project=projects.get(r.project_id) if projects else None,
             )
         )
     return search_results
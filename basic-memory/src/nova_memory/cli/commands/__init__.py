@@ -1,7 +1,7 @@
 """CLI commands for basic-memory."""
 
 from . import auth, status, sync, db, import_memory_json, mcp, import_claude_conversations
-from . import import_claude_projects, import_chatgpt, tool, project
+from . import import_claude_projects, import_chatgpt, tool, project, stats
 
 __all__ = [
     "auth",
@@ -15,4 +15,5 @@ __all__ = [
     "import_chatgpt",
     "tool",
     "project",
+    "stats",
 ]
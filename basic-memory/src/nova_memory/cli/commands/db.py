@@ -7,7 +7,9 @@ from loguru import logger
 
 from nova_memory import db
 from nova_memory.cli.app import app
-from nova_memory.config import app_config
+from nova_memory.config import app_config, config
+from nova_memory.repository import ProjectRepository
+from nova_memory.schemas.search import ReindexProgress
 
 
 @app.command()
@@ -35,3 +37,45 @@ def reset(
 
             logger.info("Rebuilding search index from filesystem...")
             sync(watch=False)  # pyright: ignore
+
+
+def display_reindex_progress(progress: ReindexProgress) -> None:
+    """Display a one-line progress update for a reindex."""
+    eta = f"{progress.eta_seconds:.0f}s" if progress.eta_seconds is not None else "unknown"
+    typer.echo(
+        f"Indexed {progress.indexed_entities}/{progress.total_entities} entities, "
+        f"{progress.indexed_rows} rows ({progress.rows_per_second:.0f} rows/s, ETA {eta})"
+    )
+
+
+async def run_reindex():  # pragma: no cover
+    """Rebuild the search index of the current project, resuming an interrupted reindex."""
+    from nova_memory.cli.commands.sync import get_sync_service
+
+    _, session_maker = await db.get_or_create_db(
+        db_path=app_config.database_path, db_type=db.DatabaseType.FILESYSTEM
+    )
+    project = await ProjectRepository(session_maker).get_by_name(config.project)
+    if not project:
+        raise Exception(f"Project '{config.project}' not found")
+
+    search_service = (await get_sync_service(project)).search_service
+    if await search_service.get_reindex_progress():
+        typer.echo("Resuming interrupted reindex")
+    await search_service.reindex_all(progress=display_reindex_progress)
+
+
+@app.command()
+def reindex():  # pragma: no cover
+    """Rebuild the search index from the database.
+
+    An interrupted reindex resumes where it stopped the next time this is run.
+    """
+    typer.echo(f"Reindexing project: {config.project}")
+    try:
+        asyncio.run(run_reindex())
+        typer.echo("Reindex complete")
+    except Exception as e:
+        logger.exception(f"Reindex failed, project={config.project}, error={e}")
+        typer.echo(f"Error during reindex: {e}", err=True)
+        raise typer.Exit(1)
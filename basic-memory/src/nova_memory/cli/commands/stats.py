@@ -0,0 +1,71 @@
+"""Stats command for basic-memory CLI."""
+
+import typer
+from loguru import logger
+from rich.console import Console
+from rich.table import Table
+
+from nova_memory.cli.app import app
+from nova_memory.config import app_config
+from nova_memory.schemas.query_stats import QueryStatsReport
+
+# Create rich console
+console = Console()
+
+
+def display_query_stats(report: QueryStatsReport, slow: bool) -> None:
+    """Show the latencies of each query shape, and the slow queries if asked."""
+    table = Table(title=f"Query latencies (ms), as of {report.generated_at:%Y-%m-%d %H:%M:%S}")
+    table.add_column("Shape", style="cyan")
+    for column in ("Count", "Rows", "Mean", "p50", "p95", "p99", "Max"):
+        table.add_column(column, justify="right")
+    for shape in report.shapes:
+        table.add_row(
+            shape.shape,
+            str(shape.count),
+            str(shape.rows),
+            f"{shape.mean_ms:.1f}",
+            f"{shape.p50_ms:.1f}",
+            f"{shape.p95_ms:.1f}",
+            f"{shape.p99_ms:.1f}",
+            f"{shape.max_ms:.1f}",
+        )
+    console.print(table)
+
+    if report.slow_query_ms is None:
+        console.print("Slow query log disabled")
+    elif not slow:
+        console.print(
+            f"{len(report.slow_queries)} queries took at least {report.slow_query_ms:.0f} ms, "
+            "show them with --slow"
+        )
+    else:
+        for query in report.slow_queries:
+            console.print(
+                f"\n[bold]{query.shape}[/bold]: {query.elapsed_ms:.1f} ms, {query.rows} rows "
+                f"at {query.recorded_at:%Y-%m-%d %H:%M:%S}"
+            )
+            console.print(query.sql.strip(), markup=False, highlight=False)
+            console.print(f"params: {query.params}", markup=False, highlight=False)
+            for step in query.plan:
+                console.print(f"  {step}", markup=False, highlight=False)
+
+
+@app.command()
+def stats(
+    slow: bool = typer.Option(False, "--slow", help="Show the logged slow queries and their plans"),
+):
+    """Show query latencies recorded by the running Nova Memory server."""
+    path = app_config.query_stats_path
+    if not path.exists():
+        console.print("No query stats yet, a running MCP or API server writes them")
+        return
+
+    try:
+        report = QueryStatsReport.model_validate_json(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.error(f"Error reading query stats: {e}")
+        typer.echo(f"Error reading query stats: {e}", err=True)
+        raise typer.Exit(code=1)
+
+    display_query_stats(report, slow)
@@ -25,6 +25,7 @@ from nova_memory.repository import (
 )
 from nova_memory.repository.search_repository import SearchRepository
 from nova_memory.services import EntityService, FileService
+from nova_memory.services.embedding import get_embedding
 from nova_memory.services.link_resolver import LinkResolver
 from nova_memory.services.search_service import SearchService
 from nova_memory.sync import SyncService
@@ -55,10 +56,16 @@ async def get_sync_service(project: Project) -> SyncService:  # pragma: no cover
     entity_repository = EntityRepository(session_maker, project_id=project.id)
     observation_repository = ObservationRepository(session_maker, project_id=project.id)
     relation_repository = RelationRepository(session_maker, project_id=project.id)
-    search_repository = SearchRepository(session_maker, project_id=project.id)
+    search_repository = SearchRepository(
+        session_maker,
+        project_id=project.id,
+        column_weights=app_config.search_column_weights,
+    )
 
     # Initialize services
-    search_service = SearchService(search_repository, entity_repository, file_service)
+    search_service = SearchService(
+        search_repository, entity_repository, file_service, embedding=get_embedding(app_config)
+    )
     link_resolver = LinkResolver(entity_repository, search_service)
 
     # Initialize services
@@ -156,7 +163,7 @@ def display_detailed_sync_results(knowledge: SyncReport):
         console.print(knowledge_tree)
 
 
-async def run_sync(verbose: bool = False):
+async def run_sync(verbose: bool = False, verify: bool = False):
     """Run sync operation."""
     _, session_maker = await db.get_or_create_db(
         db_path=app_config.database_path, db_type=db.DatabaseType.FILESYSTEM
@@ -174,13 +181,14 @@ async def run_sync(verbose: bool = False):
         "Sync command started",
         project=config.project,
         verbose=verbose,
+        verify=verify,
         directory=str(config.home),
     )
 
     sync_service = await get_sync_service(project)
 
     logger.info("Running one-time sync")
-    knowledge_changes = await sync_service.sync(config.home)
+    knowledge_changes = await sync_service.sync(config.home, verify=verify)
 
     # Log results
     duration_ms = int((time.time() - start_time) * 1000)
@@ -210,6 +218,11 @@ def sync(
         "-v",
         help="Show detailed sync information.",
     ),
+    verify: bool = typer.Option(
+        False,
+        "--verify",
+        help="Rehash every file instead of skipping files with unchanged size and mtime.",
+    ),
 ) -> None:
     """Sync knowledge files with the database."""
     try:
@@ -218,7 +231,7 @@ def sync(
         typer.echo(f"Project path: {config.home}")
 
         # Run sync
-        asyncio.run(run_sync(verbose=verbose))
+        asyncio.run(run_sync(verbose=verbose, verify=verify))
 
     except Exception as e:  # pragma: no cover
         if not isinstance(e, typer.Exit):
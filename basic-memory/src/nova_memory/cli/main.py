@@ -12,6 +12,7 @@ from nova_memory.cli.commands import (  # noqa: F401  # pragma: no cover
     import_memory_json,
     mcp,
     project,
+    stats,
     status,
     sync,
     tool,
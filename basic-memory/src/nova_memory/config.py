@@ -19,6 +19,15 @@ APP_DATABASE_NAME = "memory.db"  # Using the same name but in the app directory
 DATA_DIR_NAME = ".basic-memory"
 CONFIG_FILE_NAME = "config.json"
 WATCH_STATUS_JSON = "watch-status.json"
+QUERY_STATS_JSON = "query-stats.json"
+
+# Default bm25 weight of each full-text indexed search column, a match in the title counts most
+DEFAULT_SEARCH_COLUMN_WEIGHTS = {
+    "title": 10.0,
+    "content_stems": 2.0,
+    "content_snippet": 1.0,
+    "permalink": 5.0,
+}
 
 Environment = Literal["test", "dev", "user"]
 
@@ -72,6 +81,63 @@ class NovaMemoryConfig(BaseSettings):
         description="Whether to sync changes in real time. default (True)",
     )
 
+    sync_concurrency: int = Field(
+        default_factory=lambda: min(32, (os.cpu_count() or 1) + 4),
+        description="Maximum number of files processed concurrently during sync",
+        gt=0,
+    )
+
+    sync_batch_size: int = Field(
+        default=100,
+        description="Number of new or modified files written to the database per transaction during sync. 1 disables batching",
+        gt=0,
+    )
+
+    sync_parse_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        description="Number of worker processes parsing markdown during large syncs. 0 parses in the main process",
+        ge=0,
+    )
+
+    sync_buffer_size: int = Field(
+        default=64 * 1024 * 1024,
+        description="Maximum bytes of markdown read during the sync scan and kept for syncing, so changed files are only read once. 0 disables the buffer",
+        ge=0,
+    )
+
+    search_column_weights: Dict[str, float] = Field(
+        default_factory=lambda: dict(DEFAULT_SEARCH_COLUMN_WEIGHTS),
+        description="Weight of each full-text indexed search column in bm25 ranking: title, content_stems (title, path and tag variants), content_snippet (note content) and permalink",
+    )
+
+    semantic_search: bool = Field(
+        default=False,
+        description="Embed notes when they are indexed, for vector and hybrid search",
+    )
+
+    semantic_search_dimensions: int = Field(
+        default=256,
+        description="Length of the note embeddings used by semantic search",
+        gt=0,
+    )
+
+    relation_graph: bool = Field(
+        default=True,
+        description="Follow relations for build_context in an in-memory graph of each project, instead of with a query per level",
+    )
+
+    context_fan_out: int = Field(
+        default=100,
+        description="Most relations build_context follows from each entity, the lowest ids first. 0 follows them all",
+        ge=0,
+    )
+
+    slow_query_ms: int = Field(
+        default=500,
+        description="Queries taking at least this many milliseconds are logged as slow, with their query plan. 0 disables the slow query log",
+        ge=0,
+    )
+
     model_config = SettingsConfigDict(
         env_prefix="BASIC_MEMORY_",
         extra="ignore",
@@ -111,6 +177,11 @@ class NovaMemoryConfig(BaseSettings):
             database_path.touch()
         return database_path
 
+    @property
+    def query_stats_path(self) -> Path:
+        """Get the path of the query stats a running server writes, for the stats command."""
+        return Path.home() / DATA_DIR_NAME / QUERY_STATS_JSON
+
     @property
     def database_path(self) -> Path:
         """Get SQLite database path.
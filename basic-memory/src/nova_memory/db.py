@@ -1,8 +1,9 @@
 import asyncio
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from enum import Enum, auto
 from pathlib import Path
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Optional, Tuple
 
 from nova_memory.config import NovaMemoryConfig
 from alembic import command
@@ -24,6 +25,11 @@ from nova_memory.repository.search_repository import SearchRepository
 _engine: Optional[AsyncEngine] = None
 _session_maker: Optional[async_sessionmaker[AsyncSession]] = None
 
+# Session shared by every scoped_session opened inside a batch_session block
+_batch_session: ContextVar[Optional[Tuple[async_sessionmaker[AsyncSession], AsyncSession]]] = (
+    ContextVar("batch_session", default=None)
+)
+
 
 class DatabaseType(Enum):
     """Types of supported databases."""
@@ -55,9 +61,21 @@ async def scoped_session(
     """
     Get a scoped session with proper lifecycle management.
 
+    Inside a batch_session block for the same session maker, the batch session is
+    reused instead: changes are flushed on exit but only committed when the batch ends.
+
     Args:
         session_maker: Session maker to create scoped sessions from
     """
+    batch = _batch_session.get()
+    if batch is not None and batch[0] is session_maker:
+        session = batch[1]
+        yield session
+        # flush and detach loaded objects, the same state a closed session leaves them in
+        await session.flush()
+        session.expunge_all()
+        return
+
     factory = get_scoped_session_factory(session_maker)
     session = factory()
     try:
@@ -72,6 +90,44 @@ async def scoped_session(
         await factory.remove()
 
 
+@asynccontextmanager
+async def batch_session(
+    session_maker: async_sessionmaker[AsyncSession],
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Run every scoped_session opened in this block in a single transaction.
+
+    The transaction commits once when the block exits, and rolls back entirely if
+    anything inside it raises. Nested batch_session blocks join the outer batch.
+    The session is shared through a context variable, so the block must not run
+    database work in concurrent tasks.
+
+    Args:
+        session_maker: Session maker to create the batch session from
+    """
+    batch = _batch_session.get()
+    if batch is not None and batch[0] is session_maker:
+        yield batch[1]
+        return
+
+    async with scoped_session(session_maker) as session:
+        token = _batch_session.set((session_maker, session))
+        try:
+            yield session
+        finally:
+            _batch_session.reset(token)
+
+
+def current_batch_session(
+    session_maker: async_sessionmaker[AsyncSession],
+) -> Optional[AsyncSession]:
+    """The session of the batch_session block for session_maker this task is in, if any."""
+    batch = _batch_session.get()
+    if batch is not None and batch[0] is session_maker:
+        return batch[1]
+    return None
+
+
 async def get_or_create_db(
     db_path: Path,
     db_type: DatabaseType = DatabaseType.FILESYSTEM,
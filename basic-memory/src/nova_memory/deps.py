@@ -29,6 +29,7 @@ from nova_memory.repository.search_repository import SearchRepository
 from nova_memory.services import EntityService, ProjectService
 from nova_memory.services.context_service import ContextService
 from nova_memory.services.directory_service import DirectoryService
+from nova_memory.services.embedding import get_embedding
 from nova_memory.services.file_service import FileService
 from nova_memory.services.link_resolver import LinkResolver
 from nova_memory.services.search_service import SearchService
@@ -196,9 +197,14 @@ RelationRepositoryDep = Annotated[RelationRepository, Depends(get_relation_repos
 async def get_search_repository(
     session_maker: SessionMakerDep,
     project_id: ProjectIdDep,
+    app_config: AppConfigDep,
 ) -> SearchRepository:
     """Create a SearchRepository instance for the current project."""
-    return SearchRepository(session_maker, project_id=project_id)
+    return SearchRepository(
+        session_maker,
+        project_id=project_id,
+        column_weights=app_config.search_column_weights,
+    )
 
 
 SearchRepositoryDep = Annotated[SearchRepository, Depends(get_search_repository)]
@@ -264,9 +270,12 @@ async def get_search_service(
     search_repository: SearchRepositoryDep,
     entity_repository: EntityRepositoryDep,
     file_service: FileServiceDep,
+    app_config: AppConfigDep,
 ) -> SearchService:
     """Create SearchService with dependencies."""
-    return SearchService(search_repository, entity_repository, file_service)
+    return SearchService(
+        search_repository, entity_repository, file_service, embedding=get_embedding(app_config)
+    )
 
 
 SearchServiceDep = Annotated[SearchService, Depends(get_search_service)]
@@ -282,6 +291,7 @@ LinkResolverDep = Annotated[LinkResolver, Depends(get_link_resolver)]
 
 
 async def get_context_service(
+    app_config: AppConfigDep,
     search_repository: SearchRepositoryDep,
     entity_repository: EntityRepositoryDep,
     observation_repository: ObservationRepositoryDep,
@@ -290,6 +300,8 @@ async def get_context_service(
         search_repository=search_repository,
         entity_repository=entity_repository,
         observation_repository=observation_repository,
+        relation_graph=app_config.relation_graph,
+        fan_out=app_config.context_fan_out or None,
     )
 
 
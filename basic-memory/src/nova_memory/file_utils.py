@@ -9,6 +9,9 @@ from loguru import logger
 
 from nova_memory.utils import FilePath
 
+# Read files in 1MB chunks when hashing so large files don't need to fit in memory
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
 
 class FileError(Exception):
     """Base exception for file operations."""
@@ -32,6 +35,22 @@ async def compute_checksum(content: Union[str, bytes]) -> str:
     """
     Compute SHA-256 checksum of content.
 
+    Args:
+        content: Content to hash (either text string or bytes)
+
+    Returns:
+        SHA-256 hex digest
+
+    Raises:
+        FileError: If checksum computation fails
+    """
+    return compute_content_checksum(content)
+
+
+def compute_content_checksum(content: Union[str, bytes]) -> str:
+    """
+    Compute SHA-256 checksum of content without awaiting, for use in worker threads.
+
     Args:
         content: Content to hash (either text string or bytes)
 
@@ -50,6 +69,43 @@ async def compute_checksum(content: Union[str, bytes]) -> str:
         raise FileError(f"Failed to compute checksum: {e}")
 
 
+def compute_file_checksum(
+    path: FilePath, text: bool = False, chunk_size: int = CHECKSUM_CHUNK_SIZE
+) -> str:
+    """
+    Compute SHA-256 checksum of a file, reading it in chunks.
+
+    This is a blocking call, so it can be run in a worker thread.
+    When text is True the file is decoded as utf-8 with universal newlines,
+    producing the same checksum as compute_checksum(path.read_text()).
+
+    Args:
+        path: Path to the file (Path or string)
+        text: Whether to hash the decoded text instead of the raw bytes
+        chunk_size: Number of bytes (or characters in text mode) read at a time
+
+    Returns:
+        SHA-256 hex digest
+
+    Raises:
+        FileError: If the file can't be read
+    """
+    try:
+        hasher = hashlib.sha256()
+        if text:
+            with open(path, "r", encoding="utf-8") as f:
+                while chunk := f.read(chunk_size):
+                    hasher.update(chunk.encode())
+        else:
+            with open(path, "rb") as f:
+                while chunk := f.read(chunk_size):
+                    hasher.update(chunk)
+        return hasher.hexdigest()
+    except Exception as e:
+        logger.error(f"Failed to compute checksum for {path}: {e}")
+        raise FileError(f"Failed to compute checksum for {path}: {e}")
+
+
 async def ensure_directory(path: FilePath) -> None:
     """
     Ensure directory exists, creating if necessary.
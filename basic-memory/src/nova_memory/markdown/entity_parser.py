@@ -111,6 +111,10 @@ class EntityParser:
         return self.base_path / path
 
     async def parse_file_content(self, absolute_path, file_content):
+        return self.parse_content(absolute_path, file_content)
+
+    def parse_content(self, absolute_path: Path, file_content: str) -> EntityMarkdown:
+        """Parse file content into EntityMarkdown without any async calls."""
         post = frontmatter.loads(file_content)
         # Extract file stat info
         file_stats = absolute_path.stat()
@@ -133,3 +137,22 @@ class EntityParser:
             created=datetime.fromtimestamp(file_stats.st_ctime),
             modified=datetime.fromtimestamp(file_stats.st_mtime),
         )
+
+
+def parse_markdown_file(base_path: Path, path: str) -> EntityMarkdown:
+    """Parse a markdown file relative to base_path.
+
+    A plain function so it can be pickled and run in a worker process.
+    """
+    parser = EntityParser(base_path)
+    absolute_path = parser.get_file_path(path)
+    return parser.parse_content(absolute_path, absolute_path.read_text(encoding="utf-8"))
+
+
+def parse_markdown_content(base_path: Path, path: str, file_content: str) -> EntityMarkdown:
+    """Parse already read content of a markdown file relative to base_path.
+
+    A plain function so it can be pickled and run in a worker process.
+    """
+    parser = EntityParser(base_path)
+    return parser.parse_content(parser.get_file_path(path), file_content)
@@ -13,6 +13,7 @@ from fastmcp.utilities.logging import configure_logging as mcp_configure_logging
 from mcp.server.auth.settings import AuthSettings
 
 from nova_memory.config import app_config
+from nova_memory.repository.query_stats import query_stats
 from nova_memory.services.initialization import initialize_app
 from nova_memory.mcp.auth_provider import BasicMemoryOAuthProvider
 from nova_memory.mcp.project_session import session
@@ -38,6 +39,8 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:  # pragma:
     """Manage application lifecycle with type-safe context"""
     # Initialize on startup
     watch_task = await initialize_app(app_config)
+    # write query stats where the stats command reads them
+    query_stats.status_path = app_config.query_stats_path
 
     # Initialize project session with default project
     session.initialize(app_config.default_project)
@@ -48,6 +51,7 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:  # pragma:
         # Cleanup on shutdown
         if watch_task:
             watch_task.cancel()
+        query_stats.write_status()
 
 
 # OAuth configuration function
@@ -9,7 +9,12 @@ from nova_memory.mcp.async_client import client
 from nova_memory.mcp.server import mcp
 from nova_memory.mcp.tools.utils import call_post
 from nova_memory.mcp.project_session import get_active_project
-from nova_memory.schemas.search import SearchItemType, SearchQuery, SearchResponse
+from nova_memory.schemas.search import (
+    SearchItemType,
+    SearchQuery,
+    SearchResponse,
+    SearchRetrieval,
+)
 
 
 def _format_search_error_response(error_message: str, query: str, search_type: str = "text") -> str:
@@ -178,6 +183,9 @@ async def search_notes(
     entity_types: Optional[List[str]] = None,
     after_date: Optional[str] = None,
     project: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    projects: Optional[List[str]] = None,
 ) -> SearchResponse | str:
     """Search across all content in the knowledge base.
 
@@ -189,14 +197,23 @@ async def search_notes(
         query: The search query string
         page: The page number of results to return (default 1)
         page_size: The number of results to return per page (default 10)
-        search_type: Type of search to perform, one of: "text", "title", "permalink" (default: "text")
+        search_type: Type of search to perform, one of: "text", "title", "permalink",
+            "vector" or "hybrid" (default: "text"). "vector" finds notes by meaning rather
+            than matching words and "hybrid" combines it with "text", if semantic search
+            is enabled, otherwise they search like "text"
         types: Optional list of note types to search (e.g., ["note", "person"])
         entity_types: Optional list of entity types to filter by (e.g., ["entity", "observation"])
         after_date: Optional date filter for recent content (e.g., "1 week", "2d")
         project: Optional project name to search in. If not provided, uses current active project.
+        cursor: Optional next_cursor of the previous page, to get the page after it. Faster
+            than page for deep pages
+        include_total: Whether to count the results on all pages (default False)
+        projects: Optional project names to search together in one query, instead of
+            project. Results are merged by score, each with the name of its project
 
     Returns:
-        SearchResponse with results and pagination info
+        SearchResponse with results and pagination info. next_cursor is set when there
+        may be more results
 
     Examples:
         # Basic text search
@@ -232,6 +249,9 @@ async def search_notes(
             after_date="1 week"
         )
 
+        # Find notes about a topic even if they word it differently
+        results = await search_notes("keeping services up during deploys", search_type="hybrid")
+
         # Pattern matching on permalinks
         results = await search_notes(
             query="docs/meeting-*",
@@ -240,6 +260,14 @@ async def search_notes(
 
         # Search in specific project
         results = await search_notes("meeting notes", project="work-project")
+
+        # Search several projects at once
+        results = await search_notes("meeting notes", projects=["work-project", "personal"])
+
+        # Page through all results
+        results = await search_notes("meeting notes", include_total=True)
+        while results.next_cursor:
+            results = await search_notes("meeting notes", cursor=results.next_cursor)
     """
     # Create a SearchQuery object based on the parameters
     search_query = SearchQuery()
@@ -253,6 +281,9 @@ async def search_notes(
         search_query.permalink_match = query
     elif search_type == "permalink":
         search_query.permalink = query
+    elif search_type in ("vector", "hybrid"):
+        search_query.text = query
+        search_query.retrieval = SearchRetrieval(search_type)
     else:
         search_query.text = query  # Default to text search
 
@@ -274,7 +305,13 @@ async def search_notes(
             client,
             f"{project_url}/search/",
             json=search_query.model_dump(),
-            params={"page": page, "page_size": page_size},
+            params={
+                "page": page,
+                "page_size": page_size,
+                **({"cursor": cursor} if cursor else {}),
+                "include_total": include_total,
+                **({"projects": projects} if projects else {}),
+            },
         )
         result = SearchResponse.model_validate(response.json())
 
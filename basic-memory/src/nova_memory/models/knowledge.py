@@ -4,14 +4,17 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import (
+    BigInteger,
     Integer,
     String,
     Text,
+    DDL,
     ForeignKey,
     UniqueConstraint,
     DateTime,
     Index,
     JSON,
+    event,
     text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -53,6 +56,14 @@ class Entity(Base):
             "project_id",
             unique=True,
         ),
+        # Entities without relations, for orphan queries
+        Index(
+            "ix_entity_orphan",
+            "project_id",
+            "in_degree",
+            "out_degree",
+            sqlite_where=text("in_degree = 0 AND out_degree = 0"),
+        ),
     )
 
     # Core identity
@@ -71,6 +82,18 @@ class Entity(Base):
     file_path: Mapped[str] = mapped_column(String, index=True)
     # checksum of file
     checksum: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # file stat when the checksum was recorded, lets sync skip rehashing unchanged files
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    file_mtime_ns: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    file_inode: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    # Link counters, kept by the RELATION_DEGREE_TRIGGERS on the relation table:
+    # relations to this entity, relations from it, and those from it still unresolved
+    in_degree: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    out_degree: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    unresolved_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     # Metadata and tracking
     created_at: Mapped[datetime] = mapped_column(DateTime)
@@ -108,6 +131,13 @@ class Entity(Base):
         return f"Entity(id={self.id}, name='{self.title}', type='{self.entity_type}'"
 
 
+# Columns the database maintains, which repositories don't write
+ENTITY_LINK_COUNTERS = ("in_degree", "out_degree", "unresolved_count")
+
+# Entities of a project by their number of relations, for hub queries
+Index("ix_entity_link_count", Entity.project_id, Entity.in_degree + Entity.out_degree)
+
+
 class Observation(Base):
     """An observation about an entity.
 
@@ -193,3 +223,44 @@ class Relation(Base):
 
     def __repr__(self) -> str:
         return f"Relation(id={self.id}, from_id={self.from_id}, to_id={self.to_id}, to_name={self.to_name}, type='{self.relation_type}')"  # pragma: no cover
+
+
+# Triggers keeping the link counters of entities in step with their relations. They run
+# in the statement that writes the relation, so the counters commit or roll back with it,
+# whichever code path wrote it, deletes cascaded from entities included.
+RELATION_DEGREE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS relation_degree_insert AFTER INSERT ON relation
+    BEGIN
+        UPDATE entity SET out_degree = out_degree + 1,
+            unresolved_count = unresolved_count + (NEW.to_id IS NULL)
+        WHERE id = NEW.from_id;
+        UPDATE entity SET in_degree = in_degree + 1 WHERE id = NEW.to_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS relation_degree_delete AFTER DELETE ON relation
+    BEGIN
+        UPDATE entity SET out_degree = out_degree - 1,
+            unresolved_count = unresolved_count - (OLD.to_id IS NULL)
+        WHERE id = OLD.from_id;
+        UPDATE entity SET in_degree = in_degree - 1 WHERE id = OLD.to_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS relation_degree_update AFTER UPDATE OF from_id, to_id ON relation
+    BEGIN
+        UPDATE entity SET out_degree = out_degree - 1,
+            unresolved_count = unresolved_count - (OLD.to_id IS NULL)
+        WHERE id = OLD.from_id;
+        UPDATE entity SET out_degree = out_degree + 1,
+            unresolved_count = unresolved_count + (NEW.to_id IS NULL)
+        WHERE id = NEW.from_id;
+        UPDATE entity SET in_degree = in_degree - 1 WHERE id = OLD.to_id;
+        UPDATE entity SET in_degree = in_degree + 1 WHERE id = NEW.to_id;
+    END
+    """,
+]
+
+for trigger in RELATION_DEGREE_TRIGGERS:
+    event.listen(Relation.__table__, "after_create", DDL(trigger))
@@ -2,14 +2,18 @@
 
 from sqlalchemy import DDL
 
-# Define FTS5 virtual table creation
-CREATE_SEARCH_INDEX = DDL("""
-CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+# Live search index, and the shadow table a full reindex builds before swapping it in
+SEARCH_INDEX_TABLE = "search_index"
+SEARCH_INDEX_SHADOW_TABLE = "search_index_new"
+
+# FTS5 virtual table creation, formatted with the table name
+SEARCH_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
     -- Core entity fields
     id UNINDEXED,          -- Row ID
     title,                 -- Title for searching
-    content_stems,         -- Main searchable content split into stems
-    content_snippet,       -- File content snippet for display
+    content_stems,         -- Title, path and tag variants to match
+    content_snippet,       -- Note or observation content, snippets are made from it when searched
     permalink,             -- Stable identifier (now indexed for path search)
     file_path UNINDEXED,   -- Physical location
     type UNINDEXED,        -- entity/relation/observation
@@ -35,4 +39,79 @@ CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
     tokenize='unicode61 tokenchars 0x2F',  -- Hex code for /
     prefix='1,2,3,4'                    -- Support longer prefixes for paths
 );
+"""
+
+CREATE_SEARCH_INDEX = DDL(SEARCH_INDEX_SCHEMA.format(table=SEARCH_INDEX_TABLE))
+CREATE_SEARCH_INDEX_SHADOW = DDL(SEARCH_INDEX_SCHEMA.format(table=SEARCH_INDEX_SHADOW_TABLE))
+
+# Trigram index for substring and fuzzy matching, and its shadow table
+SEARCH_TRIGRAM_TABLE = "search_trigram"
+SEARCH_TRIGRAM_SHADOW_TABLE = "search_trigram_new"
+
+# Rows share their rowid with the search_index row they were derived from
+SEARCH_TRIGRAM_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+    title,                 -- Entity or relation title
+    permalink,             -- Entity permalink
+    file_path,             -- Entity file path
+    content,               -- Observation content
+    tokenize='trigram'
+);
+"""
+
+CREATE_SEARCH_TRIGRAM = DDL(SEARCH_TRIGRAM_SCHEMA.format(table=SEARCH_TRIGRAM_TABLE))
+CREATE_SEARCH_TRIGRAM_SHADOW = DDL(SEARCH_TRIGRAM_SCHEMA.format(table=SEARCH_TRIGRAM_SHADOW_TABLE))
+
+# Filterable columns of the search index, and their shadow table
+SEARCH_FILTER_TABLE = "search_filter"
+SEARCH_FILTER_SHADOW_TABLE = "search_filter_new"
+
+# FTS5 can only scan its unindexed columns, so the ones searches filter by are copied
+# into a regular table with B-tree indexes. Rows share their rowid with the
+# search_index row they were derived from, and are joined to it on that.
+SEARCH_FILTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    row_id INTEGER PRIMARY KEY,  -- rowid of the search_index row
+    project_id INTEGER NOT NULL, -- Project identifier
+    type TEXT NOT NULL,          -- entity/relation/observation
+    entity_type TEXT,            -- entity_type in the row's metadata
+    created_at TEXT              -- Creation timestamp, normalized by datetime()
+);
+"""
+
+CREATE_SEARCH_FILTER = DDL(SEARCH_FILTER_SCHEMA.format(table=SEARCH_FILTER_TABLE))
+CREATE_SEARCH_FILTER_SHADOW = DDL(SEARCH_FILTER_SCHEMA.format(table=SEARCH_FILTER_SHADOW_TABLE))
+
+# Every search filters by project, so each index leads with project_id. Only the live
+# table is indexed, the shadow table is indexed once it is swapped in.
+CREATE_SEARCH_FILTER_INDEXES = [
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_FILTER_TABLE}_{column} "
+        f"ON {SEARCH_FILTER_TABLE} (project_id, {column})"
+    )
+    for column in ("type", "entity_type", "created_at")
+]
+
+# Embedding of each entity per project, for semantic search
+CREATE_SEARCH_VECTOR = DDL("""
+CREATE TABLE IF NOT EXISTS search_vector (
+    project_id INTEGER NOT NULL,
+    entity_id INTEGER NOT NULL,
+    vector BLOB NOT NULL,           -- Embedding of unit length, as float32 values
+    PRIMARY KEY (project_id, entity_id)
+);
+""")
+
+# Progress of a full reindex per project, so an interrupted reindex can resume
+CREATE_SEARCH_INDEX_CHECKPOINT = DDL("""
+CREATE TABLE IF NOT EXISTS search_index_checkpoint (
+    project_id INTEGER PRIMARY KEY,
+    last_entity_id INTEGER NOT NULL,    -- Entities up to this id are indexed
+    total_entities INTEGER NOT NULL,
+    indexed_entities INTEGER NOT NULL,
+    indexed_rows INTEGER NOT NULL,
+    started_at TIMESTAMP NOT NULL,      -- Start of the current run, reset when resumed
+    run_entities INTEGER NOT NULL,      -- Entities indexed by the current run
+    run_rows INTEGER NOT NULL           -- Rows written by the current run
+);
 """)
@@ -1,15 +1,25 @@
 """Repository for managing entities in the knowledge graph."""
 
 from pathlib import Path
-from typing import List, Optional, Sequence, Union
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Union, cast
 
+from sqlalchemy import Row, Select, Table, bindparam, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, raiseload, selectinload
 from sqlalchemy.orm.interfaces import LoaderOption
 
-from nova_memory.models.knowledge import Entity, Observation, Relation
+from nova_memory import db
+from nova_memory.models.knowledge import ENTITY_LINK_COUNTERS, Entity, Observation, Relation
+from nova_memory.repository.relation_graph import get_relation_graph_cache
 from nova_memory.repository.repository import Repository
 
+# How much of each entity a query loads:
+# - "ids_only": the id column alone
+# - "summary": the entity's columns, in a single query
+# - "full": the columns, observations and relations, with both entities of each relation
+# Attributes a projection doesn't load raise when accessed, rather than loading lazily.
+EntityLoad = Literal["ids_only", "summary", "full"]
+
 
 class EntityRepository(Repository[Entity]):
     """Repository for Entity model.
@@ -26,38 +36,117 @@ class EntityRepository(Repository[Entity]):
             project_id: Project ID to filter all operations by
         """
         super().__init__(session_maker, Entity, project_id=project_id)
+        self.graph_cache = get_relation_graph_cache(session_maker, project_id)
+        # the link counters are kept by triggers, writing a stale copy would undo them
+        self.valid_columns = [c for c in self.valid_columns if c not in ENTITY_LINK_COUNTERS]
+
+    async def _find(self, query: Select, load: EntityLoad) -> Sequence[Entity]:
+        """Run a query for entities, loading them as the projection says."""
+        query = query.options(*self.get_projection_options(load))
+        result = await self.execute_query(query, use_query_options=False)
+        return result.scalars().all()
 
-    async def get_by_permalink(self, permalink: str) -> Optional[Entity]:
+    async def get_by_permalink(self, permalink: str, load: EntityLoad = "full") -> Optional[Entity]:
         """Get entity by permalink.
 
         Args:
             permalink: Unique identifier for the entity
+            load: How much of the entity to load
         """
-        query = self.select().where(Entity.permalink == permalink).options(*self.get_load_options())
-        return await self.find_one(query)
+        found = await self._find(self.select().where(Entity.permalink == permalink), load)
+        return found[0] if found else None
 
-    async def get_by_title(self, title: str) -> Sequence[Entity]:
+    async def get_by_title(self, title: str, load: EntityLoad = "full") -> Sequence[Entity]:
         """Get entity by title.
 
         Args:
             title: Title of the entity to find
+            load: How much of the entities to load
         """
-        query = self.select().where(Entity.title == title).options(*self.get_load_options())
-        result = await self.execute_query(query)
-        return list(result.scalars().all())
+        return list(await self._find(self.select().where(Entity.title == title), load))
 
-    async def get_by_file_path(self, file_path: Union[Path, str]) -> Optional[Entity]:
+    async def get_by_file_path(
+        self, file_path: Union[Path, str], load: EntityLoad = "full"
+    ) -> Optional[Entity]:
         """Get entity by file_path.
 
         Args:
             file_path: Path to the entity file (will be converted to string internally)
+            load: How much of the entity to load
+        """
+        found = await self._find(self.select().where(Entity.file_path == str(file_path)), load)
+        return found[0] if found else None
+
+    async def find_link_candidates(self, text: str, load: EntityLoad = "full") -> Sequence[Entity]:
+        """Get every entity a link text could exactly match, in one query.
+
+        These are the entities whose permalink, title or file_path is the text, or whose
+        file_path is the text with .md added.
+
+        Args:
+            text: Normalized link text
+            load: How much of the entities to load
+        """
+        query = self.select().where(
+            or_(
+                Entity.permalink == text,
+                Entity.title == text,
+                Entity.file_path.in_([text, f"{text}.md"]),
+            )
+        )
+        return await self._find(query, load)
+
+    async def find_all(
+        self, skip: int = 0, limit: Optional[int] = None, load: EntityLoad = "full"
+    ) -> Sequence[Entity]:
+        """Fetch entities with pagination, loaded as the projection says."""
+        query = self.select().offset(skip)
+        if limit:
+            query = query.limit(limit)
+        return await self._find(query, load)
+
+    async def find_by_ids(self, ids: List[int], load: EntityLoad = "full") -> Sequence[Entity]:
+        """Fetch multiple entities by their ids in a single query."""
+        return await self._find(self.select().where(Entity.id.in_(ids)), load)
+
+    async def find_hubs(self, limit: int = 10, load: EntityLoad = "summary") -> Sequence[Entity]:
+        """Get the entities with the most relations, incoming and outgoing.
+
+        Reads the link counters in order through ix_entity_link_count, so only the
+        returned entities are visited.
+
+        Args:
+            limit: Maximum number of entities to return
+            load: How much of the entities to load
+        """
+        link_count = Entity.in_degree + Entity.out_degree
+        query = (
+            self.select().where(link_count > 0).order_by(link_count.desc(), Entity.id).limit(limit)
+        )
+        return await self._find(query, load)
+
+    async def find_orphans(
+        self, skip: int = 0, limit: Optional[int] = None, load: EntityLoad = "summary"
+    ) -> Sequence[Entity]:
+        """Get the entities with no relations to or from them, by id.
+
+        The project's orphans are read in id order through the partial index
+        ix_entity_orphan, which holds only entities without links.
+
+        Args:
+            skip: Number of orphans to skip
+            limit: Maximum number of entities to return
+            load: How much of the entities to load
         """
         query = (
             self.select()
-            .where(Entity.file_path == str(file_path))
-            .options(*self.get_load_options())
+            .where(Entity.in_degree == 0, Entity.out_degree == 0)
+            .order_by(Entity.id)
+            .offset(skip)
         )
-        return await self.find_one(query)
+        if limit:
+            query = query.limit(limit)
+        return await self._find(query, load)
 
     async def delete_by_file_path(self, file_path: Union[Path, str]) -> bool:
         """Delete entity with the provided file_path.
@@ -67,6 +156,98 @@ class EntityRepository(Repository[Entity]):
         """
         return await self.delete_by_fields(file_path=str(file_path))
 
+    async def delete(self, entity_id: int) -> bool:
+        deleted = await super().delete(entity_id)
+        if deleted:
+            # the entity's relations are deleted with it
+            self.graph_cache.changed(
+                self.session_maker, lambda graph: graph.remove_entities([entity_id])
+            )
+        return deleted
+
+    async def delete_by_ids(self, ids: List[int]) -> int:
+        deleted = await super().delete_by_ids(ids)
+        self.graph_cache.changed(self.session_maker, lambda graph: graph.remove_entities(ids))
+        return deleted
+
+    async def delete_by_fields(self, **filters: Any) -> bool:
+        deleted = await super().delete_by_fields(**filters)
+        if deleted:
+            self.graph_cache.changed(self.session_maker)
+        return deleted
+
+    async def find_file_states(self) -> Sequence[Row]:
+        """Get file_path, checksum and recorded file stat values for every entity.
+
+        Only these columns are selected, so no relationships are loaded.
+        """
+        query = self.select(
+            Entity.file_path,
+            Entity.checksum,
+            Entity.file_size,
+            Entity.file_mtime_ns,
+            Entity.file_inode,
+        )
+        result = await self.execute_query(query, use_query_options=False)
+        return result.all()
+
+    async def find_link_targets(self) -> Sequence[Row]:
+        """Get id, title, permalink and file_path for every entity, for resolving links in bulk."""
+        query = self.select(Entity.id, Entity.title, Entity.permalink, Entity.file_path)
+        result = await self.execute_query(query, use_query_options=False)
+        return result.all()
+
+    async def find_names_by_ids(self, ids: Iterable[Optional[int]]) -> Dict[int, Row]:
+        """Get the id, title and permalink of entities by id, in one query.
+
+        Only these columns are selected, so no relationships are loaded. None and ids
+        not found are left out.
+
+        Args:
+            ids: Ids of the entities, repeats are looked up once
+        """
+        entity_ids = {entity_id for entity_id in ids if entity_id is not None}
+        if not entity_ids:
+            return {}
+        query = self.select(Entity.id, Entity.title, Entity.permalink).where(
+            Entity.id.in_(entity_ids)
+        )
+        result = await self.execute_query(query, use_query_options=False)
+        return {row.id: row for row in result.all()}
+
+    async def update_file_stats(self, file_stats: Dict[str, Dict[str, Any]]) -> None:
+        """Update recorded file stat values for many entities in one transaction.
+
+        Args:
+            file_stats: Mapping of file_path to file_size, file_mtime_ns and file_inode values
+        """
+        if not file_stats:
+            return
+
+        table = cast(Table, Entity.__table__)
+        query = (
+            update(table)
+            .where(table.c.file_path == bindparam("b_file_path"))
+            .where(table.c.project_id == self.project_id)
+            .values(
+                file_size=bindparam("b_file_size"),
+                file_mtime_ns=bindparam("b_file_mtime_ns"),
+                file_inode=bindparam("b_file_inode"),
+            )
+        )
+        params = [
+            {
+                "b_file_path": file_path,
+                "b_file_size": stats["file_size"],
+                "b_file_mtime_ns": stats["file_mtime_ns"],
+                "b_file_inode": stats["file_inode"],
+            }
+            for file_path, stats in file_stats.items()
+        ]
+        async with db.scoped_session(self.session_maker) as session:
+            # a core (table) update with a list of params runs as a single executemany
+            await session.execute(query, params)
+
     def get_load_options(self) -> List[LoaderOption]:
         """Get SQLAlchemy loader options for eager loading relationships."""
         return [
@@ -79,6 +260,39 @@ class EntityRepository(Repository[Entity]):
             selectinload(Entity.incoming_relations).selectinload(Relation.to_entity),
         ]
 
+    def get_projection_options(self, load: EntityLoad) -> List[LoaderOption]:
+        """Get loader options for a projection, see EntityLoad."""
+        if load == "full":
+            return self.get_load_options()
+        if load == "summary":
+            return [raiseload("*")]
+        return [load_only(Entity.id, raiseload=True), raiseload("*")]
+
+    def get_index_load_options(self) -> List[LoaderOption]:
+        """Get loader options for what search indexing reads: observations and outgoing relations."""
+        return [
+            selectinload(Entity.observations).selectinload(Observation.entity),
+            selectinload(Entity.outgoing_relations).selectinload(Relation.from_entity),
+            selectinload(Entity.outgoing_relations).selectinload(Relation.to_entity),
+        ]
+
+    async def find_page_for_index(self, after_id: int, limit: int) -> Sequence[Entity]:
+        """Get the next page of entities ordered by id, loaded for search indexing.
+
+        Args:
+            after_id: Only entities with a greater id are returned
+            limit: Maximum number of entities to return
+        """
+        query = (
+            self.select()
+            .where(Entity.id > after_id)
+            .order_by(Entity.id)
+            .limit(limit)
+            .options(*self.get_index_load_options())
+        )
+        result = await self.execute_query(query, use_query_options=False)
+        return result.scalars().all()
+
     async def find_by_permalinks(self, permalinks: List[str]) -> Sequence[Entity]:
         """Find multiple entities by their permalink.
 
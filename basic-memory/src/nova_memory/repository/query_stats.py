@@ -0,0 +1,206 @@
+"""Latency statistics of database queries, by query shape."""
+
+import math
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from nova_memory import db
+from nova_memory.schemas.query_stats import QueryShapeStats, QueryStatsReport, SlowQuery
+
+# Upper bounds in seconds of the latency histogram buckets, from 0.1 ms to 105 s. Each
+# is 2^(1/4) times the one before, so percentiles are within 19% of the exact latency
+LATENCY_BUCKETS = tuple(0.0001 * 2 ** (i / 4) for i in range(81))
+
+# Default seconds a query takes to be logged as slow
+SLOW_QUERY_SECONDS = 0.5
+
+# Maximum number of slow queries kept, the most recent ones
+SLOW_QUERY_LOG_SIZE = 50
+
+# Minimum seconds between writes of the stats to the status file
+STATUS_WRITE_INTERVAL = 10.0
+
+# Plan of a slow record without a statement, which there is no query plan of
+NOT_EXPLAINED = "not explained: no statement, work done around several queries"
+
+
+class LatencyHistogram:
+    """Histogram of the latencies of one query shape, with the rows they returned.
+
+    Latencies are counted in LATENCY_BUCKETS, so memory stays constant however many
+    queries run.
+    """
+
+    def __init__(self):
+        # the last bucket counts the latencies above the last bound
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float, rows: int) -> None:
+        """Count a query that took seconds and returned rows."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.rows += rows
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Seconds within which the fraction of queries ran, the bound of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(fraction * self.count), 1)
+        seen = 0
+        for i, count in enumerate(self.counts[:-1]):
+            seen += count
+            if seen >= rank:
+                return min(LATENCY_BUCKETS[i], self.max_seconds)
+        return self.max_seconds
+
+    def stats(self, shape: str) -> QueryShapeStats:
+        """Percentiles of the latencies, in milliseconds."""
+        return QueryShapeStats(
+            shape=shape,
+            count=self.count,
+            rows=self.rows,
+            mean_ms=self.total_seconds * 1000 / self.count if self.count else 0.0,
+            p50_ms=self.percentile(0.50) * 1000,
+            p95_ms=self.percentile(0.95) * 1000,
+            p99_ms=self.percentile(0.99) * 1000,
+            max_ms=self.max_seconds * 1000,
+        )
+
+
+class QueryStats:
+    """Latency histograms of queries by shape, and a log of the slow ones.
+
+    A shape names what a query does without its values, like the SearchShape of a
+    search, so alike queries add up in one histogram. Queries taking at least
+    slow_query_seconds are logged as slow with their SQL, parameters and query plan.
+    If status_path is set, the stats are written there every STATUS_WRITE_INTERVAL
+    seconds for the stats command, which runs in another process.
+    """
+
+    def __init__(
+        self,
+        slow_query_seconds: Optional[float] = SLOW_QUERY_SECONDS,
+        slow_query_log_size: int = SLOW_QUERY_LOG_SIZE,
+    ):
+        self.slow_query_seconds = slow_query_seconds
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.slow_queries: Deque[SlowQuery] = deque(maxlen=slow_query_log_size)
+        self.status_path: Optional[Path] = None
+        self.written_at: Optional[float] = None
+
+    async def record(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        shape: str,
+        statement: Optional[Any],
+        params: Mapping[str, Any],
+        seconds: float,
+        rows: int,
+    ) -> None:
+        """Record a query of a shape that took seconds and returned rows.
+
+        The query plan of a slow query is explained in a session of its own, after
+        the query ran, so it doesn't hold up the session the query ran in. The
+        statement is None for work done in Python around several queries, which is
+        logged without SQL and with NOT_EXPLAINED as its plan.
+        """
+        histogram = self.histograms.get(shape)
+        if histogram is None:
+            histogram = self.histograms[shape] = LatencyHistogram()
+        histogram.add(seconds, rows)
+
+        if self.slow_query_seconds is not None and seconds >= self.slow_query_seconds:
+            if statement is None:
+                sql, plan = "", [NOT_EXPLAINED]
+            else:
+                sql = str(statement)
+                plan = await self._explain(session_maker, sql, params)
+            logger.warning(
+                f"Slow query {shape}: {seconds * 1000:.1f} ms, {rows} rows, "
+                f"plan: {' | '.join(plan)}"
+            )
+            self.slow_queries.append(
+                SlowQuery(
+                    shape=shape,
+                    sql=sql,
+                    params={key: _loggable(value) for key, value in params.items()},
+                    plan=plan,
+                    elapsed_ms=seconds * 1000,
+                    rows=rows,
+                    recorded_at=datetime.now(timezone.utc),
+                )
+            )
+
+        if self.status_path and (
+            self.written_at is None or time.monotonic() - self.written_at >= STATUS_WRITE_INTERVAL
+        ):
+            self.write_status()
+
+    @staticmethod
+    async def _explain(
+        session_maker: async_sessionmaker[AsyncSession], sql: str, params: Mapping[str, Any]
+    ) -> List[str]:
+        """Query plan of a statement, one line per step."""
+        try:
+            async with db.scoped_session(session_maker) as session:
+                result = await session.execute(text(f"EXPLAIN QUERY PLAN {sql}"), dict(params))
+                return [row.detail for row in result]
+        except Exception as e:  # pragma: no cover
+            return [f"unavailable: {e}"]
+
+    def report(self) -> QueryStatsReport:
+        """Latencies of each query shape, most total time first, and the slow queries."""
+        ordered = sorted(
+            self.histograms.items(), key=lambda item: item[1].total_seconds, reverse=True
+        )
+        return QueryStatsReport(
+            shapes=[histogram.stats(shape) for shape, histogram in ordered],
+            slow_queries=list(self.slow_queries),
+            slow_query_ms=self.slow_query_seconds * 1000
+            if self.slow_query_seconds is not None
+            else None,
+            generated_at=datetime.now(timezone.utc),
+        )
+
+    def write_status(self) -> None:
+        """Write the report to the status file, if there is one."""
+        if not self.status_path:
+            return
+        self.written_at = time.monotonic()
+        try:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            self.status_path.write_text(self.report().model_dump_json(indent=2), encoding="utf-8")
+        except Exception as e:  # pragma: no cover
+            logger.warning(f"Failed to write query stats to {self.status_path}: {e}")
+
+    def reset(self) -> None:
+        """Forget all recorded queries."""
+        self.histograms.clear()
+        self.slow_queries.clear()
+
+
+def _loggable(value: Any) -> Any:
+    """Query parameter as a JSON value for the slow query log."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return repr(value)
+
+
+# Stats of all the queries of the process, shared by the repositories created per request
+query_stats = QueryStats()
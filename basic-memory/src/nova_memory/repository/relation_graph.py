@@ -0,0 +1,256 @@
+"""In-memory adjacency of a project's entities through their relations."""
+
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from nova_memory import db
+
+# Seconds a loaded graph is used before it is loaded again, so writes made by other
+# processes, which don't update this process's graphs, are seen within this time
+RELATION_GRAPH_TTL = 30.0
+
+# Minimum number of relations added or removed since the arrays were built before they
+# are rebuilt, which they are once the changes reach a quarter of the relations
+RELATION_GRAPH_COMPACT_SIZE = 1024
+
+# (relation id, from entity id, to entity id or None when unresolved)
+Edge = Tuple[int, int, Optional[int]]
+
+
+class RelationGraph:
+    """The relations of a project's entities as an adjacency structure.
+
+    Relations are stored in compressed sparse row form: the slots of the relations
+    of the entity at index i of entity_index, incoming and outgoing, are
+    edges[offsets[i]:offsets[i + 1]], and a slot indexes relation_ids, relation_from
+    and relation_to, which are sorted by relation id. Unresolved relations, which
+    have no to entity, are stored with a to id of -1.
+
+    Relations added since the arrays were built are kept in a dict per entity, and
+    removed ones in a set, so writes don't rebuild the arrays every time.
+    """
+
+    def __init__(self, edges: Iterable[Edge] = ()):
+        self._build(edges)
+
+    def _build(self, edges: Iterable[Edge]) -> None:
+        """Build the arrays from the edges, forgetting the changes since the last build."""
+        self.relation_ids = array("q")
+        self.relation_from = array("q")
+        self.relation_to = array("q")
+        slots: Dict[int, List[int]] = defaultdict(list)
+        for slot, (relation_id, from_id, to_id) in enumerate(sorted(edges)):
+            self.relation_ids.append(relation_id)
+            self.relation_from.append(from_id)
+            self.relation_to.append(-1 if to_id is None else to_id)
+            slots[from_id].append(slot)
+            if to_id is not None and to_id != from_id:
+                slots[to_id].append(slot)
+
+        self.entity_index: Dict[int, int] = {}
+        self.offsets = array("q", [0])
+        self.edges = array("q")
+        for index, (entity_id, entity_slots) in enumerate(slots.items()):
+            self.entity_index[entity_id] = index
+            self.edges.extend(entity_slots)
+            self.offsets.append(len(self.edges))
+
+        self.added: Dict[int, Edge] = {}
+        self.added_by_entity: Dict[int, List[int]] = defaultdict(list)
+        self.removed: Set[int] = set()
+
+    def __len__(self) -> int:
+        """Number of relations in the graph."""
+        return len(self.relation_ids) - len(self.removed) + len(self.added)
+
+    def neighbors(self, entity_id: int) -> Iterator[Edge]:
+        """The relations from or to an entity, each once even if it points to itself."""
+        index = self.entity_index.get(entity_id)
+        if index is not None:
+            for slot in self.edges[self.offsets[index] : self.offsets[index + 1]]:
+                relation_id = self.relation_ids[slot]
+                if relation_id not in self.removed:
+                    to_id = self.relation_to[slot]
+                    yield relation_id, self.relation_from[slot], None if to_id < 0 else to_id
+        for relation_id in self.added_by_entity.get(entity_id, ()):
+            yield self.added[relation_id]
+
+    def add_relations(self, edges: Iterable[Edge]) -> None:
+        """Add relations, replacing those with the same id."""
+        edges = list(edges)
+        self.remove_relations(relation_id for relation_id, _, _ in edges)
+        for edge in edges:
+            relation_id, from_id, to_id = edge
+            self.added[relation_id] = edge
+            self.added_by_entity[from_id].append(relation_id)
+            if to_id is not None and to_id != from_id:
+                self.added_by_entity[to_id].append(relation_id)
+        self._compact_if_needed()
+
+    def remove_relations(self, relation_ids: Iterable[int]) -> None:
+        """Remove relations by id, ignoring those not in the graph."""
+        for relation_id in relation_ids:
+            edge = self.added.pop(relation_id, None)
+            if edge is not None:
+                for entity_id in {edge[1], edge[2]} - {None}:
+                    self.added_by_entity[entity_id].remove(relation_id)
+                    if not self.added_by_entity[entity_id]:
+                        del self.added_by_entity[entity_id]
+            elif self._built(relation_id):
+                self.removed.add(relation_id)
+        self._compact_if_needed()
+
+    def _built(self, relation_id: int) -> bool:
+        """Whether a relation is in the arrays, which are sorted by relation id."""
+        slot = bisect_left(self.relation_ids, relation_id)
+        return slot < len(self.relation_ids) and self.relation_ids[slot] == relation_id
+
+    def remove_outgoing(self, entity_id: int) -> None:
+        """Remove the relations from an entity."""
+        self.remove_relations(
+            [edge[0] for edge in self.neighbors(entity_id) if edge[1] == entity_id]
+        )
+
+    def remove_entities(self, entity_ids: Iterable[int]) -> None:
+        """Remove the relations from or to entities, which deleting them cascades to."""
+        self.remove_relations(
+            [edge[0] for entity_id in entity_ids for edge in self.neighbors(entity_id)]
+        )
+
+    def _compact_if_needed(self) -> None:
+        """Rebuild the arrays once the changes since they were built grow too many."""
+        changes = len(self.added) + len(self.removed)
+        if changes >= max(RELATION_GRAPH_COMPACT_SIZE, len(self.relation_ids) // 4):
+            self._build(self._edges())
+
+    def _edges(self) -> Iterator[Edge]:
+        """Every relation in the graph."""
+        for slot, relation_id in enumerate(self.relation_ids):
+            if relation_id not in self.removed:
+                to_id = self.relation_to[slot]
+                yield relation_id, self.relation_from[slot], None if to_id < 0 else to_id
+        yield from self.added.values()
+
+    @classmethod
+    async def load(
+        cls, session_maker: async_sessionmaker[AsyncSession], project_id: int
+    ) -> "RelationGraph":
+        """Load the relations from the entities of a project."""
+        start = time.perf_counter()
+        async with db.scoped_session(session_maker) as session:
+            result = await session.execute(
+                text("""
+                    SELECT r.id, r.from_id, r.to_id
+                    FROM relation r
+                    JOIN entity e ON e.id = r.from_id
+                    WHERE e.project_id = :project_id
+                    ORDER BY r.id
+                """),
+                {"project_id": project_id},
+            )
+            graph = cls(result.tuples())
+        logger.debug(
+            f"Loaded relation graph of project {project_id}: {len(graph)} relations "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        return graph
+
+
+class RelationGraphCache:
+    """The relation graph of a project, loaded when first used and updated by writes.
+
+    Writes through RelationRepository and EntityRepository change the loaded graph as
+    they happen. Inside a batch_session block the graph is dropped if the batch rolls
+    back. A write that can't say which relations it changed drops the graph, and it is
+    loaded again when next used.
+    """
+
+    def __init__(self, ttl: float = RELATION_GRAPH_TTL):
+        self.ttl = ttl
+        self.graph: Optional[RelationGraph] = None
+        self.expires_at = 0.0
+        # bumped by every write, so a graph loaded while one happened isn't kept
+        self.version = 0
+
+    async def get(
+        self, session_maker: async_sessionmaker[AsyncSession], project_id: int
+    ) -> RelationGraph:
+        """The graph of the project, loaded if it isn't already or has expired."""
+        if self.graph is not None and time.monotonic() < self.expires_at:
+            return self.graph
+
+        version = self.version
+        graph = await RelationGraph.load(session_maker, project_id)
+        if self.version == version:
+            self.graph, self.expires_at = graph, time.monotonic() + self.ttl
+        return graph
+
+    def changed(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        change: Optional[Callable[[RelationGraph], None]] = None,
+    ) -> None:
+        """Apply a change written through session_maker to the loaded graph.
+
+        Without a change the graph is dropped instead.
+        """
+        self.version += 1
+        if change is None:
+            self.invalidate()
+        elif self.graph is not None:
+            change(self.graph)
+
+        session = db.current_batch_session(session_maker)
+        if session is not None:
+            self._track_transaction(session)
+
+    def _track_transaction(self, session: AsyncSession) -> None:
+        """Drop the graph if the batch transaction rolls back, once per transaction.
+
+        The version is bumped when the transaction ends too, because a graph loaded
+        before a batch commits or rolls back holds what it saw at the time.
+        """
+        key = ("relation_graph", id(self))
+        sync_session = session.sync_session
+        if key in sync_session.info:
+            return
+        sync_session.info[key] = True
+
+        def ended(*args):
+            sync_session.info.pop(key, None)
+            self.version += 1
+
+        event.listen(sync_session, "after_rollback", lambda *args: self.invalidate(), once=True)
+        event.listen(sync_session, "after_transaction_end", ended, once=True)
+
+    def invalidate(self) -> None:
+        """Drop the loaded graph."""
+        self.version += 1
+        self.graph = None
+
+
+# Relation graphs by project, one set per database, shared by the repositories of requests
+_graph_caches: WeakKeyDictionary[
+    async_sessionmaker[AsyncSession], Dict[int, RelationGraphCache]
+] = WeakKeyDictionary()
+
+
+def get_relation_graph_cache(
+    session_maker: async_sessionmaker[AsyncSession], project_id: int
+) -> RelationGraphCache:
+    """Get the relation graph cache of a project in the database session_maker connects to."""
+    caches = _graph_caches.get(session_maker)
+    if caches is None:
+        caches = _graph_caches[session_maker] = {}
+    cache = caches.get(project_id)
+    if cache is None:
+        cache = caches[project_id] = RelationGraphCache()
+    return cache
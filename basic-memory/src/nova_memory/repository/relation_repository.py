@@ -1,7 +1,7 @@
 """Repository for managing Relation objects."""
 
-from sqlalchemy import and_, delete
-from typing import Sequence, List, Optional
+from sqlalchemy import Row, Table, and_, bindparam, delete, update
+from typing import Any, Callable, Dict, Sequence, List, Optional, Tuple, cast
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import async_sessionmaker
@@ -10,6 +10,7 @@ from sqlalchemy.orm.interfaces import LoaderOption
 
 from nova_memory import db
 from nova_memory.models import Relation, Entity
+from nova_memory.repository.relation_graph import RelationGraph, get_relation_graph_cache
 from nova_memory.repository.repository import Repository
 
 
@@ -24,6 +25,59 @@ class RelationRepository(Repository[Relation]):
             project_id: Project ID to filter all operations by
         """
         super().__init__(session_maker, Relation, project_id=project_id)
+        self.graph_cache = get_relation_graph_cache(session_maker, project_id)
+
+    def _graph_changed(self, change: Optional[Callable[[RelationGraph], None]] = None) -> None:
+        """Apply a write to the project's relation graph, or drop it without a change."""
+        self.graph_cache.changed(self.session_maker, change)
+
+    def _graph_added(self, relations: Sequence[Relation]) -> None:
+        """Add written relations to the project's relation graph."""
+        edges = [(relation.id, relation.from_id, relation.to_id) for relation in relations]
+        self._graph_changed(lambda graph: graph.add_relations(edges))
+
+    async def add(self, model: Relation) -> Relation:
+        relation = await super().add(model)
+        self._graph_added([relation])
+        return relation
+
+    async def add_all(self, models: List[Relation]) -> Sequence[Relation]:
+        relations = await super().add_all(models)
+        self._graph_added(relations)
+        return relations
+
+    async def create(self, data: dict) -> Relation:
+        relation = await super().create(data)
+        self._graph_added([relation])
+        return relation
+
+    async def create_all(self, data_list: List[dict]) -> Sequence[Relation]:
+        relations = await super().create_all(data_list)
+        self._graph_added(relations)
+        return relations
+
+    async def update(self, entity_id: int, entity_data: dict | Relation) -> Optional[Relation]:
+        relation = await super().update(entity_id, entity_data)
+        if relation is not None:
+            self._graph_added([relation])
+        return relation
+
+    async def delete(self, entity_id: int) -> bool:
+        deleted = await super().delete(entity_id)
+        if deleted:
+            self._graph_changed(lambda graph: graph.remove_relations([entity_id]))
+        return deleted
+
+    async def delete_by_ids(self, ids: List[int]) -> int:
+        deleted = await super().delete_by_ids(ids)
+        self._graph_changed(lambda graph: graph.remove_relations(ids))
+        return deleted
+
+    async def delete_by_fields(self, **filters: Any) -> bool:
+        deleted = await super().delete_by_fields(**filters)
+        if deleted:
+            self._graph_changed()
+        return deleted
 
     async def find_relation(
         self, from_permalink: str, to_permalink: str, relation_type: str
@@ -58,6 +112,23 @@ class RelationRepository(Repository[Relation]):
         result = await self.execute_query(query)
         return result.scalars().all()
 
+    async def find_backlinks(
+        self, entity_id: int, skip: int = 0, limit: Optional[int] = None
+    ) -> Sequence[Relation]:
+        """Find the relations to an entity, with the entities they come from, by id.
+
+        Args:
+            entity_id: Entity the relations point to
+            skip: Number of relations to skip
+            limit: Maximum number of relations to return
+        """
+        query = select(Relation).where(Relation.to_id == entity_id).order_by(Relation.id)
+        query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+        result = await self.execute_query(query)
+        return result.scalars().all()
+
     async def delete_outgoing_relations_from_entity(self, entity_id: int) -> None:
         """Delete outgoing relations for an entity.
 
@@ -66,6 +137,7 @@ class RelationRepository(Repository[Relation]):
         """
         async with db.scoped_session(self.session_maker) as session:
             await session.execute(delete(Relation).where(Relation.from_id == entity_id))
+        self._graph_changed(lambda graph: graph.remove_outgoing(entity_id))
 
     async def find_unresolved_relations(self) -> Sequence[Relation]:
         """Find all unresolved relations, where to_id is null."""
@@ -73,5 +145,52 @@ class RelationRepository(Repository[Relation]):
         result = await self.execute_query(query)
         return result.scalars().all()
 
+    async def find_unresolved_references(self) -> Sequence[Row]:
+        """Get from_id and to_name of every unresolved relation from an entity in this project.
+
+        Only these columns are selected, so no relationships are loaded.
+        """
+        query = (
+            select(Relation.from_id, Relation.to_name)
+            .join(Entity, Relation.from_id == Entity.id)
+            .where(Relation.to_id.is_(None), Entity.project_id == self.project_id)
+        )
+        result = await self.execute_query(query, use_query_options=False)
+        return result.all()
+
+    async def resolve_references(self, targets: Dict[str, Tuple[int, str]]) -> None:
+        """Point unresolved relations at the entities their names resolved to.
+
+        Every unresolved relation from an entity in this project whose to_name is a key
+        of targets gets that entity's id and title, in one executemany UPDATE. References
+        to the relation's own source entity are left unresolved. A relation whose update
+        would duplicate an existing relation is skipped and stays unresolved.
+
+        Args:
+            targets: Mapping of to_name to the (id, title) of the entity it resolved to
+        """
+        if not targets:
+            return
+
+        table = cast(Table, Relation.__table__)
+        project_entities = select(Entity.id).where(Entity.project_id == self.project_id)
+        query = (
+            update(table)
+            .prefix_with("OR IGNORE")
+            .where(table.c.to_id.is_(None))
+            .where(table.c.to_name == bindparam("b_to_name"))
+            .where(table.c.from_id != bindparam("b_to_id"))
+            .where(table.c.from_id.in_(project_entities))
+            .values(to_id=bindparam("b_to_id"), to_name=bindparam("b_title"))
+        )
+        params = [
+            {"b_to_name": to_name, "b_to_id": to_id, "b_title": title}
+            for to_name, (to_id, title) in targets.items()
+        ]
+        async with db.scoped_session(self.session_maker) as session:
+            await session.execute(query, params)
+        # which relations the update resolved isn't returned, so the graph is loaded again
+        self._graph_changed()
+
     def get_load_options(self) -> List[LoaderOption]:
         return [selectinload(Relation.from_entity), selectinload(Relation.to_entity)]
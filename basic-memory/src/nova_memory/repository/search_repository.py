@@ -1,18 +1,539 @@
 """Repository for search operations."""
 
+import asyncio
+import base64
+import hashlib
 import json
+import math
+import operator
 import time
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from array import array
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+)
+from weakref import WeakKeyDictionary
 
 from loguru import logger
-from sqlalchemy import Executable, Result, text
+from sqlalchemy import Executable, Result, TextClause, event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from nova_memory import db
-from nova_memory.models.search import CREATE_SEARCH_INDEX
-from nova_memory.schemas.search import SearchItemType
+from nova_memory.config import DEFAULT_SEARCH_COLUMN_WEIGHTS
+from nova_memory.models.search import (
+    CREATE_SEARCH_FILTER,
+    CREATE_SEARCH_FILTER_INDEXES,
+    CREATE_SEARCH_FILTER_SHADOW,
+    CREATE_SEARCH_INDEX,
+    CREATE_SEARCH_INDEX_CHECKPOINT,
+    CREATE_SEARCH_INDEX_SHADOW,
+    CREATE_SEARCH_TRIGRAM,
+    CREATE_SEARCH_TRIGRAM_SHADOW,
+    CREATE_SEARCH_VECTOR,
+    SEARCH_FILTER_SHADOW_TABLE,
+    SEARCH_FILTER_TABLE,
+    SEARCH_INDEX_SHADOW_TABLE,
+    SEARCH_INDEX_TABLE,
+    SEARCH_TRIGRAM_SHADOW_TABLE,
+    SEARCH_TRIGRAM_TABLE,
+)
+from nova_memory.repository.query_stats import query_stats
+from nova_memory.schemas.search import ReindexProgress, SearchCacheStats, SearchItemType
+
+# search_index columns that are tokenized for full-text search, in table order
+INDEXED_COLUMNS = ("title", "content_stems", "content_snippet", "permalink")
+
+# Number of tokens in the snippet of a text search result, around the matches
+SNIPPET_TOKENS = 32
+
+# Maximum length of the content returned with a search result
+SNIPPET_LENGTH = 250
+
+# search_index columns stored alongside, cheap to update in place
+UNINDEXED_COLUMNS = (
+    "id",
+    "file_path",
+    "type",
+    "metadata",
+    "from_id",
+    "to_id",
+    "relation_type",
+    "entity_id",
+    "category",
+    "created_at",
+    "updated_at",
+    "project_id",
+)
+
+# Maximum number of search results kept in the result cache of a database
+SEARCH_CACHE_SIZE = 512
+
+# Seconds a cached search result is used for, bounding how long a write made by
+# another process, which doesn't invalidate this process's cache, can go unseen
+SEARCH_CACHE_TTL = 30.0
+
+# Maximum number of planned search statements kept, one per query shape
+SEARCH_STATEMENT_CACHE_SIZE = 256
+
+# Maximum number of prepared search terms kept
+SEARCH_TERM_CACHE_SIZE = 1024
+
+# Maximum number of permalinks bound in one DELETE ... IN (...) statement
+DELETE_CHUNK_SIZE = 500
+
+# Insert statement, formatted with the table name
+INSERT_ROW_SQL = """
+    INSERT INTO {table} (
+        id, title, content_stems, content_snippet, permalink, file_path, type, metadata,
+        from_id, to_id, relation_type,
+        entity_id, category,
+        created_at, updated_at,
+        project_id
+    ) VALUES (
+        :id, :title, :content_stems, :content_snippet, :permalink, :file_path, :type, :metadata,
+        :from_id, :to_id, :relation_type,
+        :entity_id, :category,
+        :created_at, :updated_at,
+        :project_id
+    )
+"""
+
+INSERT_SEARCH_INDEX_ROW = text(INSERT_ROW_SQL.format(table=SEARCH_INDEX_TABLE))
+INSERT_SEARCH_INDEX_SHADOW_ROW = text(INSERT_ROW_SQL.format(table=SEARCH_INDEX_SHADOW_TABLE))
+
+# Trigram table holding the substring-searchable text of each search index table's rows
+TRIGRAM_TABLES = {
+    SEARCH_INDEX_TABLE: SEARCH_TRIGRAM_TABLE,
+    SEARCH_INDEX_SHADOW_TABLE: SEARCH_TRIGRAM_SHADOW_TABLE,
+}
+
+# Trigram rows for search index rows, formatted with the table names: entity titles,
+# permalinks and file paths, relation titles and observation content
+INSERT_TRIGRAM_ROWS_SQL = f"""
+    INSERT INTO {{trigram_table}} (rowid, title, permalink, file_path, content)
+    SELECT
+        rowid,
+        CASE WHEN type != '{SearchItemType.OBSERVATION.value}' THEN title END,
+        CASE WHEN type = '{SearchItemType.ENTITY.value}' THEN permalink END,
+        CASE WHEN type = '{SearchItemType.ENTITY.value}' THEN file_path END,
+        CASE WHEN type = '{SearchItemType.OBSERVATION.value}' THEN content_snippet END
+    FROM {{table}}
+"""
+
+# Filter table holding the filterable columns of each search index table's rows
+FILTER_TABLES = {
+    SEARCH_INDEX_TABLE: SEARCH_FILTER_TABLE,
+    SEARCH_INDEX_SHADOW_TABLE: SEARCH_FILTER_SHADOW_TABLE,
+}
+
+# Filter rows for search index rows, formatted with the table names
+INSERT_FILTER_ROWS_SQL = """
+    INSERT INTO {filter_table} (row_id, project_id, type, entity_type, created_at)
+    SELECT
+        rowid,
+        project_id,
+        type,
+        json_extract(metadata, '$.entity_type'),
+        datetime(created_at)
+    FROM {table}
+"""
+
+# search_index joined to the filter columns of its rows, which searches filter by
+SEARCH_FROM = (
+    f"{SEARCH_INDEX_TABLE} JOIN {SEARCH_FILTER_TABLE} "
+    f"ON {SEARCH_FILTER_TABLE}.row_id = {SEARCH_INDEX_TABLE}.rowid"
+)
+
+
+# Columns of a search result, formatted with the content and score expressions
+SEARCH_RESULT_COLUMNS = """
+    search_index.rowid as rowid,
+    search_index.project_id as project_id,
+    id,
+    title,
+    permalink,
+    file_path,
+    search_index.type as type,
+    metadata,
+    from_id,
+    to_id,
+    relation_type,
+    entity_id,
+    {content} as content_snippet,
+    category,
+    search_index.created_at as created_at,
+    updated_at,
+    {score} as score
+"""
+
+
+def _unit_vector(vector: Sequence[float]) -> array:
+    """Vector scaled to unit length as float32 values, so a dot product is its cosine."""
+    norm = math.sqrt(sum(value * value for value in vector))
+    return array("f", (value / norm for value in vector) if norm else vector)
+
+
+def _nearest_vectors(
+    query_vector: array, candidates: Sequence[Tuple[int, bytes]], offset: int, limit: int
+) -> List[Tuple[float, int]]:
+    """Page of the (negated cosine similarity, entity_id) of the embeddings nearest to query_vector.
+
+    The embeddings are stored at unit length, so their dot product is the cosine. Embeddings
+    of another length, or with no similarity at all, are left out.
+    """
+    similarities = []
+    for entity_id, stored in candidates:
+        stored_vector = array("f")
+        stored_vector.frombytes(stored)
+        if len(stored_vector) != len(query_vector):
+            # embedded with other settings, until the entity is indexed again
+            continue
+        similarity = sum(map(operator.mul, query_vector, stored_vector))
+        if similarity > 0:
+            similarities.append((-similarity, entity_id))
+    return sorted(similarities)[offset : offset + limit]
+
+
+def _project_params(project_ids: Sequence[int]) -> Dict[str, int]:
+    """Bound parameters of the projects searched together, by parameter name."""
+    return {f"project_id_{i}": project_id for i, project_id in enumerate(project_ids)}
+
+
+def _placeholders(name: str, count: int) -> str:
+    """Placeholders of count parameters numbered after name, like :name_0, :name_1."""
+    return ", ".join(f":{name}_{i}" for i in range(count))
+
+
+class SearchFilters(TypedDict, total=False):
+    """Filters of a search, as passed to SearchRepository._search_filters and _cache_key."""
+
+    search_text: Optional[str]
+    permalink: Optional[str]
+    permalink_match: Optional[str]
+    title: Optional[str]
+    types: Optional[List[str]]
+    after_date: Optional[datetime]
+    search_item_types: Optional[List[SearchItemType]]
+
+
+@dataclass(frozen=True)
+class SearchShape:
+    """Shape of a search: which filters it has and how they match, not their values.
+
+    Searches of one shape run the same SQL with other parameters, so the statements
+    of each shape are planned once and reused. Reusing the statement skips building
+    and parsing the SQL again, and its identical text hits the compiled statement
+    caches of SQLAlchemy and of the SQLite driver.
+    """
+
+    text: Optional[str] = None  # "boolean", "terms" or "trigram"
+    title: bool = False
+    permalink: bool = False
+    permalink_match: Optional[str] = None  # "equal", "glob" or "match"
+    item_types: int = 0
+    types: int = 0
+    after_date: bool = False
+    projects: int = 0  # searched together, 0 for the repository's project
+
+    @property
+    def full_text(self) -> bool:
+        """Whether the search has a full-text match."""
+        return bool(self.text or self.title or self.permalink_match == "match")
+
+    def __str__(self) -> str:
+        """The filters of the shape, like "text=trigram types=2 after_date"."""
+        filters = []
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value != field.default:
+                filters.append(field.name if value is True else f"{field.name}={value}")
+        return " ".join(filters) or "unfiltered"
+
+
+@lru_cache(maxsize=SEARCH_STATEMENT_CACHE_SIZE)
+def _filter_clauses(shape: SearchShape, match_text: bool = True) -> Tuple[str, Tuple[str, ...]]:
+    """Plan the FROM clause and WHERE conditions of the searches of a shape.
+
+    Searches without a full-text match join the filter table, so its indexes drive
+    the query. A full-text match drives the query itself: FTS5 can't answer an OR
+    of MATCH terms inside a join, so each match looks up its filter row instead.
+    Without match_text, the condition matching the search text is left out, for
+    statements that match it themselves.
+    """
+    conditions = []
+    filter_conditions = []
+
+    if shape.text and match_text:
+        # One query over the title and content columns, so bm25 weighs them against each other
+        text_match = "search_index MATCH :text"
+        if shape.text == "trigram":
+            # also match substrings of titles, paths and observations, these rows
+            # score 0 so they rank after the rows matching whole tokens
+            conditions.append(
+                f"({text_match} OR {SEARCH_INDEX_TABLE}.rowid IN ("
+                f"SELECT rowid FROM {SEARCH_TRIGRAM_TABLE} "
+                f"WHERE {SEARCH_TRIGRAM_TABLE} MATCH :trigram_text))"
+            )
+        else:
+            conditions.append(text_match)
+
+    if shape.title:
+        conditions.append("title MATCH :title_text")
+
+    if shape.permalink:
+        conditions.append("permalink = :permalink")
+
+    if shape.permalink_match == "glob":
+        conditions.append("permalink GLOB :permalink")
+    elif shape.permalink_match == "match":
+        conditions.append("permalink MATCH :permalink")
+    elif shape.permalink_match == "equal":
+        conditions.append("permalink = :permalink")
+
+    if shape.item_types:
+        placeholders = _placeholders("search_item_type", shape.item_types)
+        filter_conditions.append(f"{SEARCH_FILTER_TABLE}.type IN ({placeholders})")
+
+    if shape.types:
+        placeholders = _placeholders("entity_type", shape.types)
+        filter_conditions.append(f"{SEARCH_FILTER_TABLE}.entity_type IN ({placeholders})")
+
+    # created_at is stored normalized by datetime() so it's indexed
+    if shape.after_date:
+        filter_conditions.append(f"{SEARCH_FILTER_TABLE}.created_at > datetime(:after_date)")
+
+    # Always filter by project
+    if shape.projects:
+        placeholders = _placeholders("project_id", shape.projects)
+        filter_conditions.append(f"{SEARCH_FILTER_TABLE}.project_id IN ({placeholders})")
+    else:
+        filter_conditions.append(f"{SEARCH_FILTER_TABLE}.project_id = :project_id")
+
+    if not shape.full_text:
+        return SEARCH_FROM, tuple(conditions + filter_conditions)
+
+    conditions.append(
+        f"EXISTS (SELECT 1 FROM {SEARCH_FILTER_TABLE} "
+        f"WHERE {SEARCH_FILTER_TABLE}.row_id = {SEARCH_INDEX_TABLE}.rowid "
+        f"AND {' AND '.join(filter_conditions)})"
+    )
+    return SEARCH_INDEX_TABLE, tuple(conditions)
+
+
+def _after_cursor(score: str, row_id: str, updated_at: Optional[str]) -> str:
+    """Condition of the rows after a cursor, in the order of search results."""
+    if updated_at:
+        after_tie = (
+            f"({updated_at} < :cursor_updated_at OR ({updated_at} = :cursor_updated_at "
+            f"AND {row_id} > :cursor_row_id))"
+        )
+    else:
+        after_tie = f"{row_id} > :cursor_row_id"
+    return f"({score} > :cursor_score OR ({score} = :cursor_score AND {after_tie}))"
+
+
+@lru_cache(maxsize=SEARCH_STATEMENT_CACHE_SIZE)
+def _search_statement(shape: SearchShape, rank: str, cursor: bool) -> TextClause:
+    """Plan the statement of a page of search results, ordered by rank then rowid.
+
+    With a cursor, the rows before it are filtered out where they are scored, before
+    they are sorted. A text search first picks the rowids and scores of the page,
+    matching whole tokens in one branch and, for a trigram search, the rows only
+    the trigram index matches in another, where they score 0. Snippets are then
+    only made for the rows of the page. FTS5 has no index on bm25, so every match
+    is still scored, but nothing else is computed for the rows outside the page.
+    """
+    source, conditions = _filter_clauses(shape)
+
+    # order by most recent first when filtering by date
+    order_by_clause = ", updated_at DESC" if shape.after_date else ""
+
+    # the content column is 3, after id, title and content_stems. Rows only matched
+    # through the trigram index get the whole column as snippet, hence the substr
+    if shape.text:
+        content = (
+            "substr(snippet(search_index, 3, :highlight_start, :highlight_end, '...', "
+            ":snippet_tokens), 1, :snippet_length * 2)"
+        )
+    else:
+        content = "substr(content_snippet, 1, :snippet_length)"
+
+    if cursor and not shape.text:
+        updated_at = "updated_at" if shape.after_date else None
+        conditions += (_after_cursor(rank, f"{SEARCH_INDEX_TABLE}.rowid", updated_at),)
+
+    if not (cursor and shape.text):
+        return text(f"""
+            SELECT {SEARCH_RESULT_COLUMNS.format(content=content, score=rank)}
+            FROM {source}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY score ASC {order_by_clause}, search_index.rowid ASC
+            LIMIT :limit
+            OFFSET :offset
+        """)
+
+    _, filter_conditions = _filter_clauses(shape, match_text=False)
+    filters = "".join(f" AND {condition}" for condition in filter_conditions)
+    updated_at = f"{SEARCH_INDEX_TABLE}.updated_at" if shape.after_date else None
+    row_id = f"{SEARCH_INDEX_TABLE}.rowid"
+    branches = [
+        f"""
+        SELECT {row_id} AS row_id, {rank} AS score, updated_at AS updated, 0 AS trigram_only
+        FROM {SEARCH_INDEX_TABLE}
+        WHERE {SEARCH_INDEX_TABLE} MATCH :text{filters}
+            AND {_after_cursor(rank, row_id, updated_at)}
+        """
+    ]
+    if shape.text == "trigram":
+        branches.append(f"""
+        SELECT {row_id}, 0, updated_at, 1
+        FROM {SEARCH_INDEX_TABLE}
+        WHERE {row_id} IN (
+                SELECT rowid FROM {SEARCH_TRIGRAM_TABLE}
+                WHERE {SEARCH_TRIGRAM_TABLE} MATCH :trigram_text
+            )
+            AND {row_id} NOT IN (
+                SELECT rowid FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH :text
+            ){filters}
+            AND {_after_cursor("0", row_id, updated_at)}
+        """)
+    page_order = "score ASC, updated DESC" if shape.after_date else "score ASC"
+    trigram_content = "substr(content_snippet, 1, :snippet_length * 2)"
+    # CROSS JOIN keeps the page the outer loop, so its rows are looked up by rowid
+    return text(f"""
+        WITH page AS MATERIALIZED (
+            SELECT * FROM ({" UNION ALL ".join(branches)})
+            ORDER BY {page_order}, row_id ASC
+            LIMIT :limit
+            OFFSET :offset
+        )
+        SELECT {SEARCH_RESULT_COLUMNS.format(content=content, score="page.score")}
+        FROM page CROSS JOIN {SEARCH_INDEX_TABLE} ON {row_id} = page.row_id
+        WHERE {SEARCH_INDEX_TABLE} MATCH :text AND NOT page.trigram_only
+        UNION ALL
+        SELECT {SEARCH_RESULT_COLUMNS.format(content=trigram_content, score="page.score")}
+        FROM page CROSS JOIN {SEARCH_INDEX_TABLE} ON {row_id} = page.row_id
+        WHERE page.trigram_only
+        ORDER BY score ASC {order_by_clause}, rowid ASC
+    """)
+
+
+@lru_cache(maxsize=SEARCH_STATEMENT_CACHE_SIZE)
+def _best_entity_statement(rank: str) -> TextClause:
+    """Plan the statement finding the best entity match of each of many texts.
+
+    Each text is matched like a text search of entities, by its MATCH query ranked by
+    rank, or else by its trigram query scoring 0, and the match ranked first is kept.
+    """
+    entity = SearchItemType.ENTITY.value
+    return text(f"""
+        WITH texts AS MATERIALIZED (
+            SELECT
+                json_extract(value, '$.key') AS key,
+                json_extract(value, '$.text') AS text,
+                json_extract(value, '$.trigram_text') AS trigram_text
+            FROM json_each(:texts)
+        ),
+        matches AS MATERIALIZED (
+            SELECT texts.key AS key, {SEARCH_INDEX_TABLE}.rowid AS row_id, permalink,
+                {rank} AS score
+            FROM texts JOIN {SEARCH_INDEX_TABLE} ON {SEARCH_INDEX_TABLE} MATCH texts.text
+            WHERE {SEARCH_INDEX_TABLE}.type = '{entity}'
+                AND {SEARCH_INDEX_TABLE}.project_id = :project_id
+            UNION ALL
+            SELECT texts.key, {SEARCH_INDEX_TABLE}.rowid, {SEARCH_INDEX_TABLE}.permalink, 0
+            FROM texts
+            JOIN {SEARCH_TRIGRAM_TABLE} ON {SEARCH_TRIGRAM_TABLE} MATCH texts.trigram_text
+            JOIN {SEARCH_INDEX_TABLE} ON {SEARCH_INDEX_TABLE}.rowid = {SEARCH_TRIGRAM_TABLE}.rowid
+            WHERE texts.trigram_text IS NOT NULL
+                AND {SEARCH_INDEX_TABLE}.type = '{entity}'
+                AND {SEARCH_INDEX_TABLE}.project_id = :project_id
+        )
+        SELECT key, permalink FROM (
+            SELECT key, permalink,
+                ROW_NUMBER() OVER (PARTITION BY key ORDER BY score, row_id) AS n
+            FROM matches
+        )
+        WHERE n = 1
+    """)
+
+
+@lru_cache(maxsize=SEARCH_STATEMENT_CACHE_SIZE)
+def _count_statement(shape: SearchShape) -> TextClause:
+    """Plan the statement counting the results of the searches of a shape."""
+    source, conditions = _filter_clauses(shape)
+    return text(f"SELECT count(*) FROM {source} WHERE {' AND '.join(conditions)}")
+
+
+@lru_cache(maxsize=SEARCH_STATEMENT_CACHE_SIZE)
+def _vector_statements(shape: SearchShape, limit: int) -> Tuple[TextClause, TextClause]:
+    """Plan the statements of a vector search of a shape returning up to limit results.
+
+    The first selects the embeddings of the entities passing the filters, the second
+    the result rows of the nearest ones.
+    """
+    source, conditions = _filter_clauses(shape)
+    where_clause = " AND ".join(conditions)
+    if shape.projects:
+        project_condition = f"project_id IN ({_placeholders('project_id', shape.projects)})"
+    else:
+        project_condition = "project_id = :project_id"
+    columns = SEARCH_RESULT_COLUMNS.format(
+        content="substr(content_snippet, 1, :snippet_length)", score="0.0"
+    )
+    return (
+        text(f"""
+            SELECT entity_id, vector FROM search_vector
+            WHERE {project_condition} AND entity_id IN (
+                SELECT search_index.entity_id FROM {source} WHERE {where_clause}
+            )
+        """),
+        text(f"""
+            SELECT {columns}
+            FROM {source}
+            WHERE {where_clause}
+            AND search_index.entity_id IN ({_placeholders("vector_entity", limit)})
+        """),
+    )
+
+
+def _derived_tables(table: str) -> List[Tuple[str, str]]:
+    """Tables derived from the rows of a search index table, keyed by the same rowids.
+
+    Returns (table name, insert statement) pairs, the statement filling the table
+    from the search index table's rows, to be completed with a WHERE clause.
+    """
+    trigram_table, filter_table = TRIGRAM_TABLES[table], FILTER_TABLES[table]
+    return [
+        (trigram_table, INSERT_TRIGRAM_ROWS_SQL.format(trigram_table=trigram_table, table=table)),
+        (filter_table, INSERT_FILTER_ROWS_SQL.format(filter_table=filter_table, table=table)),
+    ]
+
+
+def _stored_value(value: Any) -> Optional[str]:
+    """Value as text, the way SQLite stores it in the untyped search_index columns."""
+    return None if value is None else str(value)
+
+
+def _row_key(values: Mapping[Any, Any]) -> Tuple[Any, ...]:
+    """Key a search_index row by type, permalink and a hash of its indexed text.
+
+    Works for both a row about to be inserted and a row read back from the index.
+    """
+    indexed = [_stored_value(values[column]) for column in INDEXED_COLUMNS]
+    content_hash = hashlib.sha256(json.dumps(indexed).encode()).hexdigest()
+    return values["type"], values["permalink"], content_hash
 
 
 @dataclass
@@ -33,6 +554,7 @@ class SearchIndexRow:
 
     # assigned in result
     score: Optional[float] = None
+    row_id: Optional[int] = None  # rowid in the search index, for SearchCursor
 
     # Type-specific fields
     title: Optional[str] = None  # entity
@@ -90,24 +612,209 @@ class SearchIndexRow:
         }
 
 
+@dataclass(frozen=True)
+class SearchCursor:
+    """Position of a search result, to continue the search after it.
+
+    Holds the values the results are ordered by: score, updated_at when filtering
+    by date, and rowid. Encoded as an opaque string for API clients.
+    """
+
+    score: float
+    row_id: int
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def after(cls, row: SearchIndexRow) -> "SearchCursor":
+        """Cursor continuing a search after row."""
+        return cls(
+            score=row.score or 0.0,
+            row_id=row.row_id or 0,
+            updated_at=str(row.updated_at) if row.updated_at else None,
+        )
+
+    def encode(self) -> str:
+        """Encode as an opaque, URL-safe string."""
+        data = json.dumps([self.score, self.row_id, self.updated_at])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "SearchCursor":
+        """Decode a string made by encode.
+
+        Raises:
+            ValueError: If cursor isn't a valid search cursor
+        """
+        try:
+            score, row_id, updated_at = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return cls(score=float(score), row_id=int(row_id), updated_at=updated_at)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid search cursor: {cursor}") from e
+
+
+@dataclass
+class ReindexCheckpoint:
+    """How far a full reindex of a project has got."""
+
+    last_entity_id: int
+    total_entities: int
+    indexed_entities: int
+    indexed_rows: int
+    started_at: datetime
+    run_entities: int = 0
+    run_rows: int = 0
+
+    def progress(self) -> ReindexProgress:
+        """Progress of the reindex, with rates measured over the current run."""
+        started_at = self.started_at
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        elapsed = max((datetime.now(timezone.utc) - started_at).total_seconds(), 0.0)
+
+        entities_per_second = self.run_entities / elapsed if elapsed else 0.0
+        remaining = max(self.total_entities - self.indexed_entities, 0)
+        return ReindexProgress(
+            total_entities=self.total_entities,
+            indexed_entities=self.indexed_entities,
+            indexed_rows=self.indexed_rows,
+            elapsed_seconds=elapsed,
+            rows_per_second=self.run_rows / elapsed if elapsed else 0.0,
+            eta_seconds=remaining / entities_per_second if entities_per_second else None,
+        )
+
+
+class SearchResultCache:
+    """LRU cache of search results with a TTL, invalidated per project.
+
+    Each project has a generation counter, bumped whenever its search index is
+    written. Entries remember the generation they were cached at and are ignored
+    once it has moved on, so invalidating a project is O(1).
+    """
+
+    def __init__(self, max_size: int = SEARCH_CACHE_SIZE, ttl: float = SEARCH_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generations: Dict[int, int] = defaultdict(int)
+        # (project_id, query key) -> (generation, expiry time, results)
+        self.entries: OrderedDict[Tuple[int, Hashable], Tuple[int, float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, project_id: int, key: Hashable) -> Any:
+        """Get the cached results of a query, None if they aren't cached or are stale."""
+        entry = self.entries.get((project_id, key))
+        if entry is None or entry[0] != self.generations[project_id] or entry[1] < time.monotonic():
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end((project_id, key))
+        self.hits += 1
+        results = entry[2]
+        return list(results) if isinstance(results, list) else results
+
+    def put(self, project_id: int, key: Hashable, results: Any) -> None:
+        """Cache the results of a query, evicting the least recently used results if full."""
+        self.entries[(project_id, key)] = (
+            self.generations[project_id],
+            time.monotonic() + self.ttl,
+            list(results) if isinstance(results, list) else results,
+        )
+        self.entries.move_to_end((project_id, key))
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, project_id: int) -> None:
+        """Invalidate every cached result of a project."""
+        self.generations[project_id] += 1
+
+    def stats(self) -> SearchCacheStats:
+        """Hit and miss counters of the cache."""
+        lookups = self.hits + self.misses
+        return SearchCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self.entries),
+            hit_rate=self.hits / lookups if lookups else 0.0,
+        )
+
+
+# One result cache per database, shared by the repositories created for each request
+_result_caches: "WeakKeyDictionary[async_sessionmaker[AsyncSession], SearchResultCache]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_result_cache(session_maker: async_sessionmaker[AsyncSession]) -> SearchResultCache:
+    """Get the search result cache of the database session_maker connects to."""
+    cache = _result_caches.get(session_maker)
+    if cache is None:
+        cache = _result_caches[session_maker] = SearchResultCache()
+    return cache
+
+
+# One reindex lock per database, the shadow tables are shared by every project
+_reindex_locks: "WeakKeyDictionary[async_sessionmaker[AsyncSession], asyncio.Lock]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_reindex_lock(session_maker: async_sessionmaker[AsyncSession]) -> asyncio.Lock:
+    """Get the lock full reindexes of the database session_maker connects to hold."""
+    lock = _reindex_locks.get(session_maker)
+    if lock is None:
+        lock = _reindex_locks[session_maker] = asyncio.Lock()
+    return lock
+
+
 class SearchRepository:
     """Repository for search index operations."""
 
-    def __init__(self, session_maker: async_sessionmaker[AsyncSession], project_id: int):
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        project_id: int,
+        column_weights: Optional[Mapping[str, float]] = None,
+    ):
         """Initialize with session maker and project_id filter.
 
         Args:
             session_maker: SQLAlchemy session maker
             project_id: Project ID to filter all operations by
+            column_weights: bm25 weights of columns, overriding DEFAULT_SEARCH_COLUMN_WEIGHTS
 
         Raises:
-            ValueError: If project_id is None or invalid
+            ValueError: If project_id is None or invalid, or a weight isn't for an indexed column
         """
         if project_id is None or project_id <= 0:  # pragma: no cover
             raise ValueError("A valid project_id is required for SearchRepository")
 
+        unknown_columns = set(column_weights or {}) - set(INDEXED_COLUMNS)
+        if unknown_columns:
+            raise ValueError(f"Unknown search columns in column_weights: {unknown_columns}")
+        weights = {**DEFAULT_SEARCH_COLUMN_WEIGHTS, **(column_weights or {})}
+
         self.session_maker = session_maker
         self.project_id = project_id
+        self.column_weights = tuple(float(weights[column]) for column in INDEXED_COLUMNS)
+        # bm25 takes a weight per column in table order, the first column is the unindexed id
+        self.rank = f"bm25(search_index, 0.0, {', '.join(map(repr, self.column_weights))})"
+        self.cache = get_result_cache(session_maker)
+        self.reindex_lock = get_reindex_lock(session_maker)
+
+    def _invalidate_cache(self, session: AsyncSession) -> None:
+        """Invalidate this project's cached search results after writing to its index.
+
+        The cache is invalidated again when the transaction ends, because a search
+        run before a batch commits or rolls back caches what it saw at the time.
+        """
+        cache, project_id = self.cache, self.project_id
+        cache.invalidate(project_id)
+        event.listen(
+            session.sync_session,
+            "after_transaction_end",
+            lambda *args: cache.invalidate(project_id),
+            once=True,
+        )
 
     async def init_search_index(self):
         """Create or recreate the search index."""
@@ -115,13 +822,26 @@ class SearchRepository:
         try:
             async with db.scoped_session(self.session_maker) as session:
                 await session.execute(CREATE_SEARCH_INDEX)
+                await session.execute(CREATE_SEARCH_TRIGRAM)
+                await session.execute(CREATE_SEARCH_FILTER)
+                for create_index in CREATE_SEARCH_FILTER_INDEXES:
+                    await session.execute(create_index)
+                await session.execute(CREATE_SEARCH_VECTOR)
+                await session.execute(CREATE_SEARCH_INDEX_CHECKPOINT)
+                # backfill the trigram and filter rows of rows indexed before they existed
+                await self._sync_derived_rows(session, SEARCH_INDEX_TABLE)
+                if await self._shadow_exists(session):
+                    await session.execute(CREATE_SEARCH_FILTER_SHADOW)
+                    await self._sync_derived_rows(session, SEARCH_INDEX_SHADOW_TABLE)
                 await session.commit()
         except Exception as e:  # pragma: no cover
             logger.error(f"Error initializing search index: {e}")
             raise e
 
-    def _prepare_search_term(self, term: str, is_prefix: bool = True) -> str:
-        """Prepare a search term for FTS5 query.
+    @staticmethod
+    @lru_cache(maxsize=SEARCH_TERM_CACHE_SIZE)
+    def _prepare_search_term(term: str, is_prefix: bool = True) -> str:
+        """Prepare a search term for FTS5 query, memoized since the same terms recur.
 
         Args:
             term: The search term to prepare
@@ -205,7 +925,24 @@ class SearchRepository:
 
         return term
 
-    async def search(
+    @staticmethod
+    @lru_cache(maxsize=SEARCH_TERM_CACHE_SIZE)
+    def _prepare_trigram_term(term: str) -> Optional[str]:
+        """Prepare a search term for a substring query of the trigram index.
+
+        Each word of at least 3 characters, the shortest substring a trigram index can
+        match, must occur somewhere in the row. Returns None if there is no such word.
+        """
+        phrases = []
+        for word in term.split():
+            word = word.strip("*")
+            if len(word) >= 3:
+                # Escape any quotes by doubling them, and quote the word as a phrase
+                escaped_word = word.replace('"', '""')
+                phrases.append(f'"{escaped_word}"')
+        return " AND ".join(phrases) if phrases else None
+
+    def _search_filters(
         self,
         search_text: Optional[str] = None,
         permalink: Optional[str] = None,
@@ -214,118 +951,204 @@ class SearchRepository:
         types: Optional[List[str]] = None,
         after_date: Optional[datetime] = None,
         search_item_types: Optional[List[SearchItemType]] = None,
-        limit: int = 10,
-        offset: int = 0,
-    ) -> List[SearchIndexRow]:
-        """Search across all indexed content with fuzzy matching."""
-        conditions = []
-        params = {}
-        order_by_clause = ""
+        project_ids: Optional[Sequence[int]] = None,
+    ) -> Tuple[SearchShape, Dict[str, Any]]:
+        """Normalize search filters into the shape of the search and its parameters.
+
+        Rows are filtered to the repository's project, or to project_ids if given.
+        """
+        params: Dict[str, Any] = {}
 
         # Handle text search for title and content
+        text_match = None
         if search_text:
             # Check for explicit boolean operators - only detect them in proper boolean contexts
             has_boolean = any(op in f" {search_text} " for op in [" AND ", " OR ", " NOT "])
-
             if has_boolean:
                 # If boolean operators are present, use the raw query
                 # No need to prepare it, FTS5 will understand the operators
-                params["text"] = search_text
-                conditions.append("(title MATCH :text OR content_stems MATCH :text)")
+                processed_text = search_text
+                text_match = "boolean"
             else:
                 # Standard search with term preparation
                 processed_text = self._prepare_search_term(search_text.strip())
-                params["text"] = processed_text
-                conditions.append("(title MATCH :text OR content_stems MATCH :text)")
+                trigram_text = self._prepare_trigram_term(search_text.strip())
+                text_match = "terms"
+                if trigram_text:
+                    params["trigram_text"] = trigram_text
+                    text_match = "trigram"
+            params["text"] = f"{{title content_stems content_snippet}} : ({processed_text})"
 
         # Handle title match search
         if title:
-            title_text = self._prepare_search_term(title.strip(), is_prefix=False)
-            params["title_text"] = title_text
-            conditions.append("title MATCH :title_text")
+            params["title_text"] = self._prepare_search_term(title.strip(), is_prefix=False)
 
         # Handle permalink exact search
         if permalink:
             params["permalink"] = permalink
-            conditions.append("permalink = :permalink")
 
         # Handle permalink match search, supports *
+        permalink_match_kind = None
         if permalink_match:
             # For GLOB patterns, don't use _prepare_search_term as it will quote slashes
             # GLOB patterns need to preserve their syntax
             permalink_text = permalink_match.lower().strip()
             params["permalink"] = permalink_text
             if "*" in permalink_match:
-                conditions.append("permalink GLOB :permalink")
+                permalink_match_kind = "glob"
+            elif "/" in permalink_text:
+                permalink_match_kind = "equal"
             else:
-                # For exact matches without *, we can use FTS5 MATCH
-                # but only prepare the term if it doesn't look like a path
-                if "/" in permalink_text:
-                    conditions.append("permalink = :permalink")
-                else:
-                    permalink_text = self._prepare_search_term(permalink_text, is_prefix=False)
-                    params["permalink"] = permalink_text
-                    conditions.append("permalink MATCH :permalink")
+                # For exact matches without * or a path, we can use FTS5 MATCH
+                params["permalink"] = self._prepare_search_term(permalink_text, is_prefix=False)
+                permalink_match_kind = "match"
 
         # Handle entity type filter
         if search_item_types:
-            type_list = ", ".join(f"'{t.value}'" for t in search_item_types)
-            conditions.append(f"type IN ({type_list})")
+            params.update(
+                {f"search_item_type_{i}": t.value for i, t in enumerate(search_item_types)}
+            )
 
         # Handle type filter
         if types:
-            type_list = ", ".join(f"'{t}'" for t in types)
-            conditions.append(f"json_extract(metadata, '$.entity_type') IN ({type_list})")
+            params.update({f"entity_type_{i}": t for i, t in enumerate(types)})
 
-        # Handle date filter using datetime() for proper comparison
+        # Handle date filter
         if after_date:
             params["after_date"] = after_date
-            conditions.append("datetime(created_at) > datetime(:after_date)")
 
-            # order by most recent first
-            order_by_clause = ", updated_at DESC"
+        if project_ids:
+            params.update(_project_params(project_ids))
+        else:
+            params["project_id"] = self.project_id
+
+        shape = SearchShape(
+            text=text_match,
+            title=bool(title),
+            permalink=bool(permalink),
+            permalink_match=permalink_match_kind,
+            item_types=len(search_item_types or ()),
+            types=len(types or ()),
+            after_date=bool(after_date),
+            projects=len(project_ids or ()),
+        )
+        return shape, params
+
+    @staticmethod
+    def _cache_key(
+        search_text: Optional[str] = None,
+        permalink: Optional[str] = None,
+        permalink_match: Optional[str] = None,
+        title: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        after_date: Optional[datetime] = None,
+        search_item_types: Optional[List[SearchItemType]] = None,
+    ) -> Tuple[Hashable, ...]:
+        """Key search filters by their normalized values, for the result cache."""
+        return (
+            search_text.strip() if search_text else None,
+            permalink,
+            permalink_match.lower().strip() if permalink_match else None,
+            title.strip() if title else None,
+            tuple(sorted(types)) if types else None,
+            after_date.isoformat() if after_date else None,
+            tuple(sorted(t.value for t in search_item_types)) if search_item_types else None,
+        )
+
+    async def search(
+        self,
+        search_text: Optional[str] = None,
+        permalink: Optional[str] = None,
+        permalink_match: Optional[str] = None,
+        title: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        after_date: Optional[datetime] = None,
+        search_item_types: Optional[List[SearchItemType]] = None,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[SearchCursor] = None,
+        highlight: Optional[Tuple[str, str]] = None,
+        project_ids: Optional[Sequence[int]] = None,
+    ) -> List[SearchIndexRow]:
+        """Search across all indexed content with fuzzy matching.
 
-        # Always filter by project_id
-        params["project_id"] = self.project_id
-        conditions.append("project_id = :project_id")
+        Results are ordered by score, bm25 with the repository's column weights, then
+        by rowid so the order is total. Pass the SearchCursor of the last result of a
+        page to get the page after it: the rows before the cursor are filtered out
+        rather than sorted and skipped like with offset, which is ignored when a cursor
+        is given.
+
+        The content_snippet of text search results is a snippet of the content around
+        the matches, with matched terms between the highlight markers if given. Other
+        results get the start of the content.
+
+        Pass project_ids to search those projects instead of the repository's, in one
+        query: bm25 statistics are shared by all projects, so their scores compare and
+        the results merge by score. Each result has the project_id of its project.
+
+        Results are cached per project until its index is next written, see
+        SearchResultCache. Searches of other projects aren't cached, since writes to
+        those projects don't invalidate this project's cache.
+        """
+        filters = SearchFilters(
+            search_text=search_text,
+            permalink=permalink,
+            permalink_match=permalink_match,
+            title=title,
+            types=types,
+            after_date=after_date,
+            search_item_types=search_item_types,
+        )
+        if cursor:
+            offset = 0
+        cache_key = (
+            "search",
+            *self._cache_key(**filters),
+            self.column_weights,
+            limit,
+            offset,
+            cursor,
+            highlight,
+        )
+        federated = self._federated(project_ids)
+        cached = None if federated else self.cache.get(self.project_id, cache_key)
+        if cached is not None:
+            logger.trace(f"Search cache hit: {cache_key}")
+            return cached
+
+        shape, params = self._search_filters(**filters, project_ids=project_ids)
+
+        if cursor:
+            params["cursor_score"] = cursor.score
+            params["cursor_row_id"] = cursor.row_id
+            if after_date:
+                params["cursor_updated_at"] = cursor.updated_at
+
+        if shape.text:
+            params["highlight_start"], params["highlight_end"] = highlight or ("", "")
+            params["snippet_tokens"] = SNIPPET_TOKENS
+        params["snippet_length"] = SNIPPET_LENGTH
 
         # set limit on search query
         params["limit"] = limit
         params["offset"] = offset
 
-        # Build WHERE clause
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-        sql = f"""
-            SELECT 
-                project_id,
-                id, 
-                title, 
-                permalink,
-                file_path,
-                type,
-                metadata,
-                from_id,
-                to_id,
-                relation_type,
-                entity_id,
-                content_snippet,
-                category,
-                created_at,
-                updated_at,
-                bm25(search_index) as score
-            FROM search_index 
-            WHERE {where_clause}
-            ORDER BY score ASC {order_by_clause}
-            LIMIT :limit
-            OFFSET :offset
-        """
+        statement = _search_statement(shape, self.rank, cursor is not None)
 
-        logger.trace(f"Search {sql} params: {params}")
+        logger.trace(f"Search {statement} params: {params}")
         try:
+            start = time.perf_counter()
             async with db.scoped_session(self.session_maker) as session:
-                result = await session.execute(text(sql), params)
+                result = await session.execute(statement, params)
                 rows = result.fetchall()
+            await query_stats.record(
+                self.session_maker,
+                f"search: {shape}",
+                statement,
+                params,
+                time.perf_counter() - start,
+                len(rows),
+            )
         except Exception as e:
             # Handle FTS5 syntax errors and provide user-friendly feedback
             if "fts5: syntax error" in str(e).lower():  # pragma: no cover
@@ -337,27 +1160,7 @@ class SearchRepository:
                 logger.error(f"Database error during search: {e}")
                 raise
 
-        results = [
-            SearchIndexRow(
-                project_id=self.project_id,
-                id=row.id,
-                title=row.title,
-                permalink=row.permalink,
-                file_path=row.file_path,
-                type=row.type,
-                score=row.score,
-                metadata=json.loads(row.metadata),
-                from_id=row.from_id,
-                to_id=row.to_id,
-                relation_type=row.relation_type,
-                entity_id=row.entity_id,
-                content_snippet=row.content_snippet,
-                category=row.category,
-                created_at=row.created_at,
-                updated_at=row.updated_at,
-            )
-            for row in rows
-        ]
+        results = [self._result_row(row) for row in rows]
 
         logger.trace(f"Found {len(results)} search results")
         for r in results:
@@ -365,6 +1168,233 @@ class SearchRepository:
                 f"Search result: project_id: {r.project_id} type:{r.type} title: {r.title} permalink: {r.permalink} score: {r.score}"
             )
 
+        if not federated:
+            self.cache.put(self.project_id, cache_key, results)
+        return results
+
+    def _federated(self, project_ids: Optional[Sequence[int]]) -> bool:
+        """Whether project_ids search other projects than the repository's."""
+        return bool(project_ids) and set(project_ids) != {self.project_id}
+
+    def _result_row(self, row: Any) -> SearchIndexRow:
+        """Search result from a row selected with SEARCH_RESULT_COLUMNS."""
+        return SearchIndexRow(
+            project_id=row.project_id,
+            id=row.id,
+            title=row.title,
+            permalink=row.permalink,
+            file_path=row.file_path,
+            type=row.type,
+            score=row.score,
+            row_id=row.rowid,
+            metadata=json.loads(row.metadata),
+            from_id=row.from_id,
+            to_id=row.to_id,
+            relation_type=row.relation_type,
+            entity_id=row.entity_id,
+            content_snippet=row.content_snippet,
+            category=row.category,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+
+    async def best_entity_permalinks(self, texts: Sequence[str]) -> Dict[str, str]:
+        """Get the permalink of the best entity match of each text, in one query.
+
+        Each text matches like the first result of search(search_text=text,
+        search_item_types=[SearchItemType.ENTITY]), but all of them are matched by one
+        statement instead of a search each. Texts matching no entity are left out. If
+        a text isn't valid FTS5 syntax, the texts are searched one at a time instead,
+        so only the invalid ones match nothing.
+        """
+        filters = []
+        for key, search_text in enumerate(texts):
+            _, params = self._search_filters(search_text=search_text)
+            if "text" in params:
+                filters.append({"key": key, **params})
+        if not filters:
+            return {}
+
+        statement = _best_entity_statement(self.rank)
+        params = {"texts": json.dumps(filters), "project_id": self.project_id}
+        try:
+            start = time.perf_counter()
+            async with db.scoped_session(self.session_maker) as session:
+                result = await session.execute(statement, params)
+                rows = result.all()
+            await query_stats.record(
+                self.session_maker,
+                "best entity matches",
+                statement,
+                params,
+                time.perf_counter() - start,
+                len(rows),
+            )
+        except Exception as e:
+            if "fts5: syntax error" not in str(e).lower():
+                raise
+            logger.warning(f"FTS5 syntax error matching {len(filters)} texts, searching each")
+            best = {}
+            for search_text in texts:
+                results = await self.search(
+                    search_text=search_text, search_item_types=[SearchItemType.ENTITY]
+                )
+                if results and results[0].permalink:
+                    best[search_text] = results[0].permalink
+            return best
+
+        return {texts[int(key)]: permalink for key, permalink in rows if permalink}
+
+    async def search_count(
+        self,
+        search_text: Optional[str] = None,
+        permalink: Optional[str] = None,
+        permalink_match: Optional[str] = None,
+        title: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        after_date: Optional[datetime] = None,
+        search_item_types: Optional[List[SearchItemType]] = None,
+        project_ids: Optional[Sequence[int]] = None,
+    ) -> int:
+        """Count the results of a search, without scoring or sorting them."""
+        filters = SearchFilters(
+            search_text=search_text,
+            permalink=permalink,
+            permalink_match=permalink_match,
+            title=title,
+            types=types,
+            after_date=after_date,
+            search_item_types=search_item_types,
+        )
+        cache_key = ("count", *self._cache_key(**filters))
+        federated = self._federated(project_ids)
+        cached = None if federated else self.cache.get(self.project_id, cache_key)
+        if cached is not None:
+            return cached
+
+        shape, params = self._search_filters(**filters, project_ids=project_ids)
+        statement = _count_statement(shape)
+        try:
+            start = time.perf_counter()
+            async with db.scoped_session(self.session_maker) as session:
+                result = await session.execute(statement, params)
+                count = result.scalar_one()
+            await query_stats.record(
+                self.session_maker,
+                f"count: {shape}",
+                statement,
+                params,
+                time.perf_counter() - start,
+                1,
+            )
+        except Exception as e:
+            if "fts5: syntax error" in str(e).lower():  # pragma: no cover
+                logger.warning(f"FTS5 syntax error for search term: {search_text}, error: {e}")
+                return 0
+            raise
+
+        if not federated:
+            self.cache.put(self.project_id, cache_key, count)
+        return count
+
+    async def index_vectors(self, vectors: Mapping[int, Sequence[float]]) -> None:
+        """Store the embeddings of entities for semantic search, replacing their old ones.
+
+        Args:
+            vectors: Embedding of each entity by entity id
+        """
+        if not vectors:
+            return
+
+        async with db.scoped_session(self.session_maker) as session:
+            self._invalidate_cache(session)
+            await session.execute(
+                text("""
+                    INSERT OR REPLACE INTO search_vector (project_id, entity_id, vector)
+                    VALUES (:project_id, :entity_id, :vector)
+                """),
+                [
+                    {
+                        "project_id": self.project_id,
+                        "entity_id": entity_id,
+                        "vector": _unit_vector(vector).tobytes(),
+                    }
+                    for entity_id, vector in vectors.items()
+                ],
+            )
+
+    async def vector_search(
+        self,
+        vector: Sequence[float],
+        types: Optional[List[str]] = None,
+        after_date: Optional[datetime] = None,
+        search_item_types: Optional[List[SearchItemType]] = None,
+        limit: int = 10,
+        offset: int = 0,
+        project_ids: Optional[Sequence[int]] = None,
+    ) -> List[SearchIndexRow]:
+        """Find the entities whose embeddings are nearest to vector.
+
+        Every embedding of the project, or of project_ids if given, passing the
+        filters is compared by cosine similarity. Only entities are embedded, so the
+        results are entity rows, with the negated similarity as score so that, like
+        bm25, lower scores rank first. Entities with no similarity at all are left out.
+        """
+        if search_item_types and SearchItemType.ENTITY not in search_item_types:
+            return []
+
+        query_vector = _unit_vector(vector)
+        filters = SearchFilters(
+            types=types, after_date=after_date, search_item_types=[SearchItemType.ENTITY]
+        )
+        cache_key = ("vector", query_vector.tobytes(), *self._cache_key(**filters), limit, offset)
+        federated = self._federated(project_ids)
+        cached = None if federated else self.cache.get(self.project_id, cache_key)
+        if cached is not None:
+            return cached
+
+        shape, params = self._search_filters(**filters, project_ids=project_ids)
+        # the nearest entities are bound padded to limit, so each limit has one statement
+        candidates_statement, rows_statement = _vector_statements(shape, limit)
+        start = time.perf_counter()
+        async with db.scoped_session(self.session_maker) as session:
+            result = await session.execute(candidates_statement, params)
+            candidates = list(result.tuples())
+
+        # compared in a thread, so other requests are served and the session is released
+        loop = asyncio.get_running_loop()
+        nearest = await loop.run_in_executor(
+            None, _nearest_vectors, query_vector, candidates, offset, limit
+        )
+
+        results = []
+        if nearest:
+            entity_ids = [entity_id for _, entity_id in nearest]
+            entity_ids += [None] * (limit - len(entity_ids))
+            entity_params = {f"vector_entity_{i}": e for i, e in enumerate(entity_ids)}
+            async with db.scoped_session(self.session_maker) as session:
+                result = await session.execute(
+                    rows_statement,
+                    {**params, **entity_params, "snippet_length": SNIPPET_LENGTH},
+                )
+                rows = {row.entity_id: self._result_row(row) for row in result}
+            for score, entity_id in nearest:
+                # an entity deleted since its embedding was read is left out
+                if entity_id in rows:
+                    rows[entity_id].score = score
+                    results.append(rows[entity_id])
+        # timed as a whole with the similarities, explained by the embeddings it compares
+        await query_stats.record(
+            self.session_maker,
+            f"vector: {shape}",
+            candidates_statement,
+            params,
+            time.perf_counter() - start,
+            len(results),
+        )
+
+        if not federated:
+            self.cache.put(self.project_id, cache_key, results)
         return results
 
     async def index_item(
@@ -372,60 +1402,386 @@ class SearchRepository:
         search_index_row: SearchIndexRow,
     ):
         """Index or update a single item."""
+        await self.index_items([search_index_row])
+
+    async def index_items(self, search_index_rows: List[SearchIndexRow]) -> None:
+        """Index or update many items in one transaction.
+
+        Existing rows with any of the items' permalinks are deleted with a single
+        DELETE per chunk of permalinks, then all items are inserted with executemany.
+        """
+        if not search_index_rows:
+            return
+
+        insert_data = self._insert_data(search_index_rows)
         async with db.scoped_session(self.session_maker) as session:
-            # Delete existing record if any
-            await session.execute(
-                text("DELETE FROM search_index WHERE permalink = :permalink"),
-                {"permalink": search_index_row.permalink},
+            self._invalidate_cache(session)
+            await self._replace_rows(session, SEARCH_INDEX_TABLE, insert_data)
+            if await self._shadow_exists(session):
+                await self._replace_rows(session, SEARCH_INDEX_SHADOW_TABLE, insert_data)
+
+        logger.debug(f"indexed {len(insert_data)} rows")
+
+    def _insert_data(self, search_index_rows: List[SearchIndexRow]) -> List[Dict[str, Any]]:
+        """Insert parameters for rows, in this project."""
+        insert_data = []
+        for row in search_index_rows:
+            data = row.to_insert()
+            data["project_id"] = self.project_id
+            insert_data.append(data)
+        return insert_data
+
+    async def _replace_rows(
+        self, session: AsyncSession, table: str, insert_data: List[Dict[str, Any]]
+    ) -> None:
+        """Insert rows into table, replacing existing rows with the same permalinks."""
+        permalinks = sorted({data["permalink"] for data in insert_data if data["permalink"]})
+
+        # Delete existing records if any
+        for start in range(0, len(permalinks), DELETE_CHUNK_SIZE):
+            chunk = permalinks[start : start + DELETE_CHUNK_SIZE]
+            params: Dict[str, Any] = {f"permalink_{i}": p for i, p in enumerate(chunk)}
+            placeholders = ", ".join(f":{name}" for name in params)
+            params["project_id"] = self.project_id
+            await self._delete_rows(
+                session,
+                table,
+                f"project_id = :project_id AND permalink IN ({placeholders})",
+                params,
             )
 
-            # Prepare data for insert with project_id
-            insert_data = search_index_row.to_insert()
-            insert_data["project_id"] = self.project_id
+        # Insert new records
+        await self._insert_rows(session, table, insert_data)
+
+    async def _insert_rows(
+        self, session: AsyncSession, table: str, insert_data: List[Dict[str, Any]]
+    ) -> None:
+        """Insert rows into table and the trigram index."""
+        insert = (
+            INSERT_SEARCH_INDEX_SHADOW_ROW
+            if table == SEARCH_INDEX_SHADOW_TABLE
+            else INSERT_SEARCH_INDEX_ROW
+        )
+        await session.execute(insert, insert_data)
+        await self._sync_derived_rows(session, table)
+
+    async def _delete_rows(
+        self, session: AsyncSession, table: str, condition: str, params: Dict[str, Any]
+    ) -> None:
+        """Delete the rows of table matching condition, and their derived rows."""
+        result = await session.execute(text(f"SELECT rowid FROM {table} WHERE {condition}"), params)
+        await self._delete_row_ids(session, table, [{"row_id": r} for r in result.scalars()])
+
+    async def _delete_row_ids(
+        self, session: AsyncSession, table: str, row_ids: List[Dict[str, Any]]
+    ) -> None:
+        """Delete rows of table by rowid, given as row_id parameters, and their derived rows."""
+        if not row_ids:
+            return
+        for delete_from in (TRIGRAM_TABLES[table], FILTER_TABLES[table], table):
+            await session.execute(text(f"DELETE FROM {delete_from} WHERE rowid = :row_id"), row_ids)
+
+    async def _sync_derived_rows(self, session: AsyncSession, table: str) -> None:
+        """Add trigram and filter rows for rows inserted into table since they were last synced.
 
-            # Insert new record
+        Rows are deleted from all the tables together, so each derived table holds exactly
+        the rows of table up to its highest rowid. New rows get rowids above any
+        existing one, so they are the ones past the highest rowid in the derived table.
+        """
+        for derived_table, insert_sql in _derived_tables(table):
+            result = await session.execute(
+                text(f"SELECT rowid FROM {derived_table} ORDER BY rowid DESC LIMIT 1")
+            )
             await session.execute(
-                text("""
-                    INSERT INTO search_index (
-                        id, title, content_stems, content_snippet, permalink, file_path, type, metadata,
-                        from_id, to_id, relation_type,
-                        entity_id, category,
-                        created_at, updated_at,
-                        project_id
-                    ) VALUES (
-                        :id, :title, :content_stems, :content_snippet, :permalink, :file_path, :type, :metadata,
-                        :from_id, :to_id, :relation_type,
-                        :entity_id, :category,
-                        :created_at, :updated_at,
-                        :project_id
-                    )
+                text(insert_sql + " WHERE rowid > :last_rowid"),
+                {"last_rowid": result.scalar() or 0},
+            )
+
+    async def _shadow_exists(self, session: AsyncSession) -> bool:
+        """Whether a full reindex is building the shadow table.
+
+        While it is, every write to the live index is also applied to the shadow
+        table, so the shadow table is current when it is swapped in.
+        """
+        result = await session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_INDEX_SHADOW_TABLE},
+        )
+        return result.scalar() is not None
+
+    async def index_entity_rows(self, entity_id: int, rows: List[SearchIndexRow]) -> None:
+        """Make the indexed rows for an entity match rows, changing as few as possible.
+
+        Existing rows are matched to new ones by type, permalink and a hash of their
+        full-text indexed columns. A matched row is left alone unless one of its other
+        unindexed columns differs, in which case only its unindexed columns are updated.
+        So a row whose content didn't change keeps the timestamps of when it last did.
+        Unmatched existing rows are deleted and unmatched new rows are inserted, all in
+        one transaction. Like index_item, rows of other entities with the same permalink
+        as a new row are replaced.
+
+        Args:
+            entity_id: Entity the rows belong to
+            rows: Every row that should be indexed for the entity
+        """
+        new_rows = self._insert_data(rows)
+
+        params: Dict[str, Any] = {"entity_id": entity_id, "project_id": self.project_id}
+        permalinks = sorted({data["permalink"] for data in new_rows if data["permalink"]})
+        permalink_params = {f"permalink_{i}": permalink for i, permalink in enumerate(permalinks)}
+        params.update(permalink_params)
+        permalink_filter = (
+            f" OR permalink IN ({', '.join(f':{name}' for name in permalink_params)})"
+            if permalink_params
+            else ""
+        )
+        columns = ", ".join(INDEXED_COLUMNS + UNINDEXED_COLUMNS)
+
+        async with db.scoped_session(self.session_maker) as session:
+            self._invalidate_cache(session)
+            result = await session.execute(
+                text(f"""
+                    SELECT rowid, {columns} FROM search_index
+                    WHERE project_id = :project_id AND (entity_id = :entity_id{permalink_filter})
                 """),
-                insert_data,
+                params,
             )
-            logger.debug(f"indexed row {search_index_row}")
-            await session.commit()
+            existing = defaultdict(list)
+            for stored in result.mappings():
+                existing[_row_key(stored)].append(stored)
+
+            inserts = []
+            updates = []
+            for data in new_rows:
+                matches = existing.get(_row_key(data))
+                if not matches:
+                    inserts.append(data)
+                    continue
+
+                stored = matches.pop()
+                changed = any(
+                    _stored_value(stored[column]) != _stored_value(data[column])
+                    for column in UNINDEXED_COLUMNS
+                    if column not in ("created_at", "updated_at")
+                )
+                if changed:
+                    updates.append({**data, "row_id": stored["rowid"]})
+
+            deletes = [
+                {"row_id": stored["rowid"]} for group in existing.values() for stored in group
+            ]
+
+            if deletes:
+                await self._delete_row_ids(session, SEARCH_INDEX_TABLE, deletes)
+            if updates:
+                assignments = ", ".join(f"{column} = :{column}" for column in UNINDEXED_COLUMNS)
+                await session.execute(
+                    text(f"UPDATE search_index SET {assignments} WHERE rowid = :row_id"), updates
+                )
+                # the trigram rows include the file path and the filter rows the type,
+                # metadata and creation time, which are unindexed here
+                row_ids = [{"row_id": update["row_id"]} for update in updates]
+                for derived_table, insert_sql in _derived_tables(SEARCH_INDEX_TABLE):
+                    await session.execute(
+                        text(f"DELETE FROM {derived_table} WHERE rowid = :row_id"), row_ids
+                    )
+                    await session.execute(text(insert_sql + " WHERE rowid = :row_id"), row_ids)
+            if inserts:
+                await self._insert_rows(session, SEARCH_INDEX_TABLE, inserts)
+
+            if await self._shadow_exists(session):
+                # the shadow table isn't read, so simply replace the entity's rows there
+                await self._delete_rows(
+                    session,
+                    SEARCH_INDEX_SHADOW_TABLE,
+                    f"project_id = :project_id AND (entity_id = :entity_id{permalink_filter})",
+                    params,
+                )
+                if new_rows:
+                    await self._insert_rows(session, SEARCH_INDEX_SHADOW_TABLE, new_rows)
+
+        logger.debug(
+            f"Indexed entity_id={entity_id}: rows={len(new_rows)}, inserted={len(inserts)}, "
+            f"updated={len(updates)}, deleted={len(deletes)}"
+        )
 
     async def delete_by_entity_id(self, entity_id: int):
         """Delete an item from the search index by entity_id."""
+        await self._delete_where(
+            "entity_id = :entity_id AND project_id = :project_id",
+            {"entity_id": entity_id, "project_id": self.project_id},
+        )
+
+    async def delete_by_permalink(self, permalink: str):
+        """Delete an item from the search index."""
+        await self._delete_where(
+            "permalink = :permalink AND project_id = :project_id",
+            {"permalink": permalink, "project_id": self.project_id},
+        )
+
+    async def _delete_where(self, condition: str, params: Dict[str, Any]) -> None:
+        """Delete matching rows from the live index and the shadow table if it exists.
+
+        The embeddings of matching entity rows are deleted too.
+        """
         async with db.scoped_session(self.session_maker) as session:
+            self._invalidate_cache(session)
             await session.execute(
-                text(
-                    "DELETE FROM search_index WHERE entity_id = :entity_id AND project_id = :project_id"
-                ),
-                {"entity_id": entity_id, "project_id": self.project_id},
+                text(f"""
+                    DELETE FROM search_vector
+                    WHERE project_id = :project_id AND entity_id IN (
+                        SELECT entity_id FROM {SEARCH_INDEX_TABLE}
+                        WHERE type = '{SearchItemType.ENTITY.value}' AND {condition}
+                    )
+                """),
+                params,
             )
-            await session.commit()
+            await self._delete_rows(session, SEARCH_INDEX_TABLE, condition, params)
+            if await self._shadow_exists(session):
+                await self._delete_rows(session, SEARCH_INDEX_SHADOW_TABLE, condition, params)
 
-    async def delete_by_permalink(self, permalink: str):
-        """Delete an item from the search index."""
+    async def create_shadow_index(self, replace: bool = False) -> None:
+        """Create the shadow table a full reindex builds the new index in.
+
+        The shadow tables are shared by every project, so replacing them also forgets
+        the checkpoint of any other project's interrupted reindex, whose rows they held.
+        That reindex starts over instead of resuming into this project's shadow tables.
+
+        Args:
+            replace: Drop a shadow table left behind by an earlier reindex first
+        """
+        async with db.scoped_session(self.session_maker) as session:
+            if replace:
+                await session.execute(text(f"DROP TABLE IF EXISTS {SEARCH_INDEX_SHADOW_TABLE}"))
+                await session.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TRIGRAM_SHADOW_TABLE}"))
+                await session.execute(text(f"DROP TABLE IF EXISTS {SEARCH_FILTER_SHADOW_TABLE}"))
+                await session.execute(
+                    text("DELETE FROM search_index_checkpoint WHERE project_id != :project_id"),
+                    {"project_id": self.project_id},
+                )
+            await session.execute(CREATE_SEARCH_INDEX_SHADOW)
+            await session.execute(CREATE_SEARCH_TRIGRAM_SHADOW)
+            await session.execute(CREATE_SEARCH_FILTER_SHADOW)
+
+    async def shadow_index_exists(self) -> bool:
+        """Whether the shadow table of a full reindex exists."""
+        async with db.scoped_session(self.session_maker) as session:
+            return await self._shadow_exists(session)
+
+    async def index_shadow_items(self, search_index_rows: List[SearchIndexRow]) -> None:
+        """Index many items into the shadow table only, in one transaction."""
+        if not search_index_rows:
+            return
+
+        insert_data = self._insert_data(search_index_rows)
+        async with db.scoped_session(self.session_maker) as session:
+            await self._replace_rows(session, SEARCH_INDEX_SHADOW_TABLE, insert_data)
+
+        logger.debug(f"indexed {len(insert_data)} rows into {SEARCH_INDEX_SHADOW_TABLE}")
+
+    async def swap_shadow_index(self) -> None:
+        """Replace the live index and its derived tables with the shadow tables in one transaction.
+
+        The shadow table is built for this project only, so the other projects' rows
+        are copied over from the live index first, replacing any written to it while it
+        was built. Readers see either the old index or the new one, never a partial one.
+        """
+        columns = ", ".join(INDEXED_COLUMNS + UNINDEXED_COLUMNS)
+        async with db.scoped_session(self.session_maker) as session:
+            self._invalidate_cache(session)
+            await self._delete_rows(
+                session,
+                SEARCH_INDEX_SHADOW_TABLE,
+                "project_id != :project_id",
+                {"project_id": self.project_id},
+            )
+            await session.execute(
+                text(f"""
+                    INSERT INTO {SEARCH_INDEX_SHADOW_TABLE} ({columns})
+                    SELECT {columns} FROM {SEARCH_INDEX_TABLE} WHERE project_id != :project_id
+                """),
+                {"project_id": self.project_id},
+            )
+            await self._sync_derived_rows(session, SEARCH_INDEX_SHADOW_TABLE)
+            # embeddings of entities that are gone, which the rebuilt index has no row for
+            await session.execute(
+                text(f"""
+                    DELETE FROM search_vector
+                    WHERE project_id = :project_id AND entity_id NOT IN (
+                        SELECT entity_id FROM {SEARCH_INDEX_SHADOW_TABLE}
+                        WHERE project_id = :project_id
+                            AND type = '{SearchItemType.ENTITY.value}'
+                            AND entity_id IS NOT NULL
+                    )
+                """),
+                {"project_id": self.project_id},
+            )
+
+            for table, shadow_table in (
+                (SEARCH_INDEX_TABLE, SEARCH_INDEX_SHADOW_TABLE),
+                (SEARCH_TRIGRAM_TABLE, SEARCH_TRIGRAM_SHADOW_TABLE),
+                (SEARCH_FILTER_TABLE, SEARCH_FILTER_SHADOW_TABLE),
+            ):
+                await session.execute(text(f"DROP TABLE {table}"))
+                await session.execute(text(f"ALTER TABLE {shadow_table} RENAME TO {table}"))
+            # dropping the live filter table dropped its indexes, build them on the new one
+            for create_index in CREATE_SEARCH_FILTER_INDEXES:
+                await session.execute(create_index)
+
+        logger.info(f"Swapped {SEARCH_INDEX_SHADOW_TABLE} in as {SEARCH_INDEX_TABLE}")
+
+    async def get_reindex_checkpoint(self) -> Optional[ReindexCheckpoint]:
+        """Get the checkpoint of an unfinished reindex of this project, if any."""
+        async with db.scoped_session(self.session_maker) as session:
+            result = await session.execute(
+                text("""
+                    SELECT last_entity_id, total_entities, indexed_entities, indexed_rows,
+                        started_at, run_entities, run_rows
+                    FROM search_index_checkpoint WHERE project_id = :project_id
+                """),
+                {"project_id": self.project_id},
+            )
+            row = result.mappings().one_or_none()
+
+        if row is None:
+            return None
+        started_at = row["started_at"]
+        if isinstance(started_at, str):
+            started_at = datetime.fromisoformat(started_at)
+        return ReindexCheckpoint(**{**row, "started_at": started_at})
+
+    async def save_reindex_checkpoint(self, checkpoint: ReindexCheckpoint) -> None:
+        """Record how far a reindex of this project has got."""
+        async with db.scoped_session(self.session_maker) as session:
+            await session.execute(
+                text("""
+                    INSERT OR REPLACE INTO search_index_checkpoint (
+                        project_id, last_entity_id, total_entities, indexed_entities,
+                        indexed_rows, started_at, run_entities, run_rows
+                    ) VALUES (
+                        :project_id, :last_entity_id, :total_entities, :indexed_entities,
+                        :indexed_rows, :started_at, :run_entities, :run_rows
+                    )
+                """),
+                {
+                    "project_id": self.project_id,
+                    "last_entity_id": checkpoint.last_entity_id,
+                    "total_entities": checkpoint.total_entities,
+                    "indexed_entities": checkpoint.indexed_entities,
+                    "indexed_rows": checkpoint.indexed_rows,
+                    "started_at": checkpoint.started_at.isoformat(),
+                    "run_entities": checkpoint.run_entities,
+                    "run_rows": checkpoint.run_rows,
+                },
+            )
+
+    async def delete_reindex_checkpoint(self) -> None:
+        """Forget the checkpoint of this project's reindex once it is complete."""
         async with db.scoped_session(self.session_maker) as session:
             await session.execute(
-                text(
-                    "DELETE FROM search_index WHERE permalink = :permalink AND project_id = :project_id"
-                ),
-                {"permalink": permalink, "project_id": self.project_id},
+                text("DELETE FROM search_index_checkpoint WHERE project_id = :project_id"),
+                {"project_id": self.project_id},
             )
-            await session.commit()
 
     async def execute_query(
         self,
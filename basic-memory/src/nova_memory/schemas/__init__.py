@@ -35,6 +35,9 @@ from nova_memory.schemas.response import (
     EntityListResponse,
     SearchNodesResponse,
     DeleteEntitiesResponse,
+    EntityLinksResponse,
+    EntityLinksListResponse,
+    BacklinksResponse,
 )
 
 from nova_memory.schemas.project_info import (
@@ -68,6 +71,9 @@ __all__ = [
     "EntityListResponse",
     "SearchNodesResponse",
     "DeleteEntitiesResponse",
+    "EntityLinksResponse",
+    "EntityLinksListResponse",
+    "BacklinksResponse",
     # Delete Operations
     "DeleteEntitiesRequest",
     # Project Info
@@ -0,0 +1,43 @@
+"""Schemas for query latency statistics."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class QueryShapeStats(BaseModel):
+    """Latencies of the queries of one shape, since the process started.
+
+    Percentiles are the upper bounds of histogram buckets, within 19% of the exact value.
+    """
+
+    shape: str
+    count: int
+    rows: int  # Returned by all the queries
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class SlowQuery(BaseModel):
+    """A query that took at least the slow query threshold, with its plan."""
+
+    shape: str
+    sql: str
+    params: Dict[str, Any]
+    plan: List[str]  # EXPLAIN QUERY PLAN, one line per step
+    elapsed_ms: float
+    rows: int
+    recorded_at: datetime
+
+
+class QueryStatsReport(BaseModel):
+    """Latencies of queries by shape, and the most recent slow queries."""
+
+    shapes: List[QueryShapeStats]  # Most total time first
+    slow_queries: List[SlowQuery]  # Oldest first
+    slow_query_ms: Optional[float] = None  # Threshold of the slow query log, None if disabled
+    generated_at: datetime
@@ -227,3 +227,46 @@ class DeleteEntitiesResponse(SQLAlchemyModel):
     """
 
     deleted: bool
+
+
+class EntityLinksResponse(SQLAlchemyModel):
+    """An entity with the counts of the relations to and from it.
+
+    Example Response:
+    {
+        "permalink": "component/memory-service",
+        "title": "MemoryService",
+        "file_path": "component/MemoryService.md",
+        "entity_type": "component",
+        "in_degree": 4,
+        "out_degree": 2,
+        "unresolved_count": 1
+    }
+    """
+
+    permalink: Optional[Permalink] = None
+    title: str
+    file_path: str
+    entity_type: EntityType
+    in_degree: int = Field(description="Number of relations to the entity")
+    out_degree: int = Field(description="Number of relations from the entity")
+    unresolved_count: int = Field(
+        description="Number of relations from the entity whose target doesn't exist yet"
+    )
+
+
+class EntityLinksListResponse(SQLAlchemyModel):
+    """Entities with their relation counts, for hub and orphan queries."""
+
+    entities: List[EntityLinksResponse]
+
+
+class BacklinksResponse(SQLAlchemyModel):
+    """The relations pointing to an entity.
+
+    in_degree of the entity is the total number of backlinks, of which
+    backlinks holds the requested page.
+    """
+
+    entity: EntityLinksResponse
+    backlinks: List[RelationResponse]
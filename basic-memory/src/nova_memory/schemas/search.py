@@ -22,6 +22,14 @@ class SearchItemType(str, Enum):
     RELATION = "relation"
 
 
+class SearchRetrieval(str, Enum):
+    """How a text search finds its results."""
+
+    FTS = "fts"  # full-text match, ranked by bm25
+    VECTOR = "vector"  # nearest notes by embedding, needs semantic search enabled
+    HYBRID = "hybrid"  # both, their rankings fused
+
+
 class SearchQuery(BaseModel):
     """Search query parameters.
 
@@ -35,6 +43,9 @@ class SearchQuery(BaseModel):
     - entity_types: Limit to specific entity types
     - after_date: Only items after date
 
+    Text is matched by full-text search unless retrieval is "vector", which finds the
+    notes nearest to it by embedding, or "hybrid", which combines the two.
+
     Boolean search examples:
     - "python AND flask" - Find items with both terms
     - "python OR django" - Find items with either term
@@ -53,6 +64,9 @@ class SearchQuery(BaseModel):
     entity_types: Optional[List[SearchItemType]] = None  # Filter by entity type
     after_date: Optional[Union[datetime, str]] = None  # Time-based filter
 
+    # How text is searched, falls back to fts if semantic search isn't enabled
+    retrieval: SearchRetrieval = SearchRetrieval.FTS
+
     @field_validator("after_date")
     @classmethod
     def validate_date(cls, v: Optional[Union[datetime, str]]) -> Optional[str]:
@@ -103,6 +117,8 @@ class SearchResult(BaseModel):
     to_entity: Optional[Permalink] = None  # For relations
     relation_type: Optional[str] = None  # For relations
 
+    project: Optional[str] = None  # For searches across projects
+
 
 class SearchResponse(BaseModel):
     """Wrapper for search results."""
@@ -110,3 +126,28 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     current_page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page, None on the last
+    total: Optional[int] = None  # Number of results on all pages, if requested
+
+
+class ReindexProgress(BaseModel):
+    """Progress of a full search reindex.
+
+    Rates cover the current run only, so they stay meaningful after a resume.
+    """
+
+    total_entities: int
+    indexed_entities: int
+    indexed_rows: int
+    elapsed_seconds: float
+    rows_per_second: float
+    eta_seconds: Optional[float] = None  # None until the rate is known
+
+
+class SearchCacheStats(BaseModel):
+    """Counters of the search result cache, since the process started."""
+
+    hits: int
+    misses: int
+    size: int  # Cached results, across all projects
+    hit_rate: float
@@ -1,19 +1,27 @@
 """Service for building rich context from the knowledge graph."""
 
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from functools import partial
+from itertools import groupby, islice
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
 
 from loguru import logger
 from sqlalchemy import text
 
 from nova_memory.repository.entity_repository import EntityRepository
 from nova_memory.repository.observation_repository import ObservationRepository
+from nova_memory.repository.query_stats import query_stats
+from nova_memory.repository.relation_graph import RelationGraph, get_relation_graph_cache
 from nova_memory.repository.search_repository import SearchRepository, SearchIndexRow
 from nova_memory.schemas.memory import MemoryUrl, memory_url_path
 from nova_memory.schemas.search import SearchItemType
 from nova_memory.utils import generate_permalink
 
+# Default maximum number of relations followed from each entity when finding related items
+RELATED_FAN_OUT = 100
+
 
 @dataclass
 class ContextResultRow:
@@ -79,10 +87,16 @@ class ContextService:
         search_repository: SearchRepository,
         entity_repository: EntityRepository,
         observation_repository: ObservationRepository,
+        relation_graph: bool = True,
+        fan_out: Optional[int] = RELATED_FAN_OUT,
     ):
         self.search_repository = search_repository
         self.entity_repository = entity_repository
         self.observation_repository = observation_repository
+        # follow relations in the project's in-memory RelationGraph, not a query per level
+        self.relation_graph = relation_graph
+        # most relations followed from each entity, the lowest ids first, None for all
+        self.fan_out = fan_out
 
     async def build_context(
         self,
@@ -213,10 +227,16 @@ class ContextService:
     ) -> List[ContextResultRow]:
         """Find items connected through relations.
 
-        Uses recursive CTE to find:
+        Walks the relations breadth first, in the project's in-memory RelationGraph or
+        with a query per level if relation_graph is off, to find:
         - Connected entities
         - Relations that connect them
 
+        Each item is found once, at the least depth it is reached at, and the walk
+        stops once max_results items are found. At most fan_out relations are followed
+        from each entity, so a level costs at most max_results * fan_out steps however
+        linked the notes are.
+
         Note on depth:
         Each traversal step requires two depth levels - one to find the relation,
         and another to follow that relation to an entity. So a max_depth of 4 allows
@@ -239,163 +259,257 @@ class ContextService:
             f"Finding connected items for {len(entity_ids)} entities with depth {max_depth}"
         )
 
-        # Build the VALUES clause for entity IDs
-        entity_id_values = ", ".join([str(i) for i in entity_ids])
+        start = time.perf_counter()
+        if self.relation_graph:
+            session_maker = self.search_repository.session_maker
+            project_id = self.search_repository.project_id
+            graph = await get_relation_graph_cache(session_maker, project_id).get(
+                session_maker, project_id
+            )
+            relation_steps = partial(self._graph_steps, graph)
+        else:
+            relation_steps = self._query_steps
+
+        seeds = list(dict.fromkeys(entity_ids))
+        if since:
+            recent = await self._created_since(seeds, since)
+            seeds = [entity_id for entity_id in seeds if entity_id in recent]
+
+        excluded = set(type_id_pairs)
+        # (type, id) -> (depth, root_id) of every item reached
+        reached: Dict[Tuple[str, int], Tuple[int, int]] = {
+            ("entity", entity_id): (0, entity_id) for entity_id in seeds
+        }
+        found = 0
+        frontier = sorted(seeds)
+        depth = 0
+        while frontier and depth < max_depth and found < max_results:
+            steps = await relation_steps(frontier, since)
+
+            # relations of the frontier entities
+            for entity_id, relation_id, _ in steps:
+                key = ("relation", relation_id)
+                if key not in reached:
+                    reached[key] = (depth + 1, reached[("entity", entity_id)][1])
+                    found += key not in excluded
+            if found >= max_results or depth + 1 >= max_depth:
+                break
+
+            # entities at the other end of those relations
+            next_frontier = []
+            for entity_id, _, next_id in steps:
+                if next_id is None:
+                    continue
+                key = ("entity", next_id)
+                if key not in reached:
+                    reached[key] = (depth + 2, reached[("entity", entity_id)][1])
+                    found += key not in excluded
+                    next_frontier.append(next_id)
+            frontier = sorted(next_frontier)
+            depth += 2
+
+        # items of a level are ordered by type and id, and only the first max_results kept
+        selected = sorted(
+            (key for key in reached if key not in excluded),
+            key=lambda key: (reached[key][0], key),
+        )[:max_results]
+        context_rows = await self._context_rows([(key, reached[key]) for key in selected])
+        # the traversal as a whole, there's no one statement to explain. The queries
+        # of each step are recorded with their SQL by _query_steps
+        await query_stats.record(
+            self.search_repository.session_maker,
+            f"find_related: depth={max_depth}{' since' if since else ''} "
+            f"{'graph' if self.relation_graph else 'query'}",
+            None,
+            {},
+            time.perf_counter() - start,
+            len(context_rows),
+        )
+        return context_rows
 
-        # For compatibility with the old query, we still need this for filtering
-        values = ", ".join([f"('{t}', {i})" for t, i in type_id_pairs])
+    async def _graph_steps(
+        self, graph: RelationGraph, frontier: List[int], since: Optional[datetime]
+    ) -> List[Tuple[int, int, Optional[int]]]:
+        """The relations to follow from the frontier entities, found in the relation graph.
+
+        Returns (entity id, relation id, next entity id) for the relations from or to
+        each frontier entity, the fan_out lowest relation ids of each, ordered by entity
+        and relation id. The next entity is the relation's to entity if it is from the
+        frontier entity, or else its from entity, and None for an unresolved relation.
+        With since, relations from entities created before it aren't followed, and
+        entities created before it aren't reached.
+        """
+        steps = [
+            (entity_id, relation_id, from_id, to_id if from_id == entity_id else from_id)
+            for entity_id in frontier
+            for relation_id, from_id, to_id in sorted(graph.neighbors(entity_id))
+        ]
+        if since:
+            recent = await self._created_since(
+                {step[2] for step in steps} | {step[3] for step in steps if step[3] is not None},
+                since,
+            )
+            steps = [
+                (entity_id, relation_id, from_id, next_id if next_id in recent else None)
+                for entity_id, relation_id, from_id, next_id in steps
+                if from_id in recent
+            ]
+
+        followed = []
+        for _, entity_steps in groupby(steps, key=lambda step: step[0]):
+            followed.extend(
+                (entity_id, relation_id, next_id)
+                for entity_id, relation_id, _, next_id in islice(entity_steps, self.fan_out)
+            )
+        return followed
 
-        # Parameters for bindings
-        params = {"max_depth": max_depth, "max_results": max_results}
+    async def _query_steps(
+        self, frontier: List[int], since: Optional[datetime]
+    ) -> List[Tuple[int, int, Optional[int]]]:
+        """The relations to follow from the frontier entities, found by one query.
 
-        # Build date and timeframe filters conditionally based on since parameter
+        Returns the same steps as _graph_steps, read from the relation table.
+        """
+        entity_ids = ", ".join(map(str, frontier))
+        params: Dict[str, Any] = {}
         if since:
-            params["since_date"] = since.isoformat()  # pyright: ignore
-            date_filter = "AND e.created_at >= :since_date"
-            relation_date_filter = "AND e_from.created_at >= :since_date"
-            timeframe_condition = "AND eg.relation_date >= :since_date"
+            params["since_date"] = since.isoformat()
+            recent_from = (
+                "JOIN entity e_from ON e_from.id = s.from_id AND e_from.created_at >= :since_date"
+            )
+            recent_next = (
+                "LEFT JOIN entity e_next "
+                "ON e_next.id = s.next_id AND e_next.created_at >= :since_date"
+            )
+            next_id = "e_next.id"
         else:
-            date_filter = ""
-            relation_date_filter = ""
-            timeframe_condition = ""
+            recent_from = recent_next = ""
+            next_id = "s.next_id"
+        if self.fan_out is not None:
+            params["fan_out"] = self.fan_out
+            fan_out = "WHERE s.n <= :fan_out"
+        else:
+            fan_out = ""
 
-        # Use a CTE that operates directly on entity and relation tables
-        # This avoids the overhead of the search_index virtual table
         query = text(f"""
-        WITH RECURSIVE entity_graph AS (
-            -- Base case: seed entities
-            SELECT 
-                e.id,
-                'entity' as type,
-                e.title, 
-                e.permalink,
-                e.file_path,
-                NULL as from_id,
-                NULL as to_id,
-                NULL as relation_type,
-                NULL as content,
-                NULL as category,
-                NULL as entity_id,
-                0 as depth,
-                e.id as root_id,
-                e.created_at,
-                e.created_at as relation_date,
-                0 as is_incoming
-            FROM entity e
-            WHERE e.id IN ({entity_id_values})
-            {date_filter}
-
-            UNION ALL
-
-            -- Get relations from current entities
-            SELECT
-                r.id,
-                'relation' as type,
-                r.relation_type || ': ' || r.to_name as title,
-                -- Relation model doesn't have permalink column - we'll generate it at runtime
-                '' as permalink,
-                e_from.file_path,
-                r.from_id,
-                r.to_id,
-                r.relation_type,
-                NULL as content,
-                NULL as category,
-                NULL as entity_id,
-                eg.depth + 1,
-                eg.root_id,
-                e_from.created_at, -- Use the from_entity's created_at since relation has no timestamp
-                e_from.created_at as relation_date,
-                CASE WHEN r.from_id = eg.id THEN 0 ELSE 1 END as is_incoming
-            FROM entity_graph eg
-            JOIN relation r ON (
-                eg.type = 'entity' AND
-                (r.from_id = eg.id OR r.to_id = eg.id)
-            )
-            JOIN entity e_from ON (
-                r.from_id = e_from.id
-                {relation_date_filter}
+            WITH steps AS (
+                SELECT r.from_id AS entity_id, r.id AS relation_id, r.from_id, r.to_id AS next_id
+                FROM relation r
+                WHERE r.from_id IN ({entity_ids})
+                UNION ALL
+                SELECT r.to_id, r.id, r.from_id, r.from_id
+                FROM relation r
+                WHERE r.to_id IN ({entity_ids}) AND r.from_id != r.to_id
+            ),
+            followed AS (
+                SELECT
+                    s.*,
+                    ROW_NUMBER() OVER (PARTITION BY s.entity_id ORDER BY s.relation_id) AS n
+                FROM steps s
+                {recent_from}
             )
-            WHERE eg.depth < :max_depth
-
-            UNION ALL
-
-            -- Get entities connected by relations
-            SELECT
-                e.id,
-                'entity' as type,
-                e.title,
-                CASE 
-                    WHEN e.permalink IS NULL THEN '' 
-                    ELSE e.permalink 
-                END as permalink,
-                e.file_path,
-                NULL as from_id,
-                NULL as to_id,
-                NULL as relation_type,
-                NULL as content,
-                NULL as category,
-                NULL as entity_id,
-                eg.depth + 1,
-                eg.root_id,
-                e.created_at,
-                eg.relation_date,
-                eg.is_incoming
-            FROM entity_graph eg
-            JOIN entity e ON (
-                eg.type = 'relation' AND
-                e.id = CASE 
-                    WHEN eg.is_incoming = 0 THEN eg.to_id
-                    ELSE eg.from_id
-                END
-                {date_filter}
-            )
-            WHERE eg.depth < :max_depth
-            -- Only include entities connected by relations within timeframe if specified
-            {timeframe_condition}
+            SELECT s.entity_id, s.relation_id, {next_id} AS next_id
+            FROM followed s
+            {recent_next}
+            {fan_out}
+            ORDER BY s.entity_id, s.relation_id
+        """)
+        start = time.perf_counter()
+        result = await self.search_repository.execute_query(query, params=params)
+        steps = [tuple(row) for row in result]
+        await query_stats.record(
+            self.search_repository.session_maker,
+            f"find_related step{' since' if since else ''}"
+            f"{' fan_out' if self.fan_out is not None else ''}",
+            query,
+            params,
+            time.perf_counter() - start,
+            len(steps),
         )
-        SELECT DISTINCT 
-            type,
-            id,
-            title,
-            permalink,
-            file_path,
-            from_id,
-            to_id,
-            relation_type,
-            content,
-            category,
-            entity_id,
-            MIN(depth) as depth,
-            root_id,
-            created_at
-        FROM entity_graph
-        WHERE (type, id) NOT IN ({values})
-        GROUP BY
-            type, id
-        ORDER BY depth, type, id
-        LIMIT :max_results
-       """)
+        return steps
 
-        result = await self.search_repository.execute_query(query, params=params)
-        rows = result.all()
-
-        context_rows = [
-            ContextResultRow(
-                type=row.type,
-                id=row.id,
-                title=row.title,
-                permalink=row.permalink,
-                file_path=row.file_path,
-                from_id=row.from_id,
-                to_id=row.to_id,
-                relation_type=row.relation_type,
-                content=row.content,
-                category=row.category,
-                entity_id=row.entity_id,
-                depth=row.depth,
-                root_id=row.root_id,
-                created_at=row.created_at,
+    async def _created_since(self, entity_ids: Collection[int], since: datetime) -> Set[int]:
+        """The entities of entity_ids created since a time, compared as ISO strings."""
+        if not entity_ids:
+            return set()
+        query = text(f"""
+            SELECT id FROM entity
+            WHERE id IN ({", ".join(str(i) for i in entity_ids)})
+            AND created_at >= :since_date
+        """)
+        result = await self.search_repository.execute_query(
+            query, params={"since_date": since.isoformat()}
+        )
+        return set(result.scalars().all())
+
+    async def _context_rows(
+        self, items: List[Tuple[Tuple[str, int], Tuple[int, int]]]
+    ) -> List[ContextResultRow]:
+        """Rows of the (type, id) items reached, each with its (depth, root_id).
+
+        Relations take the file path and creation time of the entity they are from.
+        Items deleted since the relation graph was loaded are left out.
+        """
+        entity_ids = [item_id for (item_type, item_id), _ in items if item_type == "entity"]
+        relation_ids = [item_id for (item_type, item_id), _ in items if item_type == "relation"]
+        rows = {}
+        if entity_ids:
+            result = await self.search_repository.execute_query(
+                text(f"""
+                    SELECT
+                        'entity' as type,
+                        id,
+                        title,
+                        CASE WHEN permalink IS NULL THEN '' ELSE permalink END as permalink,
+                        file_path,
+                        NULL as from_id,
+                        NULL as to_id,
+                        NULL as relation_type,
+                        created_at
+                    FROM entity
+                    WHERE id IN ({", ".join(map(str, entity_ids))})
+                """),
+                params={},
             )
-            for row in rows
-        ]
+            rows.update((("entity", row.id), row) for row in result)
+        if relation_ids:
+            result = await self.search_repository.execute_query(
+                text(f"""
+                    SELECT
+                        'relation' as type,
+                        r.id,
+                        r.relation_type || ': ' || r.to_name as title,
+                        '' as permalink,
+                        e_from.file_path,
+                        r.from_id,
+                        r.to_id,
+                        r.relation_type,
+                        e_from.created_at
+                    FROM relation r
+                    JOIN entity e_from ON e_from.id = r.from_id
+                    WHERE r.id IN ({", ".join(map(str, relation_ids))})
+                """),
+                params={},
+            )
+            rows.update((("relation", row.id), row) for row in result)
+
+        context_rows = []
+        for key, (depth, root_id) in items:
+            row = rows.get(key)
+            if row is not None:
+                context_rows.append(
+                    ContextResultRow(
+                        type=row.type,
+                        id=row.id,
+                        title=row.title,
+                        permalink=row.permalink,
+                        file_path=row.file_path,
+                        from_id=row.from_id,
+                        to_id=row.to_id,
+                        relation_type=row.relation_type,
+                        depth=depth,
+                        root_id=root_id,
+                        created_at=row.created_at,
+                    )
+                )
         return context_rows
@@ -26,7 +26,7 @@ class DirectoryService:
         """Build a hierarchical directory tree from indexed files."""
 
         # Get all files from DB (flat list)
-        entity_rows = await self.entity_repository.find_all()
+        entity_rows = await self.entity_repository.find_all(load="summary")
 
         # Create a root directory node
         root_node = DirectoryNode(name="Root", directory_path="/", type="directory")
@@ -0,0 +1,67 @@
+"""Embedding functions for semantic search."""
+
+import hashlib
+import math
+import re
+from typing import Callable, List, Optional, Sequence
+
+from nova_memory.config import NovaMemoryConfig
+
+# Turns texts into vectors of one length, close together for texts alike in meaning
+EmbeddingFunction = Callable[[Sequence[str]], List[List[float]]]
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbedding:
+    """Embedding hashing the words of a text, and their character n-grams, into buckets.
+
+    Deterministic and needs no model or network, so semantic search works offline.
+    Texts sharing words or parts of words, like "deploy" and "deployment", end up
+    close together. Pass SearchService a model's embedding function instead to
+    match texts by meaning alone.
+    """
+
+    def __init__(self, dimensions: int = 256, ngram_size: int = 3):
+        """Initialize with the size of the vectors.
+
+        Args:
+            dimensions: Number of buckets, the length of each vector
+            ngram_size: Length of the character n-grams hashed besides whole words
+
+        Raises:
+            ValueError: If dimensions or ngram_size isn't positive
+        """
+        if dimensions <= 0 or ngram_size <= 0:
+            raise ValueError("dimensions and ngram_size must be positive")
+        self.dimensions = dimensions
+        self.ngram_size = ngram_size
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a text as a vector of unit length, or of zeros if it has no words."""
+        vector = [0.0] * self.dimensions
+        for word in WORD_PATTERN.findall(text.lower()):
+            self._add(vector, f"word:{word}", 1.0)
+            # n-grams of the word between boundary markers, so prefixes and suffixes count
+            padded = f"<{word}>"
+            for i in range(max(len(padded) - self.ngram_size + 1, 1)):
+                self._add(vector, f"ngram:{padded[i : i + self.ngram_size]}", 0.5)
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def _add(self, vector: List[float], feature: str, weight: float) -> None:
+        """Add a feature to the bucket it hashes to, with a hashed sign to offset collisions."""
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+        vector[bucket] += weight if digest[4] & 1 else -weight
+
+
+def get_embedding(app_config: NovaMemoryConfig) -> Optional[EmbeddingFunction]:
+    """Get the embedding function for semantic search, None if it isn't enabled."""
+    if not app_config.semantic_search:
+        return None
+    return HashingEmbedding(app_config.semantic_search_dimensions)
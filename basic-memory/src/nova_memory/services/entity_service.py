@@ -1,13 +1,13 @@
 """Service for managing entities in the database."""
 
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple, Union
+from typing import List, Optional, Sequence, Set, Tuple, Union
 
 import frontmatter
 import yaml
 from loguru import logger
-from sqlalchemy.exc import IntegrityError
 
+from nova_memory import db
 from nova_memory.config import ProjectConfig, NovaMemoryConfig
 from nova_memory.file_utils import has_frontmatter, parse_frontmatter, remove_frontmatter
 from nova_memory.markdown import EntityMarkdown
@@ -58,14 +58,14 @@ class EntityService(BaseService[EntityModel]):
         # If markdown has explicit permalink, try to validate it
         if markdown and markdown.frontmatter.permalink:
             desired_permalink = markdown.frontmatter.permalink
-            existing = await self.repository.get_by_permalink(desired_permalink)
+            existing = await self.repository.get_by_permalink(desired_permalink, load="summary")
 
             # If no conflict or it's our own file, use as is
             if not existing or existing.file_path == str(file_path):
                 return desired_permalink
 
         # For existing files, try to find current permalink
-        existing = await self.repository.get_by_file_path(str(file_path))
+        existing = await self.repository.get_by_file_path(str(file_path), load="summary")
         if existing:
             return existing.permalink
 
@@ -78,7 +78,7 @@ class EntityService(BaseService[EntityModel]):
         # Make unique if needed
         permalink = desired_permalink
         suffix = 1
-        while await self.repository.get_by_permalink(permalink):
+        while await self.repository.get_by_permalink(permalink, load="ids_only"):
             permalink = f"{desired_permalink}-{suffix}"
             suffix += 1
             logger.debug(f"creating unique permalink: {permalink}")
@@ -95,8 +95,8 @@ class EntityService(BaseService[EntityModel]):
 
         # Try to find existing entity using smart resolution
         existing = await self.link_resolver.resolve_link(
-            schema.file_path
-        ) or await self.link_resolver.resolve_link(schema.permalink)
+            schema.file_path, load="summary"
+        ) or await self.link_resolver.resolve_link(schema.permalink, load="summary")
 
         if existing:
             logger.debug(f"Found existing entity: {existing.file_path}")
@@ -351,37 +351,44 @@ class EntityService(BaseService[EntityModel]):
 
         db_entity = await self.repository.get_by_file_path(path)
 
-        # Clear existing relations first
-        await self.relation_repository.delete_outgoing_relations_from_entity(db_entity.id)
-
-        # Process each relation
+        # Process each relation, skipping duplicates of the unique constraints
+        relations = []
+        seen_targets: Set[Tuple[str, Union[int, str], str]] = set()
         for rel in markdown.relations:
             # Resolve the target permalink
-            target_entity = await self.link_resolver.resolve_link(
-                rel.target,
-            )
+            target_entity = await self.link_resolver.resolve_link(rel.target, load="summary")
 
             # if the target is found, store the id
             target_id = target_entity.id if target_entity else None
             # if the target is found, store the title, otherwise add the target for a "forward link"
             target_name = target_entity.title if target_entity else rel.target
 
-            # Create the relation
-            relation = Relation(
-                from_id=db_entity.id,
-                to_id=target_id,
-                to_name=target_name,
-                relation_type=rel.type,
-                context=rel.context,
-            )
-            try:
-                await self.relation_repository.add(relation)
-            except IntegrityError:
-                # Unique constraint violation - relation already exists
+            keys: Set[Tuple[str, Union[int, str], str]] = {("name", target_name, rel.type)}
+            if target_id is not None:
+                keys.add(("id", target_id, rel.type))
+            if keys & seen_targets:
                 logger.debug(
                     f"Skipping duplicate relation {rel.type} from {db_entity.permalink} target: {rel.target}"
                 )
                 continue
+            seen_targets.update(keys)
+
+            relations.append(
+                Relation(
+                    from_id=db_entity.id,
+                    to_id=target_id,
+                    to_name=target_name,
+                    relation_type=rel.type,
+                    context=rel.context,
+                )
+            )
+
+        # Replace the existing relations in one transaction, with the link counters
+        # the relation triggers keep on both ends
+        async with db.batch_session(self.relation_repository.session_maker):
+            await self.relation_repository.delete_outgoing_relations_from_entity(db_entity.id)
+            if relations:
+                await self.relation_repository.add_all(relations)
 
         return await self.repository.get_by_file_path(path)
 
@@ -414,7 +421,7 @@ class EntityService(BaseService[EntityModel]):
         logger.debug(f"Editing entity: {identifier}, operation: {operation}")
 
         # Find the entity using the link resolver
-        entity = await self.link_resolver.resolve_link(identifier)
+        entity = await self.link_resolver.resolve_link(identifier, load="summary")
         if not entity:
             raise EntityNotFoundError(f"Entity not found: {identifier}")
 
@@ -631,7 +638,7 @@ class EntityService(BaseService[EntityModel]):
         logger.debug(f"Moving entity: {identifier} to {destination_path}")
 
         # 1. Resolve identifier to entity
-        entity = await self.link_resolver.resolve_link(identifier)
+        entity = await self.link_resolver.resolve_link(identifier, load="summary")
         if not entity:
             raise EntityNotFoundError(f"Entity not found: {identifier}")
 
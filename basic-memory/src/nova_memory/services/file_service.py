@@ -66,6 +66,17 @@ class FileService:
         markdown = await self.markdown_processor.read_file(file_path)
         return markdown.content or ""
 
+    def read_entity_content_blocking(self, entity: EntityModel) -> str:
+        """Get entity's content like read_entity_content.
+
+        This is a blocking call, so it can be run in a worker thread.
+        """
+        file_path = self.get_entity_path(entity)
+        markdown = self.markdown_processor.entity_parser.parse_content(
+            file_path, file_path.read_text(encoding="utf-8")
+        )
+        return markdown.content or ""
+
     async def delete_entity_file(self, entity: EntityModel) -> None:
         """Delete entity file from filesystem.
 
@@ -231,13 +242,8 @@ class FileService:
         full_path = path_obj if path_obj.is_absolute() else self.base_path / path_obj
 
         try:
-            if self.is_markdown(path):
-                # read str
-                content = full_path.read_text(encoding="utf-8")
-            else:
-                # read bytes
-                content = full_path.read_bytes()
-            return await file_utils.compute_checksum(content)
+            # markdown is hashed as text, other files as raw bytes
+            return file_utils.compute_file_checksum(full_path, text=self.is_markdown(path))
 
         except Exception as e:  # pragma: no cover
             logger.error("Failed to compute checksum", path=str(full_path), error=str(e))
@@ -14,6 +14,7 @@ from nova_memory import db
 from nova_memory.config import NovaMemoryConfig
 from nova_memory.models import Project
 from nova_memory.repository import ProjectRepository
+from nova_memory.repository.query_stats import query_stats
 
 
 async def initialize_database(app_config: NovaMemoryConfig) -> None:
@@ -184,6 +185,7 @@ async def initialize_app(
     This function handles all initialization steps:
     - Running database migrations
     - Reconciling projects from config.json with projects table
+    - Configuring the slow query log
     - Setting up file synchronization
     - Migrating legacy project data
 
@@ -191,6 +193,10 @@ async def initialize_app(
         app_config: The Nova Memory project configuration
     """
     logger.info("Initializing app...")
+    query_stats.slow_query_seconds = (
+        app_config.slow_query_ms / 1000 if app_config.slow_query_ms else None
+    )
+
     # Initialize database first
     await initialize_database(app_config)
 
@@ -1,14 +1,18 @@
 """Service for resolving markdown links to permalinks."""
 
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
 
 from loguru import logger
+from sqlalchemy import Row
 
 from nova_memory.models import Entity
-from nova_memory.repository.entity_repository import EntityRepository
+from nova_memory.repository.entity_repository import EntityLoad, EntityRepository
 from nova_memory.schemas.search import SearchQuery, SearchItemType
 from nova_memory.services.search_service import SearchService
 
+# An Entity, or a row with its permalink, title and file_path columns
+T = TypeVar("T", Entity, Row)
+
 
 class LinkResolver:
     """Service for resolving markdown links to permalinks.
@@ -26,59 +30,129 @@ class LinkResolver:
         self.entity_repository = entity_repository
         self.search_service = search_service
 
-    async def resolve_link(self, link_text: str, use_search: bool = True) -> Optional[Entity]:
-        """Resolve a markdown link to a permalink."""
+    async def resolve_link(
+        self, link_text: str, use_search: bool = True, load: EntityLoad = "full"
+    ) -> Optional[Entity]:
+        """Resolve a markdown link to a permalink.
+
+        The exact matches are looked up in one query, and search is only used when
+        none of them match.
+
+        Args:
+            link_text: Link text, with or without brackets and alias
+            use_search: Whether to fall back to search for fuzzy matching
+            load: How much of the entity to load, "summary" when only its columns are used
+        """
         logger.trace(f"Resolving link: {link_text}")
 
         # Clean link text and extract any alias
         clean_text, alias = self._normalize_link_text(link_text)
 
-        # 1. Try exact permalink match first (most efficient)
-        entity = await self.entity_repository.get_by_permalink(clean_text)
+        # 1-4. Try exact permalink, title, file path and file path with .md matches
+        candidates = await self.entity_repository.find_link_candidates(clean_text, load=load)
+        entity = self._match(clean_text, *self._link_maps(candidates))
         if entity:
-            logger.debug(f"Found exact permalink match: {entity.permalink}")
+            logger.debug(f"Found exact match for link: {clean_text} -> {entity.permalink}")
             return entity
 
-        # 2. Try exact title match
-        found = await self.entity_repository.get_by_title(clean_text)
-        if found and len(found) == 1:
-            entity = found[0]
-            logger.debug(f"Found title match: {entity.title}")
-            return entity
-
-        # 3. Try file path
-        found_path = await self.entity_repository.get_by_file_path(clean_text)
-        if found_path:
-            logger.debug(f"Found entity with path: {found_path.file_path}")
-            return found_path
-
-        # 4. Try file path with .md extension if not already present
-        if not clean_text.endswith(".md") and "/" in clean_text:
-            file_path_with_md = f"{clean_text}.md"
-            found_path_md = await self.entity_repository.get_by_file_path(file_path_with_md)
-            if found_path_md:
-                logger.debug(f"Found entity with path (with .md): {found_path_md.file_path}")
-                return found_path_md
-
         # search if indicated
         if use_search and "*" not in clean_text:
             # 5. Fall back to search for fuzzy matching on title (use text search for prefix matching)
-            results = await self.search_service.search(
-                query=SearchQuery(text=clean_text, entity_types=[SearchItemType.ENTITY]),
-            )
-
-            if results:
-                # Look for best match
-                best_match = min(results, key=lambda x: x.score)  # pyright: ignore
-                logger.trace(
-                    f"Selected best match from {len(results)} results: {best_match.permalink}"
-                )
-                if best_match.permalink:
-                    return await self.entity_repository.get_by_permalink(best_match.permalink)
+            permalink = await self._search_permalink(clean_text)
+            if permalink:
+                return await self.entity_repository.get_by_permalink(permalink, load=load)
 
         # if we couldn't find anything then return None
         return None
 
+    async def resolve_links(
+        self, link_texts: Iterable[str], use_search: bool = True
+    ) -> Dict[str, Row]:
+        """Resolve many markdown links at once.
+
+        Follows the same steps as resolve_link, but the id, title, permalink and
+        file_path of every entity are loaded once and links are matched against
+        in-memory maps instead of querying per link. The links with no exact match
+        are searched together in one query, so many dangling links, which never
+        match, cost one search rather than one each.
+
+        Returns:
+            Mapping of link text to the (id, title, permalink, file_path) row of the
+            entity it resolved to. Links that could not be resolved are left out.
+        """
+        entities = await self.entity_repository.find_link_targets()
+        by_permalink, by_title, by_file_path = self._link_maps(entities)
+
+        resolved = {}
+        unmatched: Dict[str, str] = {}
+        for link_text in set(link_texts):
+            clean_text, _ = self._normalize_link_text(link_text)
+
+            entity = self._match(clean_text, by_permalink, by_title, by_file_path)
+            if entity is not None:
+                resolved[link_text] = entity
+            elif use_search and "*" not in clean_text:
+                unmatched[link_text] = clean_text
+
+        if unmatched:
+            permalinks = await self.search_service.best_entity_permalinks(
+                list(set(unmatched.values()))
+            )
+            for link_text, clean_text in unmatched.items():
+                entity = by_permalink.get(permalinks.get(clean_text, ""))
+                if entity is not None:
+                    resolved[link_text] = entity
+
+        logger.debug(f"Resolved {len(resolved)} links from {len(entities)} entities")
+        return resolved
+
+    @staticmethod
+    def _link_maps(
+        entities: Sequence[T],
+    ) -> Tuple[Dict[str, T], Dict[str, List[T]], Dict[str, T]]:
+        """Map entities, or rows with their columns, by permalink, title and file_path."""
+        by_permalink = {entity.permalink: entity for entity in entities if entity.permalink}
+        by_file_path = {entity.file_path: entity for entity in entities}
+        by_title: Dict[str, List[T]] = {}
+        for entity in entities:
+            by_title.setdefault(entity.title, []).append(entity)
+        return by_permalink, by_title, by_file_path
+
+    @staticmethod
+    def _match(
+        clean_text: str,
+        by_permalink: Dict[str, T],
+        by_title: Dict[str, List[T]],
+        by_file_path: Dict[str, T],
+    ) -> Optional[T]:
+        """Get the entity a link exactly matches, trying each match in priority order.
+
+        An exact permalink match wins, then a title only one entity has, then the file
+        path, then the file path with .md added for links with a folder.
+        """
+        titled = by_title.get(clean_text, [])
+        entity = (
+            by_permalink.get(clean_text)
+            or (titled[0] if len(titled) == 1 else None)
+            or by_file_path.get(clean_text)
+        )
+        if entity is None and not clean_text.endswith(".md") and "/" in clean_text:
+            entity = by_file_path.get(f"{clean_text}.md")
+        return entity
+
+    async def _search_permalink(self, text: str) -> Optional[str]:
+        """Get the permalink of the best entity search match for text, if any."""
+        results = await self.search_service.search(
+            query=SearchQuery(text=text, entity_types=[SearchItemType.ENTITY]),
+        )
+        if not results:
+            return None
+
+        # Look for best match
+        best_match = min(results, key=lambda x: x.score)  # pyright: ignore
+        logger.trace(f"Selected best match from {len(results)} results: {best_match.permalink}")
+        return best_match.permalink
+
     def _normalize_link_text(self, link_text: str) -> Tuple[str, Optional[str]]:
         """Normalize link text and extract alias if present.
 
@@ -311,9 +311,12 @@ class ProjectService:
                     f"Changed default project to '{new_default.name}' as '{name}' was deactivated"
                 )
 
-    async def get_project_info(self) -> ProjectInfoResponse:
+    async def get_project_info(self, project_id: int) -> ProjectInfoResponse:
         """Get comprehensive information about the current Nova Memory project.
 
+        Args:
+            project_id: The project whose link statistics are read
+
         Returns:
             Comprehensive project information and statistics
         """
@@ -321,7 +324,7 @@ class ProjectService:
             raise ValueError("Repository is required for get_project_info")
 
         # Get statistics
-        statistics = await self.get_statistics()
+        statistics = await self.get_statistics(project_id)
 
         # Get activity metrics
         activity = await self.get_activity_metrics()
@@ -363,8 +366,12 @@ class ProjectService:
             system=system,
         )
 
-    async def get_statistics(self) -> ProjectStatistics:
-        """Get statistics about the current project."""
+    async def get_statistics(self, project_id: int) -> ProjectStatistics:
+        """Get statistics about the current project.
+
+        Unresolved, most connected and isolated counts are read from the project's
+        entity link counters rather than the relation table.
+        """
         if not self.repository:  # pragma: no cover
             raise ValueError("Repository is required for get_statistics")
 
@@ -385,7 +392,11 @@ class ProjectService:
         total_relations = relation_count_result.scalar() or 0
 
         unresolved_count_result = await self.repository.execute_query(
-            text("SELECT COUNT(*) FROM relation WHERE to_id IS NULL")
+            text(
+                "SELECT COALESCE(SUM(unresolved_count), 0) FROM entity "
+                "WHERE project_id = :project_id"
+            ),
+            {"project_id": project_id},
         )
         total_unresolved = unresolved_count_result.scalar() or 0
 
@@ -407,16 +418,16 @@ class ProjectService:
         )
         relation_types = {row[0]: row[1] for row in relation_types_result.fetchall()}
 
-        # Find most connected entities (most outgoing relations)
+        # Find most connected entities from their link counters
         connected_result = await self.repository.execute_query(
             text("""
-            SELECT e.id, e.title, e.permalink, COUNT(r.id) AS relation_count, file_path
-            FROM entity e
-            JOIN relation r ON e.id = r.from_id
-            GROUP BY e.id
-            ORDER BY relation_count DESC
+            SELECT id, title, permalink, in_degree + out_degree AS relation_count, file_path
+            FROM entity
+            WHERE project_id = :project_id AND in_degree + out_degree > 0
+            ORDER BY in_degree + out_degree DESC
             LIMIT 10
-        """)
+        """),
+            {"project_id": project_id},
         )
         most_connected = [
             {
@@ -429,15 +440,13 @@ class ProjectService:
             for row in connected_result.fetchall()
         ]
 
-        # Count isolated entities (no relations)
+        # Count isolated entities (no relations), which the orphan index holds
         isolated_result = await self.repository.execute_query(
-            text("""
-            SELECT COUNT(e.id)
-            FROM entity e
-            LEFT JOIN relation r1 ON e.id = r1.from_id
-            LEFT JOIN relation r2 ON e.id = r2.to_id
-            WHERE r1.id IS NULL AND r2.id IS NULL
-        """)
+            text(
+                "SELECT COUNT(*) FROM entity "
+                "WHERE project_id = :project_id AND in_degree = 0 AND out_degree = 0"
+            ),
+            {"project_id": project_id},
         )
         isolated_count = isolated_result.scalar() or 0
 
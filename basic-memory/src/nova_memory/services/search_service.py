@@ -1,19 +1,65 @@
 """Service for search operations."""
 
 import ast
-from datetime import datetime
-from typing import List, Optional, Set
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 from dateparser import parse
 from fastapi import BackgroundTasks
 from loguru import logger
-from sqlalchemy import text
 
+from nova_memory import db
 from nova_memory.models import Entity
 from nova_memory.repository import EntityRepository
-from nova_memory.repository.search_repository import SearchRepository, SearchIndexRow
-from nova_memory.schemas.search import SearchQuery, SearchItemType
+from nova_memory.repository.search_repository import (
+    ReindexCheckpoint,
+    SearchCursor,
+    SearchIndexRow,
+    SearchRepository,
+)
+from nova_memory.schemas.search import (
+    ReindexProgress,
+    SearchCacheStats,
+    SearchItemType,
+    SearchQuery,
+    SearchRetrieval,
+)
 from nova_memory.services import FileService
+from nova_memory.services.embedding import EmbeddingFunction
+
+# Number of entities read and written to the search index per transaction by reindex_all
+REINDEX_BATCH_SIZE = 100
+
+# Minimum number of results of each ranking a hybrid search fuses
+HYBRID_CANDIDATES = 50
+
+# Rank offset of reciprocal rank fusion, damping the weight of the very first ranks
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[SearchIndexRow]], k: int = RRF_K
+) -> List[SearchIndexRow]:
+    """Fuse rankings of search results into one.
+
+    Each result scores the sum of 1 / (k + rank) over the rankings it is in, so the
+    rankings are combined without their scores having to be comparable. Results are
+    returned best first, with the negated fused score as score so lower ranks first.
+    """
+    scores: Dict[Tuple[str, int], float] = defaultdict(float)
+    rows: Dict[Tuple[str, int], SearchIndexRow] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            key = (row.type, row.id)
+            scores[key] += 1.0 / (k + rank)
+            rows.setdefault(key, row)
+
+    fused = sorted(rows, key=lambda key: -scores[key])
+    return [replace(rows[key], score=-scores[key]) for key in fused]
 
 
 class SearchService:
@@ -23,6 +69,9 @@ class SearchService:
     1. Exact permalink lookup
     2. Pattern matching with * (e.g., 'specs/*')
     3. Full-text search across title/content
+
+    Given an embedding function, entities are also embedded as they are indexed, for
+    vector and hybrid searches of text.
     """
 
     def __init__(
@@ -30,45 +79,233 @@ class SearchService:
         search_repository: SearchRepository,
         entity_repository: EntityRepository,
         file_service: FileService,
+        embedding: Optional[EmbeddingFunction] = None,
     ):
         self.repository = search_repository
         self.entity_repository = entity_repository
         self.file_service = file_service
+        self.embedding = embedding
 
     async def init_search_index(self):
         """Create FTS5 virtual table if it doesn't exist."""
         await self.repository.init_search_index()
 
-    async def reindex_all(self, background_tasks: Optional[BackgroundTasks] = None) -> None:
-        """Reindex all content from database."""
+    async def reindex_all(
+        self,
+        background_tasks: Optional[BackgroundTasks] = None,
+        progress: Optional[Callable[[ReindexProgress], Any]] = None,
+    ) -> None:
+        """Reindex all content from database.
 
-        logger.info("Starting full reindex")
-        # Clear and recreate search index
-        await self.repository.execute_query(text("DROP TABLE IF EXISTS search_index"), params={})
+        The new index is built in a shadow table while searches keep using the live
+        index, and swapped in with a single transaction once complete. Writes made to
+        the live index meanwhile are applied to the shadow table too.
+
+        Entities are paged through by id, loading only what indexing needs, and their
+        file content is read in a thread pool. Each page is written in one transaction
+        together with a checkpoint, so if the reindex is interrupted, the next call
+        resumes after the last written page instead of starting over.
+
+        Args:
+            background_tasks: Run the reindex as a background task instead of waiting for it
+            progress: Called with the progress of the reindex after every page
+        """
+        if background_tasks:
+            background_tasks.add_task(self.reindex_all, progress=progress)
+            return
+
+        # the shadow tables are shared by every project, one reindex builds in them at a time
+        async with self.repository.reindex_lock:
+            await self._reindex_all(progress)
+
+    async def _reindex_all(self, progress: Optional[Callable[[ReindexProgress], Any]]) -> None:
+        """Build the new index in the shadow table and swap it in, see reindex_all."""
         await self.init_search_index()
+        total_entities = await self.entity_repository.count()
+        checkpoint = await self.repository.get_reindex_checkpoint()
+        if checkpoint is not None and not await self.repository.shadow_index_exists():
+            # the shadow table was swapped in or replaced by another project's reindex
+            logger.warning("Shadow index of the interrupted reindex is gone, starting over")
+            checkpoint = None
+
+        if checkpoint is None:
+            logger.info("Starting full reindex")
+            await self.repository.create_shadow_index(replace=True)
+            checkpoint = ReindexCheckpoint(
+                last_entity_id=0,
+                total_entities=total_entities,
+                indexed_entities=0,
+                indexed_rows=0,
+                started_at=datetime.now(timezone.utc),
+            )
+        else:
+            logger.info(f"Resuming reindex after entity_id={checkpoint.last_entity_id}")
+            checkpoint.total_entities = total_entities
+            checkpoint.started_at = datetime.now(timezone.utc)
+            checkpoint.run_entities = 0
+            checkpoint.run_rows = 0
+        await self.repository.save_reindex_checkpoint(checkpoint)
 
-        # Reindex all entities
         logger.debug("Indexing entities")
-        entities = await self.entity_repository.find_all()
-        for entity in entities:
-            await self.index_entity(entity, background_tasks)
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(thread_name_prefix="reindex-read") as executor:
+
+            async def read_content(entity: Entity) -> Optional[str]:
+                if not entity.is_markdown:
+                    return None
+                try:
+                    return await loop.run_in_executor(
+                        executor, self.file_service.read_entity_content_blocking, entity
+                    )
+                except Exception as e:
+                    # index what is in the database rather than stall every resume on this file
+                    logger.warning(
+                        f"Failed to read entity content, file_path={entity.file_path}, error={e}"
+                    )
+                    return ""
+
+            while entities := await self.entity_repository.find_page_for_index(
+                checkpoint.last_entity_id, REINDEX_BATCH_SIZE
+            ):
+                contents = await asyncio.gather(*(read_content(entity) for entity in entities))
+                rows = []
+                for entity, content in zip(entities, contents):
+                    rows.extend(await self.entity_rows(entity, content))
+
+                # the page and its checkpoint are committed together
+                async with db.batch_session(self.repository.session_maker):
+                    await self.repository.index_shadow_items(rows)
+                    await self._index_vectors(rows)
+                    checkpoint.last_entity_id = entities[-1].id
+                    checkpoint.indexed_entities += len(entities)
+                    checkpoint.indexed_rows += len(rows)
+                    checkpoint.run_entities += len(entities)
+                    checkpoint.run_rows += len(rows)
+                    await self.repository.save_reindex_checkpoint(checkpoint)
+
+                if progress:
+                    progress(checkpoint.progress())
+
+        async with db.batch_session(self.repository.session_maker):
+            await self.repository.swap_shadow_index()
+            await self.repository.delete_reindex_checkpoint()
+        logger.info(
+            f"Reindex complete: entities={checkpoint.indexed_entities}, "
+            f"rows={checkpoint.indexed_rows}"
+        )
+
+    async def get_reindex_progress(self) -> Optional[ReindexProgress]:
+        """Get the progress of a running or interrupted reindex, None if there isn't one."""
+        checkpoint = await self.repository.get_reindex_checkpoint()
+        return checkpoint.progress() if checkpoint else None
 
-        logger.info("Reindex complete")
+    def cache_stats(self) -> SearchCacheStats:
+        """Get the hit and miss counters of the search result cache."""
+        return self.repository.cache.stats()
 
-    async def search(self, query: SearchQuery, limit=10, offset=0) -> List[SearchIndexRow]:
+    async def search(
+        self,
+        query: SearchQuery,
+        limit=10,
+        offset=0,
+        cursor: Optional[SearchCursor] = None,
+        highlight: Optional[Tuple[str, str]] = None,
+        project_ids: Optional[Sequence[int]] = None,
+    ) -> List[SearchIndexRow]:
         """Search across all indexed content.
 
         Supports three modes:
         1. Exact permalink: finds direct matches for a specific path
         2. Pattern match: handles * wildcards in paths
         3. Text search: full-text search across title/content
+
+        Pass the cursor of the last result of a page, SearchCursor.after(row), instead
+        of an offset to get the next page: the rows before it are filtered out as they
+        are scored rather than sorted and skipped, though every match is still scored.
+        Vector and hybrid searches aren't ordered by a score a cursor can follow, so
+        they're paged by offset only.
+        Text search snippets wrap the matched terms in the highlight markers, if given.
+        Pass project_ids to search those projects together instead of this one.
+
+        Raises:
+            ValueError: If a cursor is given for a vector or hybrid search
         """
         if query.no_criteria():
             logger.debug("no criteria passed to query")
             return []
 
+        if cursor is not None and query.text and query.retrieval != SearchRetrieval.FTS:
+            raise ValueError(f"A cursor can't page a {query.retrieval.value} search, use page")
+
         logger.trace(f"Searching with query: {query}")
 
+        if query.text and query.retrieval != SearchRetrieval.FTS:
+            if self.embedding is not None:
+                vector = self.embedding([query.text])[0]
+                return await self._semantic_search(query, vector, limit, offset, project_ids)
+            logger.warning(
+                f"Semantic search isn't enabled, searching full text instead of {query.retrieval}"
+            )
+
+        # search
+        results = await self.repository.search(
+            **self._search_filters(query),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            highlight=highlight,
+            project_ids=project_ids,
+        )
+
+        return results
+
+    async def _semantic_search(
+        self,
+        query: SearchQuery,
+        vector: Sequence[float],
+        limit: int,
+        offset: int,
+        project_ids: Optional[Sequence[int]] = None,
+    ) -> List[SearchIndexRow]:
+        """Search by the embedding of the query text, fused with a full-text search if hybrid.
+
+        Only the type, entity type and date filters of the query apply to the vector search.
+        """
+        filters = {**self._search_filters(query), "project_ids": project_ids}
+        vector_filters = {
+            key: filters[key] for key in ("types", "after_date", "search_item_types", "project_ids")
+        }
+
+        if query.retrieval == SearchRetrieval.VECTOR:
+            return await self.repository.vector_search(
+                vector, **vector_filters, limit=limit, offset=offset
+            )
+
+        candidates = max(offset + limit, HYBRID_CANDIDATES)
+        full_text = await self.repository.search(**filters, limit=candidates)
+        nearest = await self.repository.vector_search(vector, **vector_filters, limit=candidates)
+        return reciprocal_rank_fusion([full_text, nearest])[offset : offset + limit]
+
+    async def best_entity_permalinks(self, texts: Sequence[str]) -> Dict[str, str]:
+        """Get the permalink of the best entity text search match of each text, in one query.
+
+        Texts matching no entity are left out.
+        """
+        return await self.repository.best_entity_permalinks(texts)
+
+    async def search_count(
+        self, query: SearchQuery, project_ids: Optional[Sequence[int]] = None
+    ) -> int:
+        """Count all the results of a search, of project_ids instead of this project if given."""
+        if query.no_criteria():
+            return 0
+        return await self.repository.search_count(
+            **self._search_filters(query), project_ids=project_ids
+        )
+
+    @staticmethod
+    def _search_filters(query: SearchQuery) -> Dict[str, Any]:
+        """Repository search filters for a query."""
         after_date = (
             (
                 query.after_date
@@ -78,9 +315,7 @@ class SearchService:
             if query.after_date
             else None
         )
-
-        # search
-        results = await self.repository.search(
+        return dict(
             search_text=query.text,
             permalink=query.permalink,
             permalink_match=query.permalink_match,
@@ -88,34 +323,25 @@ class SearchService:
             types=query.types,
             search_item_types=query.entity_types,
             after_date=after_date,
-            limit=limit,
-            offset=offset,
         )
 
-        return results
-
     @staticmethod
     def _generate_variants(text: str) -> Set[str]:
         """Generate text variants for better fuzzy matching.
 
         Creates variations of the text to improve match chances:
         - Original form
-        - Lowercase form
-        - Path segments (for permalinks)
-        - Common word boundaries
+        - Path segments (for permalinks), which the tokenizer keeps together as one token
+
+        The tokenizer already folds case and splits words, and substring and fuzzy
+        matching is done by the repository's trigram index.
         """
-        variants = {text, text.lower()}
+        variants = {text}
 
         # Add path segments
         if "/" in text:
             variants.update(p.strip() for p in text.split("/") if p.strip())
 
-        # Add word boundaries
-        variants.update(w.strip() for w in text.lower().split() if w.strip())
-
-        # Add trigrams for fuzzy matching
-        variants.update(text[i : i + 3].lower() for i in range(len(text) - 2))
-
         return variants
 
     def _extract_entity_tags(self, entity: Entity) -> List[str]:
@@ -154,50 +380,112 @@ class SearchService:
         self,
         entity: Entity,
         background_tasks: Optional[BackgroundTasks] = None,
+        content: Optional[str] = None,
     ) -> None:
+        """Index an entity.
+
+        Args:
+            entity: Entity to index
+            background_tasks: Index in a background task if given
+            content: Already parsed content of a markdown entity, read from its file if not given
+        """
         if background_tasks:
-            background_tasks.add_task(self.index_entity_data, entity)
+            background_tasks.add_task(self.index_entity_data, entity, content)
         else:
-            await self.index_entity_data(entity)
+            await self.index_entity_data(entity, content)
 
     async def index_entity_data(
         self,
         entity: Entity,
+        content: Optional[str] = None,
+    ) -> None:
+        rows = await self.entity_rows(entity, content)
+        async with db.batch_session(self.repository.session_maker):
+            # reindex, only rows that changed are written
+            await self.repository.index_entity_rows(entity.id, rows)
+            await self._index_vectors(rows)
+
+    async def index_entities(
+        self, entities: Sequence[Entity], contents: Optional[Mapping[int, str]] = None
     ) -> None:
-        # delete all search index data associated with entity
-        await self.repository.delete_by_entity_id(entity_id=entity.id)
+        """Index many entities with a single bulk write.
 
-        # reindex
-        await self.index_entity_markdown(
-            entity
-        ) if entity.is_markdown else await self.index_entity_file(entity)
+        Existing rows are replaced by permalink rather than diffed, so this suits
+        entities that aren't indexed yet, such as new files or a rebuilt index.
 
-    async def index_entity_file(
+        Args:
+            entities: Entities to index
+            contents: Already parsed content of markdown entities by entity id, the content
+                of any entity not in it is read from its file
+        """
+        contents = contents or {}
+        rows = []
+        for entity in entities:
+            rows.extend(await self.entity_rows(entity, contents.get(entity.id)))
+        async with db.batch_session(self.repository.session_maker):
+            await self.repository.index_items(rows)
+            await self._index_vectors(rows)
+
+    async def _index_vectors(self, rows: Sequence[SearchIndexRow]) -> None:
+        """Embed the entities among rows for semantic search, if it is enabled.
+
+        An entity is embedded from its title, its title, path and tag variants, and its content.
+        """
+        if self.embedding is None:
+            return
+
+        entity_rows = [row for row in rows if row.type == SearchItemType.ENTITY.value]
+        if not entity_rows:
+            return
+        vectors = self.embedding(
+            [
+                "\n".join(filter(None, [row.title, row.content_stems, row.content_snippet]))
+                for row in entity_rows
+            ]
+        )
+        await self.repository.index_vectors(
+            {row.id: vector for row, vector in zip(entity_rows, vectors)}
+        )
+
+    async def entity_rows(
+        self, entity: Entity, content: Optional[str] = None
+    ) -> List[SearchIndexRow]:
+        """Build the search index rows for an entity.
+
+        Args:
+            entity: Entity to index
+            content: Already read content of a markdown entity, read from its file if not given
+        """
+        if entity.is_markdown:
+            return await self.entity_markdown_rows(entity, content)
+        return await self.entity_file_rows(entity)
+
+    async def entity_file_rows(
         self,
         entity: Entity,
-    ) -> None:
+    ) -> List[SearchIndexRow]:
         # Index entity file with no content
-        await self.repository.index_item(
-            SearchIndexRow(
-                id=entity.id,
-                entity_id=entity.id,
-                type=SearchItemType.ENTITY.value,
-                title=entity.title,
-                file_path=entity.file_path,
-                metadata={
-                    "entity_type": entity.entity_type,
-                },
-                created_at=entity.created_at,
-                updated_at=entity.updated_at,
-                project_id=entity.project_id,
-            )
+        row = SearchIndexRow(
+            id=entity.id,
+            entity_id=entity.id,
+            type=SearchItemType.ENTITY.value,
+            title=entity.title,
+            file_path=entity.file_path,
+            metadata={
+                "entity_type": entity.entity_type,
+            },
+            created_at=entity.created_at,
+            updated_at=entity.updated_at,
+            project_id=entity.project_id,
         )
+        return [row]
 
-    async def index_entity_markdown(
+    async def entity_markdown_rows(
         self,
         entity: Entity,
-    ) -> None:
-        """Index an entity and all its observations and relations.
+        content: Optional[str] = None,
+    ) -> List[SearchIndexRow]:
+        """Build rows indexing an entity and all its observations and relations.
 
         Indexing structure:
         1. Entities
@@ -220,19 +508,19 @@ class SearchService:
         """
 
         content_stems = []
-        content_snippet = ""
+        # variants are sorted so the same entity always indexes the same text
         title_variants = self._generate_variants(entity.title)
-        content_stems.extend(title_variants)
+        content_stems.extend(sorted(title_variants))
 
-        content = await self.file_service.read_entity_content(entity)
-        if content:
-            content_stems.append(content)
-            content_snippet = f"{content[:250]}"
+        # the content is indexed once, in content_snippet, snippets are made at query time
+        if content is None:
+            content = await self.file_service.read_entity_content(entity)
+        content_snippet = content or ""
 
         if entity.permalink:
-            content_stems.extend(self._generate_variants(entity.permalink))
+            content_stems.extend(sorted(self._generate_variants(entity.permalink)))
 
-        content_stems.extend(self._generate_variants(entity.file_path))
+        content_stems.extend(sorted(self._generate_variants(entity.file_path)))
 
         # Add entity tags from frontmatter to search content
         entity_tags = self._extract_entity_tags(entity)
@@ -242,7 +530,7 @@ class SearchService:
         entity_content_stems = "\n".join(p for p in content_stems if p and p.strip())
 
         # Index entity
-        await self.repository.index_item(
+        rows = [
             SearchIndexRow(
                 id=entity.id,
                 type=SearchItemType.ENTITY.value,
@@ -259,15 +547,17 @@ class SearchService:
                 updated_at=entity.updated_at,
                 project_id=entity.project_id,
             )
-        )
+        ]
 
         # Index each observation with permalink
         for obs in entity.observations:
             # Index with parent entity's file path since that's where it's defined
             obs_content_stems = "\n".join(
-                p for p in self._generate_variants(obs.content) if p and p.strip()
+                p
+                for p in sorted(self._generate_variants(obs.content) - {obs.content})
+                if p and p.strip()
             )
-            await self.repository.index_item(
+            rows.append(
                 SearchIndexRow(
                     id=obs.id,
                     type=SearchItemType.OBSERVATION.value,
@@ -297,9 +587,9 @@ class SearchService:
             )
 
             rel_content_stems = "\n".join(
-                p for p in self._generate_variants(relation_title) if p and p.strip()
+                p for p in sorted(self._generate_variants(relation_title)) if p and p.strip()
             )
-            await self.repository.index_item(
+            rows.append(
                 SearchIndexRow(
                     id=rel.id,
                     title=relation_title,
@@ -317,6 +607,8 @@ class SearchService:
                 )
             )
 
+        return rows
+
     async def delete_by_permalink(self, permalink: str):
         """Delete an item from the search index."""
         await self.repository.delete_by_permalink(permalink)
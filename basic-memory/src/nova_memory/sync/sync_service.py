@@ -1,23 +1,93 @@
 """Service for syncing files between filesystem and database."""
 
+import asyncio
+import multiprocessing
 import os
 import time
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Set, Tuple
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 
 from loguru import logger
-from sqlalchemy.exc import IntegrityError
 
+from nova_memory import db, file_utils
 from nova_memory.config import NovaMemoryConfig
 from nova_memory.file_utils import has_frontmatter
-from nova_memory.markdown import EntityParser
+from nova_memory.markdown import EntityMarkdown, EntityParser
+from nova_memory.markdown.entity_parser import parse_markdown_content
 from nova_memory.models import Entity
 from nova_memory.repository import EntityRepository, RelationRepository
 from nova_memory.services import EntityService, FileService
 from nova_memory.services.search_service import SearchService
 
+# Syncs with fewer markdown files than this parse inline rather than start worker processes
+PARSE_POOL_MIN_FILES = 20
+
+
+@dataclass(frozen=True)
+class FileState:
+    """Checksum and stat values for a file.
+
+    size, mtime_ns and inode are recorded with the checksum when a file is synced.
+    If they still match on the next scan the file is assumed unchanged and isn't rehashed.
+    """
+
+    checksum: Optional[str] = None
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+    inode: Optional[int] = None
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result, checksum: Optional[str] = None) -> "FileState":
+        return cls(
+            checksum=checksum, size=stat.st_size, mtime_ns=stat.st_mtime_ns, inode=stat.st_ino
+        )
+
+    def same_stat(self, other: "FileState") -> bool:
+        """Check if both states have the same recorded stat values."""
+        return self.size is not None and (self.size, self.mtime_ns, self.inode) == (
+            other.size,
+            other.mtime_ns,
+            other.inode,
+        )
+
+    def stat_columns(self) -> Dict[str, Optional[int]]:
+        """Stat values keyed by their Entity column name."""
+        return {
+            "file_size": self.size,
+            "file_mtime_ns": self.mtime_ns,
+            "file_inode": self.inode,
+        }
+
+
+@dataclass(frozen=True)
+class FileContent:
+    """Text of a markdown file with the checksum and stat values it was read with.
+
+    Read once per sync and carried from the scan through parsing to the recorded checksum.
+    """
+
+    text: str
+    state: FileState
+
+    @classmethod
+    def read(cls, path: Path) -> "FileContent":
+        """Read a markdown file. This is a blocking call, so it can be run in a worker thread."""
+        # stat before reading, so a write during the read changes it next scan
+        stat = path.stat()
+        text = path.read_text(encoding="utf-8")
+        return cls(
+            text=text, state=FileState.from_stat(stat, file_utils.compute_content_checksum(text))
+        )
+
+
+# (path, new, markdown, content) for a file waiting to be written;
+# markdown and content are None if not parsed or read yet
+ParsedFile = Tuple[str, bool, Optional[EntityMarkdown], Optional[FileContent]]
+
 
 @dataclass
 class SyncReport:
@@ -30,6 +100,7 @@ class SyncReport:
         deleted: Files that exist in database but not on disk
         moves: Files that have been moved from one location to another
         checksums: Current checksums for files on disk
+        contents: Markdown read during the scan, for new and modified files
     """
 
     # We keep paths as strings in sets/dicts for easier serialization
@@ -38,6 +109,10 @@ class SyncReport:
     deleted: Set[str] = field(default_factory=set)
     moves: Dict[str, str] = field(default_factory=dict)  # old_path -> new_path
     checksums: Dict[str, str] = field(default_factory=dict)  # path -> checksum
+    # path -> current state, for unchanged files whose recorded stat values are stale
+    stat_updates: Dict[str, FileState] = field(default_factory=dict)
+    # path -> content read while scanning, so syncing the file doesn't read it again
+    contents: Dict[str, FileContent] = field(default_factory=dict)
 
     @property
     def total(self) -> int:
@@ -55,9 +130,15 @@ class ScanResult:
     # checksum -> file_path
     checksums: Dict[str, str] = field(default_factory=dict)
 
+    # file_path -> checksum and stat values
+    states: Dict[str, FileState] = field(default_factory=dict)
+
     # file_path -> error message
     errors: Dict[str, str] = field(default_factory=dict)
 
+    # file_path -> content, for markdown read whole while hashing
+    contents: Dict[str, FileContent] = field(default_factory=dict)
+
 
 class SyncService:
     """Syncs documents and knowledge files with database."""
@@ -80,15 +161,20 @@ class SyncService:
         self.search_service = search_service
         self.file_service = file_service
 
-    async def sync(self, directory: Path) -> SyncReport:
-        """Sync all files with database."""
+    async def sync(self, directory: Path, verify: bool = False) -> SyncReport:
+        """Sync all files with database.
+
+        Args:
+            directory: Directory to sync
+            verify: Hash every file instead of trusting unchanged size/mtime/inode
+        """
 
         start_time = time.time()
-        logger.info(f"Sync operation started for directory: {directory}")
+        logger.info(f"Sync operation started for directory: {directory}, verify: {verify}")
 
         # initial paths from db to sync
         # path -> checksum
-        report = await self.scan(directory)
+        report = await self.scan(directory, verify=verify, buffer_contents=True)
 
         # Initialize progress tracking if requested
         # order of sync matters to resolve relations effectively
@@ -97,7 +183,7 @@ class SyncService:
             + f"deleted_files={len(report.deleted)}, moved_files={len(report.moves)}"
         )
 
-        # sync moves first
+        moves = {}
         for old_path, new_path in report.moves.items():
             # in the case where a file has been deleted and replaced by another file
             # it will show up in the move and modified lists, so handle it in modified
@@ -107,21 +193,31 @@ class SyncService:
                     f"File marked as moved and modified: old_path={old_path}, new_path={new_path}"
                 )
             else:
+                moves[old_path] = new_path
+
+        # new and modified markdown is parsed in the background while moves and deletes are applied
+        changed = [(path, True) for path in report.new] + [
+            (path, False) for path in report.modified
+        ]
+        async with self.parse_files(changed, report.contents) as parsed_files:
+            # sync moves first
+            for old_path, new_path in moves.items():
                 await self.handle_move(old_path, new_path)
 
-        # deleted next
-        for path in report.deleted:
-            await self.handle_delete(path)
-
-        # then new and modified
-        for path in report.new:
-            await self.sync_file(path, new=True)
+            # deleted next
+            for path in report.deleted:
+                await self.handle_delete(path)
 
-        for path in report.modified:
-            await self.sync_file(path, new=False)
+            # then new and modified
+            await self.sync_files(parsed_files)
 
         await self.resolve_relations()
 
+        # record current stat values for unchanged files so they aren't hashed next time
+        await self.entity_repository.update_file_stats(
+            {path: state.stat_columns() for path, state in report.stat_updates.items()}
+        )
+
         duration_ms = int((time.time() - start_time) * 1000)
         logger.info(
             f"Sync operation completed: directory={directory}, total_changes={report.total}, duration_ms={duration_ms}"
@@ -129,14 +225,26 @@ class SyncService:
 
         return report
 
-    async def scan(self, directory):
-        """Scan directory for changes compared to database state."""
+    async def scan(self, directory, verify: bool = False, buffer_contents: bool = False):
+        """Scan directory for changes compared to database state.
 
-        db_paths = await self.get_db_file_state()
+        Args:
+            directory: Directory to scan
+            verify: Hash every file instead of trusting unchanged size/mtime/inode
+            buffer_contents: Keep the content of new and modified markdown in the report,
+                up to the sync_buffer_size setting, so syncing them doesn't read them again
+        """
+
+        db_states = await self.get_db_file_state()
+        db_paths = {path: state.checksum or "" for path, state in db_states.items()}
         logger.info(f"Scanning directory {directory}. Found {len(db_paths)} db paths")
 
         # Track potentially moved files by checksum
-        scan_result = await self.scan_directory(directory)
+        scan_result = await self.scan_directory(
+            directory,
+            None if verify else db_states,
+            buffer_size=self.app_config.sync_buffer_size if buffer_contents else 0,
+        )
         report = SyncReport()
 
         # First find potential new files and record checksums
@@ -148,11 +256,17 @@ class SyncService:
 
         # Now detect moves and deletions
         for db_path, db_checksum in db_paths.items():
+            # a file we failed to read still exists, so leave its db state alone
+            if db_path in scan_result.errors:
+                continue
+
             local_checksum_for_db_path = scan_result.files.get(db_path)
 
-            # file not modified
+            # file not modified, refresh the recorded stat values if they are stale
             if db_checksum == local_checksum_for_db_path:
-                pass
+                local_state = scan_result.states[db_path]
+                if not local_state.same_stat(db_states[db_path]):
+                    report.stat_updates[db_path] = local_state
 
             # if checksums don't match for the same path, its modified
             if local_checksum_for_db_path and db_checksum != local_checksum_for_db_path:
@@ -173,74 +287,270 @@ class SyncService:
                 # deleted
                 else:
                     report.deleted.add(db_path)
+
+        # only keep content for the files that will be synced
+        report.contents = {
+            path: content
+            for path, content in scan_result.contents.items()
+            if path in report.new or path in report.modified
+        }
         logger.info(f"Completed scan for directory {directory}, found {report.total} changes.")
         return report
 
-    async def get_db_file_state(self) -> Dict[str, str]:
-        """Get file_path and checksums from database.
-        Args:
-            db_records: database records
+    async def get_db_file_state(self) -> Dict[str, FileState]:
+        """Get file_path, checksums and recorded stat values from database.
+
         Returns:
             Dict mapping file paths to FileState
-            :param db_records: the data from the db
         """
-        db_records = await self.entity_repository.find_all()
+        db_records = await self.entity_repository.find_file_states()
         logger.info(f"Found {len(db_records)} db records")
-        return {r.file_path: r.checksum or "" for r in db_records}
+        return {
+            r.file_path: FileState(
+                checksum=r.checksum,
+                size=r.file_size,
+                mtime_ns=r.file_mtime_ns,
+                inode=r.file_inode,
+            )
+            for r in db_records
+        }
+
+    @asynccontextmanager
+    async def parse_files(
+        self,
+        files: List[Tuple[str, bool]],
+        contents: Optional[Dict[str, FileContent]] = None,
+    ) -> AsyncIterator[AsyncIterator[ParsedFile]]:
+        """Parse markdown files in worker processes ahead of the database writer.
+
+        Yields an iterator of (path, new, markdown, content) in the same order as files.
+        Workers parse ahead of the consumer through a bounded queue, so at most a
+        few files per worker are held in memory. Content already read by the scan is
+        taken from contents, anything else is read in a thread before it is parsed.
+        markdown is None for non-markdown files, or when parsing failed and the file
+        should be parsed again inline.
+
+        Small syncs, or a sync_parse_workers setting of 0, skip the worker
+        processes and yield None for every markdown, with any content from contents.
+
+        Args:
+            files: List of (path, new) tuples
+            contents: Content read during the scan, by path. Entries are removed as they are used
+        """
+        contents = contents if contents is not None else {}
+        workers = self.app_config.sync_parse_workers
+        markdown_count = sum(1 for path, _ in files if self.file_service.is_markdown(path))
+
+        if workers == 0 or markdown_count < PARSE_POOL_MIN_FILES:
+
+            async def unparsed() -> AsyncIterator[ParsedFile]:
+                for path, new in files:
+                    yield path, new, None, contents.pop(path, None)
+
+            yield unparsed()
+            return
+
+        logger.debug(f"Parsing {markdown_count} markdown files with {workers} worker processes")
+        loop = asyncio.get_running_loop()
+        base_path = self.entity_parser.base_path
+        queue: asyncio.Queue[Optional[Tuple[str, bool, Optional[asyncio.Task]]]] = asyncio.Queue(
+            maxsize=workers * 2
+        )
+
+        async def read_and_parse(
+            path: str,
+        ) -> Tuple[Optional[EntityMarkdown], Optional[FileContent]]:
+            content = contents.pop(path, None)
+            try:
+                if content is None:
+                    content = await loop.run_in_executor(None, FileContent.read, base_path / path)
+                markdown = await loop.run_in_executor(
+                    pool, parse_markdown_content, base_path, path, content.text
+                )
+                return markdown, content
+            except Exception as e:
+                logger.warning(f"Failed to parse file in worker, path={path}, error={e}")
+                return None, content
+
+        async def produce() -> None:
+            for path, new in files:
+                task = None
+                if self.file_service.is_markdown(path):
+                    task = asyncio.create_task(read_and_parse(path))
+                # blocks while the writer is behind, bounding the parsed files in flight
+                await queue.put((path, new, task))
+            await queue.put(None)
+
+        async def consume() -> AsyncIterator[ParsedFile]:
+            while (item := await queue.get()) is not None:
+                path, new, task = item
+                markdown, content = (await task) if task is not None else (None, None)
+                yield path, new, markdown, content
+
+        # spawn, since forking a process with running threads can deadlock
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        producer = asyncio.create_task(produce())
+        try:
+            yield consume()
+        finally:
+            producer.cancel()
+            # files still queued when the writer stopped early are not parsed
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None and item[2] is not None:
+                    item[2].cancel()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    async def sync_files(self, files: AsyncIterable[ParsedFile]) -> None:
+        """Sync files in order, committing batches of them in single transactions.
+
+        Args:
+            files: (path, new, markdown, content) tuples, read and parsed from disk when None
+        """
+        batch_size = self.app_config.sync_batch_size
+        batch: List[ParsedFile] = []
+        async for path, new, markdown, content in files:
+            if batch_size <= 1:
+                await self.sync_file(path, new=new, markdown=markdown, content=content)
+                continue
+
+            batch.append((path, new, markdown, content))
+            if len(batch) >= batch_size:
+                await self.sync_batch(batch)
+                batch = []
+
+        if batch:
+            await self.sync_batch(batch)
+
+    async def sync_batch(self, files: List[ParsedFile]) -> None:
+        """Sync a batch of files in one transaction.
+
+        If any file fails the whole batch is rolled back and its files are synced
+        again one at a time, so a single bad file doesn't block the others.
+        New files have nothing indexed to diff against, so they are added to the
+        search index together in one bulk write at the end of the batch.
+
+        Args:
+            files: (path, new, markdown, content) tuples, read and parsed from disk when None
+        """
+        logger.debug(f"Syncing batch of {len(files)} files")
+        try:
+            async with db.batch_session(self.entity_repository.session_maker):
+                new_entities = []
+                new_contents = {}
+                for path, new, markdown, content in files:
+                    entity, _, body = await self._sync_file(
+                        path, new, markdown, content, index=not new
+                    )
+                    if new and entity is not None:
+                        new_entities.append(entity)
+                        if body is not None:
+                            new_contents[entity.id] = body
+                await self.search_service.index_entities(new_entities, new_contents)
+        except Exception as e:
+            logger.warning(
+                f"Batch sync failed, syncing files individually: files={len(files)}, error={e}"
+            )
+            for path, new, markdown, content in files:
+                await self.sync_file(path, new=new, markdown=markdown, content=content)
 
     async def sync_file(
-        self, path: str, new: bool = True
+        self,
+        path: str,
+        new: bool = True,
+        markdown: Optional[EntityMarkdown] = None,
+        content: Optional[FileContent] = None,
     ) -> Tuple[Optional[Entity], Optional[str]]:
         """Sync a single file.
 
         Args:
             path: Path to file to sync
             new: Whether this is a new file
+            markdown: Already parsed markdown for the file, parsed from disk if not given
+            content: Already read content of a markdown file, read from disk if not given
 
         Returns:
             Tuple of (entity, checksum) or (None, None) if sync fails
         """
         try:
-            logger.debug(
-                f"Syncing file path={path} is_new={new} is_markdown={self.file_service.is_markdown(path)}"
-            )
-
-            if self.file_service.is_markdown(path):
-                entity, checksum = await self.sync_markdown_file(path, new)
-            else:
-                entity, checksum = await self.sync_regular_file(path, new)
-
-            if entity is not None:
-                await self.search_service.index_entity(entity)
-
-                logger.debug(
-                    f"File sync completed, path={path}, entity_id={entity.id}, checksum={checksum[:8]}"
-                )
+            entity, checksum, _ = await self._sync_file(path, new, markdown, content)
             return entity, checksum
-
         except Exception as e:  # pragma: no cover
             logger.error(f"Failed to sync file: path={path}, error={str(e)}")
             return None, None
 
-    async def sync_markdown_file(self, path: str, new: bool = True) -> Tuple[Optional[Entity], str]:
+    async def _sync_file(
+        self,
+        path: str,
+        new: bool,
+        markdown: Optional[EntityMarkdown] = None,
+        content: Optional[FileContent] = None,
+        index: bool = True,
+    ) -> Tuple[Optional[Entity], str, Optional[str]]:
+        """Sync a single file, raising any error.
+
+        The synced entity is added to the search index unless index is False.
+
+        Returns:
+            Tuple of (entity, checksum, content), content being the parsed body of a
+            markdown file for the search index to use instead of reading the file again
+        """
+        logger.debug(
+            f"Syncing file path={path} is_new={new} is_markdown={self.file_service.is_markdown(path)}"
+        )
+
+        body = None
+        if self.file_service.is_markdown(path):
+            entity, checksum, entity_markdown = await self.sync_markdown_file(
+                path, new, markdown, content
+            )
+            body = entity_markdown.content or ""
+        else:
+            entity, checksum = await self.sync_regular_file(path, new)
+
+        if entity is not None:
+            if index:
+                await self.search_service.index_entity(entity, content=body)
+
+            logger.debug(
+                f"File sync completed, path={path}, entity_id={entity.id}, checksum={checksum[:8]}"
+            )
+        return entity, checksum, body
+
+    async def sync_markdown_file(
+        self,
+        path: str,
+        new: bool = True,
+        markdown: Optional[EntityMarkdown] = None,
+        content: Optional[FileContent] = None,
+    ) -> Tuple[Entity, str, EntityMarkdown]:
         """Sync a markdown file with full processing.
 
+        The file is read at most once, and only read again if its permalink is rewritten.
+
         Args:
             path: Path to markdown file
             new: Whether this is a new file
+            markdown: Already parsed markdown for the file, parsed from disk if not given
+            content: Already read content of the file, read from disk if not given
 
         Returns:
-            Tuple of (entity, checksum)
+            Tuple of (entity, checksum, markdown the entity was synced from)
         """
         # Parse markdown first to get any existing permalink
         logger.debug(f"Parsing markdown file, path: {path}, new: {new}")
 
         file_path = self.entity_parser.base_path / path
-        file_content = file_path.read_text(encoding="utf-8")
-        file_contains_frontmatter = has_frontmatter(file_content)
+        content = content or FileContent.read(file_path)
+        file_state = content.state
+        file_contains_frontmatter = has_frontmatter(content.text)
 
         # entity markdown will always contain front matter, so it can be used up create/update the entity
-        entity_markdown = await self.entity_parser.parse_file(path)
+        entity_markdown = markdown or await self.entity_parser.parse_file_content(
+            file_path, content.text
+        )
 
         # if the file contains frontmatter, resolve a permalink
         if file_contains_frontmatter:
@@ -254,7 +564,10 @@ class SyncService:
                 )
 
                 entity_markdown.frontmatter.metadata["permalink"] = permalink
-                await self.file_service.update_frontmatter(path, {"permalink": permalink})
+                checksum = await self.file_service.update_frontmatter(
+                    path, {"permalink": permalink}
+                )
+                file_state = FileState.from_stat(self.file_service.file_stats(path), checksum)
 
         # if the file is new, create an entity
         if new:
@@ -270,13 +583,11 @@ class SyncService:
         # Update relations and search index
         entity = await self.entity_service.update_entity_relations(path, entity_markdown)
 
-        # After updating relations, we need to compute the checksum again
-        # This is necessary for files with wikilinks to ensure consistent checksums
-        # after relation processing is complete
-        final_checksum = await self.file_service.compute_checksum(path)
-
-        # set checksum
-        await self.entity_repository.update(entity.id, {"checksum": final_checksum})
+        # set checksum of the content the entity was synced from
+        final_checksum = file_state.checksum or ""
+        await self.entity_repository.update(
+            entity.id, {"checksum": final_checksum, **file_state.stat_columns()}
+        )
 
         logger.debug(
             f"Markdown sync completed: path={path}, entity_id={entity.id}, "
@@ -285,7 +596,7 @@ class SyncService:
         )
 
         # Return the final checksum to ensure everything is consistent
-        return entity, final_checksum
+        return entity, final_checksum, entity_markdown
 
     async def sync_regular_file(self, path: str, new: bool = True) -> Tuple[Optional[Entity], str]:
         """Sync a non-markdown file with basic tracking.
@@ -297,13 +608,14 @@ class SyncService:
         Returns:
             Tuple of (entity, checksum)
         """
+        file_stats = self.file_service.file_stats(path)
+        file_state = FileState.from_stat(file_stats)
         checksum = await self.file_service.compute_checksum(path)
         if new:
             # Generate permalink from path
             await self.entity_service.resolve_permalink(path)
 
             # get file timestamps
-            file_stats = self.file_service.file_stats(path)
             created = datetime.fromtimestamp(file_stats.st_ctime)
             modified = datetime.fromtimestamp(file_stats.st_mtime)
 
@@ -320,17 +632,18 @@ class SyncService:
                     created_at=created,
                     updated_at=modified,
                     content_type=content_type,
+                    **file_state.stat_columns(),
                 )
             )
             return entity, checksum
         else:
-            entity = await self.entity_repository.get_by_file_path(path)
+            entity = await self.entity_repository.get_by_file_path(path, load="ids_only")
             if entity is None:  # pragma: no cover
                 logger.error(f"Entity not found for existing file, path={path}")
                 raise ValueError(f"Entity not found for existing file: {path}")
 
             updated = await self.entity_repository.update(
-                entity.id, {"file_path": path, "checksum": checksum}
+                entity.id, {"file_path": path, "checksum": checksum, **file_state.stat_columns()}
             )
 
             if updated is None:  # pragma: no cover
@@ -376,7 +689,7 @@ class SyncService:
         entity = await self.entity_repository.get_by_file_path(old_path)
         if entity:
             # Update file_path in all cases
-            updates = {"file_path": new_path}
+            updates: Dict[str, Any] = {"file_path": new_path}
 
             # If configured, also update permalink to match new path
             if self.app_config.update_permalinks_on_move and self.file_service.is_markdown(
@@ -399,6 +712,12 @@ class SyncService:
                     f"new_checksum={new_checksum}"
                 )
 
+            # the move (and any permalink rewrite) changes the stat values recorded for the file
+            if await self.file_service.exists(new_path):
+                updates.update(
+                    FileState.from_stat(self.file_service.file_stats(new_path)).stat_columns()
+                )
+
             updated = await self.entity_repository.update(entity.id, updates)
 
             if updated is None:  # pragma: no cover
@@ -422,57 +741,60 @@ class SyncService:
             await self.search_service.index_entity(updated)
 
     async def resolve_relations(self):
-        """Try to resolve any unresolved relations"""
+        """Try to resolve any unresolved relations.
 
-        unresolved_relations = await self.relation_repository.find_unresolved_relations()
+        All forward references are resolved together against in-memory maps of the
+        project's entities, then updated in a single statement. Relations are indexed
+        with the entity they are defined in, so each of those is reindexed once.
+        """
 
-        logger.info("Resolving forward references", count=len(unresolved_relations))
+        unresolved_relations = await self.relation_repository.find_unresolved_references()
 
-        for relation in unresolved_relations:
-            logger.trace(
-                "Attempting to resolve relation "
-                f"relation_id={relation.id} "
-                f"from_id={relation.from_id} "
-                f"to_name={relation.to_name}"
-            )
+        logger.info("Resolving forward references", count=len(unresolved_relations))
+        if not unresolved_relations:
+            return
 
-            resolved_entity = await self.entity_service.link_resolver.resolve_link(relation.to_name)
+        resolved = await self.entity_service.link_resolver.resolve_links(
+            relation.to_name for relation in unresolved_relations
+        )
+        await self.relation_repository.resolve_references(
+            {to_name: (entity.id, entity.title) for to_name, entity in resolved.items()}
+        )
 
-            # ignore reference to self
-            if resolved_entity and resolved_entity.id != relation.from_id:
-                logger.debug(
-                    "Resolved forward reference "
-                    f"relation_id={relation.id} "
-                    f"from_id={relation.from_id} "
-                    f"to_name={relation.to_name} "
-                    f"resolved_id={resolved_entity.id} "
-                    f"resolved_title={resolved_entity.title}",
-                )
-                try:
-                    await self.relation_repository.update(
-                        relation.id,
-                        {
-                            "to_id": resolved_entity.id,
-                            "to_name": resolved_entity.title,
-                        },
-                    )
-                except IntegrityError:  # pragma: no cover
-                    logger.debug(
-                        "Ignoring duplicate relation "
-                        f"relation_id={relation.id} "
-                        f"from_id={relation.from_id} "
-                        f"to_name={relation.to_name}"
-                    )
+        # ignore reference to self
+        source_ids = {
+            relation.from_id
+            for relation in unresolved_relations
+            if relation.to_name in resolved and resolved[relation.to_name].id != relation.from_id
+        }
+        logger.debug(
+            f"Resolved forward references: names={len(resolved)}, source_entities={len(source_ids)}"
+        )
 
-                # update search index
-                await self.search_service.index_entity(resolved_entity)
+        # update search index
+        async with db.batch_session(self.entity_repository.session_maker):
+            for entity in await self.entity_repository.find_by_ids(list(source_ids)):
+                await self.search_service.index_entity(entity)
 
-    async def scan_directory(self, directory: Path) -> ScanResult:
+    async def scan_directory(
+        self,
+        directory: Path,
+        known_states: Optional[Dict[str, FileState]] = None,
+        buffer_size: int = 0,
+    ) -> ScanResult:
         """
         Scan directory for markdown files and their checksums.
 
+        Files are hashed in a bounded thread pool while the directory walk continues,
+        at most `sync_concurrency` files at a time. ScanResult is filled in as each
+        checksum completes.
+
         Args:
             directory: Directory to scan
+            known_states: Previously recorded file states. A file whose size, mtime and
+                inode match its known state reuses the known checksum instead of being hashed.
+            buffer_size: Maximum total bytes of hashed markdown to keep in ScanResult.contents.
+                Markdown that doesn't fit is hashed in chunks and not kept.
 
         Returns:
             ScanResult containing found files and any errors
@@ -482,29 +804,85 @@ class SyncService:
         logger.debug(f"Scanning directory {directory}")
         result = ScanResult()
 
-        for root, dirnames, filenames in os.walk(str(directory)):
-            # Skip dot directories in-place
-            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
-
-            for filename in filenames:
-                # Skip dot files
-                if filename.startswith("."):
-                    continue
-
-                path = Path(root) / filename
-                rel_path = str(path.relative_to(directory))
-                checksum = await self.file_service.compute_checksum(rel_path)
-                result.files[rel_path] = checksum
-                result.checksums[checksum] = rel_path
-
-                logger.trace(f"Found file, path={rel_path}, checksum={checksum}")
+        max_workers = self.app_config.sync_concurrency
+        loop = asyncio.get_running_loop()
+        pending: Set[asyncio.Future] = set()
+
+        recorded_states = known_states or {}
+        buffered_size = 0
+
+        def read_file_state(rel_path: str) -> Tuple[FileState, Optional[FileContent]]:
+            full_path = Path(directory) / rel_path
+            state = FileState.from_stat(full_path.stat())
+
+            known = recorded_states.get(rel_path)
+            if known and known.checksum and known.same_stat(state):
+                return known, None
+
+            is_markdown = self.file_service.is_markdown(rel_path)
+            if is_markdown and buffer_size and buffered_size + (state.size or 0) <= buffer_size:
+                # read markdown that fits in the buffer whole, so syncing it can reuse it
+                content = FileContent.read(full_path)
+                return content.state, content
+
+            checksum = file_utils.compute_file_checksum(full_path, text=is_markdown)
+            # stat is taken before hashing, so a write during hashing changes it next scan
+            return replace(state, checksum=checksum), None
+
+        async def scan_file(rel_path: str) -> None:
+            nonlocal buffered_size
+            try:
+                state, content = await loop.run_in_executor(executor, read_file_state, rel_path)
+            except Exception as e:
+                logger.warning(f"Failed to scan file, path={rel_path}, error={e}")
+                result.errors[rel_path] = str(e)
+                return
+
+            # files read concurrently may overshoot the buffer, drop any that don't fit
+            if content is not None and buffered_size + (state.size or 0) <= buffer_size:
+                buffered_size += state.size or 0
+                result.contents[rel_path] = content
+
+            checksum = state.checksum or ""
+            result.files[rel_path] = checksum
+            result.checksums[checksum] = rel_path
+            result.states[rel_path] = state
+            logger.trace(f"Found file, path={rel_path}, checksum={checksum}")
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sync-checksum"
+        ) as executor:
+            for rel_path in self._walk_directory(directory):
+                # apply backpressure, keeping at most max_workers files in flight
+                if len(pending) >= max_workers:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.add(asyncio.ensure_future(scan_file(rel_path)))
+
+            if pending:
+                await asyncio.wait(pending)
 
         duration_ms = int((time.time() - start_time) * 1000)
         logger.debug(
             f"{directory} scan completed "
             f"directory={str(directory)} "
             f"files_found={len(result.files)} "
+            f"errors={len(result.errors)} "
             f"duration_ms={duration_ms}"
         )
 
         return result
+
+    @staticmethod
+    def _walk_directory(directory: Path) -> Iterator[str]:
+        """Yield paths of non-hidden files under directory, relative to directory."""
+        for root, dirnames, filenames in os.walk(str(directory)):
+            # Skip dot directories in-place
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+
+            for filename in filenames:
+                # Skip dot files
+                if filename.startswith("."):
+                    continue
+
+                path = Path(root) / filename
+                yield str(path.relative_to(directory))
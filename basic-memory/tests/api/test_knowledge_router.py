@@ -1320,3 +1320,42 @@ async def test_move_entity_by_title(client: AsyncClient, project_url):
     moved_entity = response.json()
     assert moved_entity["file_path"] == "target/MovedByTitle.md"
     assert moved_entity["title"] == "UniqueTestTitle"
+
+
+@pytest.mark.asyncio
+async def test_get_hubs_orphans_backlinks(client: AsyncClient, project_url):
+    """Test listing hubs, orphans and the backlinks of an entity."""
+    for title, content in [
+        ("LinkTarget", "Linked to"),
+        ("Lonely", "No links"),
+        ("LinkSource", "- links to [[LinkTarget]]"),
+    ]:
+        response = await client.post(
+            f"{project_url}/knowledge/entities",
+            json={"title": title, "folder": "graph", "content": content},
+        )
+        assert response.status_code == 200
+
+    response = await client.get(f"{project_url}/knowledge/hubs")
+    assert response.status_code == 200
+    hubs = {entity["permalink"]: entity for entity in response.json()["entities"]}
+    assert hubs["graph/link-target"]["in_degree"] == 1
+    assert hubs["graph/link-source"]["out_degree"] == 1
+    assert "graph/lonely" not in hubs
+
+    response = await client.get(f"{project_url}/knowledge/orphans")
+    assert response.status_code == 200
+    orphans = [entity["permalink"] for entity in response.json()["entities"]]
+    assert "graph/lonely" in orphans
+    assert "graph/link-target" not in orphans
+
+    response = await client.get(f"{project_url}/knowledge/backlinks/graph/link-target")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["entity"]["in_degree"] == 1
+    assert [(r["from_id"], r["relation_type"]) for r in data["backlinks"]] == [
+        ("graph/link-source", "links to")
+    ]
+
+    response = await client.get(f"{project_url}/knowledge/backlinks/graph/missing")
+    assert response.status_code == 404
@@ -18,6 +18,11 @@ async def test_get_memory_context(client, test_graph, project_url):
     assert context.results[0].primary_result.permalink == "test/root"
     assert len(context.results[0].related_results) > 0
 
+    # Relations are summarized with the titles of the entities they link
+    related = response.json()["results"][0]["related_results"]
+    relation = next(r for r in related if r["type"] == "relation")
+    assert (relation["from_entity"], relation["to_entity"]) == ("Root", "Connected Entity 1")
+
     # Verify metadata
     assert context.metadata.uri == "test/root"
     assert context.metadata.depth == 1  # default depth
@@ -0,0 +1,22 @@
+"""Tests for the metrics router."""
+
+import pytest
+
+from nova_memory.repository.query_stats import query_stats
+from nova_memory.schemas.query_stats import QueryStatsReport
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(client, project_url):
+    """Test the metrics endpoint reports the latencies of the queries run."""
+    query_stats.reset()
+
+    response = await client.post(f"{project_url}/search/", json={"text": "anything"})
+    assert response.status_code == 200
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    report = QueryStatsReport.model_validate(response.json())
+    shapes = {s.shape: s for s in report.shapes}
+    assert shapes["search: text=trigram"].count == 1
+    assert shapes["search: text=trigram"].p50_ms <= shapes["search: text=trigram"].max_ms
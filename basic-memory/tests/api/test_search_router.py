@@ -49,6 +49,46 @@ async def test_search_basic_pagination(client, indexed_entity, project_url):
     assert search_results.page_size == 1
 
 
+@pytest.mark.asyncio
+async def test_search_cursor_pagination(client, indexed_entity, project_url):
+    """Test paging through search results with next_cursor."""
+    response = await client.post(
+        f"{project_url}/search/?page_size=1&include_total=true", json={"text": "search"}
+    )
+    assert response.status_code == 200
+    first_page = SearchResponse.model_validate(response.json())
+    assert first_page.total is not None and first_page.total > 1
+    assert first_page.next_cursor
+
+    permalinks = [r.permalink for r in first_page.results]
+    cursor = first_page.next_cursor
+    while cursor:
+        response = await client.post(
+            f"{project_url}/search/",
+            json={"text": "search"},
+            params={"page_size": 1, "cursor": cursor},
+        )
+        page = SearchResponse.model_validate(response.json())
+        assert page.total is None
+        permalinks.extend(r.permalink for r in page.results)
+        cursor = page.next_cursor
+
+    assert len(permalinks) == len(set(permalinks)) == first_page.total
+
+    response = await client.post(
+        f"{project_url}/search/", json={"text": "search"}, params={"cursor": "bogus"}
+    )
+    assert response.status_code == 400
+
+    # vector and hybrid searches are paged by number only
+    response = await client.post(
+        f"{project_url}/search/",
+        json={"text": "search", "retrieval": "hybrid"},
+        params={"cursor": first_page.next_cursor},
+    )
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_search_with_entity_type_filter(client, indexed_entity, project_url):
     """Test search with type filter."""
@@ -150,6 +190,14 @@ async def test_reindex(client, search_service, entity_service, session_maker, pr
     assert len(search_results.results) == 1
 
 
+@pytest.mark.asyncio
+async def test_reindex_status(client, project_url):
+    """Test reindex status is idle when no reindex is running."""
+    response = await client.get(f"{project_url}/search/reindex")
+    assert response.status_code == 200
+    assert response.json() == {"status": "idle"}
+
+
 @pytest.mark.asyncio
 async def test_multiple_filters(client, indexed_entity, project_url):
     """Test search with multiple filters combined."""
@@ -0,0 +1,71 @@
+"""Tests for CLI stats command."""
+
+from datetime import datetime, timezone
+
+from typer.testing import CliRunner
+
+from nova_memory.cli.app import app
+from nova_memory.schemas.query_stats import QueryShapeStats, QueryStatsReport, SlowQuery
+
+# Set up CLI runner
+runner = CliRunner()
+
+
+def test_stats_command_without_stats(app_config, project_config, test_project):
+    """Test the stats command before any server wrote stats."""
+    result = runner.invoke(app, ["stats"])
+    assert result.exit_code == 0
+    assert "No query stats yet" in result.stdout
+
+
+def test_stats_command(app_config, project_config, test_project):
+    """Test the stats command shows the stats a server wrote."""
+    now = datetime.now(timezone.utc)
+    report = QueryStatsReport(
+        shapes=[
+            QueryShapeStats(
+                shape="search: text=terms",
+                count=3,
+                rows=12,
+                mean_ms=4.2,
+                p50_ms=3.4,
+                p95_ms=9.5,
+                p99_ms=9.5,
+                max_ms=9.1,
+            )
+        ],
+        slow_queries=[
+            SlowQuery(
+                shape="search: text=terms",
+                sql="SELECT 1 FROM search_index WHERE search_index MATCH :text",
+                params={"text": "notes*"},
+                plan=["SCAN search_index VIRTUAL TABLE INDEX 0:M2"],
+                elapsed_ms=812.0,
+                rows=4,
+                recorded_at=now,
+            )
+        ],
+        slow_query_ms=500.0,
+        generated_at=now,
+    )
+    app_config.query_stats_path.parent.mkdir(parents=True, exist_ok=True)
+    app_config.query_stats_path.write_text(report.model_dump_json())
+
+    result = runner.invoke(app, ["stats"])
+    assert result.exit_code == 0
+    assert "search: text=terms" in result.stdout
+    assert "1 queries took at least 500 ms" in result.stdout
+
+    result = runner.invoke(app, ["stats", "--slow"])
+    assert result.exit_code == 0
+    assert "812.0 ms, 4 rows" in result.stdout
+    assert "SCAN search_index VIRTUAL TABLE INDEX 0:M2" in result.stdout
+
+
+def test_stats_command_unreadable(app_config, project_config, test_project):
+    """Test the stats command fails on a corrupt stats file."""
+    app_config.query_stats_path.parent.mkdir(parents=True, exist_ok=True)
+    app_config.query_stats_path.write_text("not json")
+
+    result = runner.invoke(app, ["stats"])
+    assert result.exit_code == 1
@@ -7,7 +7,7 @@ from textwrap import dedent
 import pytest
 
 from nova_memory.markdown.schemas import EntityMarkdown, EntityFrontmatter, Relation
-from nova_memory.markdown.entity_parser import parse
+from nova_memory.markdown.entity_parser import parse, parse_markdown_file
 
 
 @pytest.fixture
@@ -248,6 +248,19 @@ async def test_parse_file_with_absolute_path(project_config, entity_parser):
     assert entity.modified is not None
 
 
+@pytest.mark.asyncio
+async def test_parse_markdown_file_matches_parse_file(
+    project_config, entity_parser, valid_entity_content
+):
+    """Test the standalone parser used by sync workers matches EntityParser.parse_file."""
+    test_file = project_config.home / "test_entity.md"
+    test_file.write_text(valid_entity_content)
+
+    assert parse_markdown_file(project_config.home, "test_entity.md") == (
+        await entity_parser.parse_file("test_entity.md")
+    )
+
+
 # @pytest.mark.asyncio
 # async def test_parse_file_invalid_yaml(test_config, entity_parser):
 #     """Test parsing file with invalid YAML frontmatter."""
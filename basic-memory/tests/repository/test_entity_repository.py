@@ -319,6 +319,99 @@ async def test_find_by_permalinks(entity_repository: EntityRepository, test_enti
     assert len(found) == 0
 
 
+@pytest.mark.asyncio
+async def test_find_names_by_ids(entity_repository: EntityRepository, test_entities):
+    """Test looking up the titles and permalinks of entities by id."""
+    entity1, entity2, _ = test_entities
+    names = await entity_repository.find_names_by_ids([entity1.id, None, entity2.id, entity1.id, 0])
+
+    assert set(names) == {entity1.id, entity2.id}
+    assert (names[entity1.id].title, names[entity1.id].permalink) == ("entity1", "type1/entity1")
+    assert names[entity2.id].title == "entity2"
+
+    assert await entity_repository.find_names_by_ids([None]) == {}
+
+
+@pytest.mark.asyncio
+async def test_entity_load_projections(entity_repository: EntityRepository, related_results):
+    """Test lighter projections load less of the entity and raise on the rest."""
+    source, _, _ = related_results
+
+    full = await entity_repository.get_by_permalink(source.permalink)
+    assert len(full.outgoing_relations) == 1
+
+    summary = await entity_repository.get_by_permalink(source.permalink, load="summary")
+    assert (summary.id, summary.title, summary.file_path) == (source.id, "source", source.file_path)
+    with pytest.raises(Exception):
+        summary.outgoing_relations
+
+    ids_only = await entity_repository.get_by_file_path(source.file_path, load="ids_only")
+    assert ids_only.id == source.id
+    with pytest.raises(Exception):
+        ids_only.title
+
+    assert [e.id for e in await entity_repository.find_all(load="summary")] == [
+        e.id for e in await entity_repository.find_all()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_entity_link_counters(entity_repository, relation_repository, related_results):
+    """Test the link counters follow relation writes, and hub and orphan queries read them."""
+    source, target, _ = related_results
+    orphan = await entity_repository.create(
+        {
+            "project_id": entity_repository.project_id,
+            "title": "orphan",
+            "entity_type": "test",
+            "permalink": "orphan/orphan",
+            "file_path": "orphan/orphan.md",
+            "content_type": "text/markdown",
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+        }
+    )
+    await relation_repository.add(
+        Relation(from_id=target.id, to_name="missing", relation_type="links_to")
+    )
+
+    async def counters(entity):
+        found = await entity_repository.find_by_id(entity.id)
+        return found.in_degree, found.out_degree, found.unresolved_count
+
+    assert await counters(source) == (0, 1, 0)
+    assert await counters(target) == (1, 1, 1)
+    assert await counters(orphan) == (0, 0, 0)
+    assert [e.id for e in await entity_repository.find_hubs()] == [target.id, source.id]
+    assert [e.id for e in await entity_repository.find_orphans()] == [orphan.id]
+
+    # resolving the forward reference counts it on the entity it now points to
+    await relation_repository.resolve_references({"missing": (orphan.id, orphan.title)})
+    assert await counters(target) == (1, 1, 0)
+    assert await counters(orphan) == (1, 0, 0)
+
+    # deleting an entity deletes its relations, and uncounts them on the other end
+    await entity_repository.delete(target.id)
+    assert await counters(source) == (0, 0, 0)
+    assert await counters(orphan) == (0, 0, 0)
+    assert [e.id for e in await entity_repository.find_orphans()] == [source.id, orphan.id]
+    assert await entity_repository.find_hubs() == []
+
+
+@pytest.mark.asyncio
+async def test_find_link_candidates(entity_repository: EntityRepository, related_results):
+    """Test finding the entities a link text matches by permalink, title or file path."""
+    source, target, _ = related_results
+
+    async def candidates(text):
+        return {e.id for e in await entity_repository.find_link_candidates(text, load="summary")}
+
+    assert await candidates("source/source") == {source.id}
+    assert await candidates("target") == {target.id}
+    assert await candidates("target/target.md") == {target.id}
+    assert await candidates("nonexistent") == set()
+
+
 @pytest.mark.asyncio
 async def test_generate_permalink_from_file_path():
     """Test permalink generation from different file paths."""
@@ -0,0 +1,100 @@
+"""Tests for query latency statistics."""
+
+import pytest
+from sqlalchemy import text
+
+from nova_memory.repository.query_stats import (
+    LATENCY_BUCKETS,
+    NOT_EXPLAINED,
+    LatencyHistogram,
+    QueryStats,
+)
+from nova_memory.repository.query_stats import query_stats as process_query_stats
+from nova_memory.schemas.query_stats import QueryStatsReport
+
+
+def test_latency_histogram_percentiles():
+    """Test percentiles are the bucket bounds the latencies fall in, within 19%."""
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) == 0.0
+
+    # 1 to 100 ms
+    for milliseconds in range(1, 101):
+        histogram.add(milliseconds / 1000, rows=2)
+
+    assert histogram.count == 100
+    assert histogram.rows == 200
+    for fraction, exact in [(0.50, 0.050), (0.95, 0.095), (0.99, 0.099)]:
+        assert exact <= histogram.percentile(fraction) <= exact * 2 ** (1 / 4)
+    # never more than the slowest query
+    assert histogram.percentile(1.0) == 0.1
+
+    stats = histogram.stats("shape")
+    assert stats.count == 100
+    assert stats.mean_ms == pytest.approx(50.5)
+    assert stats.max_ms == pytest.approx(100.0)
+
+    # latencies past the last bucket count at the maximum
+    histogram.add(LATENCY_BUCKETS[-1] * 2, rows=0)
+    assert histogram.percentile(1.0) == LATENCY_BUCKETS[-1] * 2
+
+
+@pytest.mark.asyncio
+async def test_query_stats_slow_query_log(session_maker, tmp_path):
+    """Test slow queries are logged with their plan, and the stats written for the CLI."""
+    stats = QueryStats(slow_query_seconds=0.1, slow_query_log_size=2)
+    statement = text("SELECT id FROM entity WHERE id = :id")
+
+    await stats.record(session_maker, "fast", statement, {"id": 1}, 0.001, 1)
+    await stats.record(session_maker, "slow", statement, {"id": 2}, 0.2, 3)
+    await stats.record(session_maker, "slow", statement, {"id": 3}, 0.3, 0)
+
+    report = stats.report()
+    # most total time first
+    assert [(s.shape, s.count, s.rows) for s in report.shapes] == [("slow", 2, 3), ("fast", 1, 1)]
+    assert report.slow_query_ms == 100.0
+    assert [q.params for q in report.slow_queries] == [{"id": 2}, {"id": 3}]
+    slow_query = report.slow_queries[0]
+    assert slow_query.shape == "slow"
+    assert slow_query.sql == str(statement)
+    assert slow_query.elapsed_ms == pytest.approx(200.0)
+    # the entity primary key answers the query
+    assert any("entity" in step for step in slow_query.plan)
+
+    # the log keeps the most recent slow queries
+    await stats.record(session_maker, "slow", statement, {"id": 4}, 0.4, 0)
+    assert [q.params["id"] for q in stats.report().slow_queries] == [3, 4]
+
+    # work around several queries has no statement to explain
+    await stats.record(session_maker, "traversal", None, {}, 0.5, 2)
+    slow_query = stats.report().slow_queries[-1]
+    assert (slow_query.sql, slow_query.plan) == ("", [NOT_EXPLAINED])
+
+    stats.status_path = tmp_path / "query-stats.json"
+    await stats.record(session_maker, "fast", statement, {"id": 1}, 0.001, 1)
+    written = QueryStatsReport.model_validate_json(stats.status_path.read_text())
+    assert [s.shape for s in written.shapes] == ["slow", "traversal", "fast"]
+
+    stats.reset()
+    assert stats.report().shapes == []
+
+    stats.slow_query_seconds = None
+    await stats.record(session_maker, "slow", statement, {"id": 2}, 10.0, 0)
+    assert stats.report().slow_queries == []
+    assert stats.report().slow_query_ms is None
+
+
+@pytest.mark.asyncio
+async def test_search_queries_recorded(search_repository):
+    """Test searches are timed by the shape of their query."""
+    process_query_stats.reset()
+
+    await search_repository.search(search_text="anything", types=["note"])
+    await search_repository.search(search_text="other", types=["person"])
+    await search_repository.search_count(search_text="anything")
+
+    shapes = {s.shape: s.count for s in process_query_stats.report().shapes}
+    assert shapes == {
+        "search: text=trigram types=1": 2,
+        "count: text=trigram": 1,
+    }
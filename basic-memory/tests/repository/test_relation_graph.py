@@ -0,0 +1,132 @@
+"""Tests for the in-memory relation graph."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from nova_memory import db
+from nova_memory.models import Entity, Relation
+from nova_memory.repository.relation_graph import (
+    RELATION_GRAPH_COMPACT_SIZE,
+    RelationGraph,
+    get_relation_graph_cache,
+)
+
+
+def neighbor_ids(graph: RelationGraph, entity_id: int) -> set:
+    return {relation_id for relation_id, _, _ in graph.neighbors(entity_id)}
+
+
+def test_relation_graph_neighbors():
+    """Test relations are neighbors of both their entities, and self loops listed once."""
+    graph = RelationGraph([(3, 1, 2), (1, 1, None), (2, 2, 2)])
+
+    assert len(graph) == 3
+    assert sorted(graph.neighbors(1)) == [(1, 1, None), (3, 1, 2)]
+    assert sorted(graph.neighbors(2)) == [(2, 2, 2), (3, 1, 2)]
+    assert list(graph.neighbors(4)) == []
+
+
+def test_relation_graph_changes():
+    """Test added and removed relations are seen before the arrays are rebuilt."""
+    graph = RelationGraph([(1, 1, 2), (2, 2, 3)])
+
+    graph.add_relations([(3, 3, 1), (4, 1, None)])
+    graph.remove_relations([2, 99])
+    assert neighbor_ids(graph, 1) == {1, 3, 4}
+    assert neighbor_ids(graph, 3) == {3}
+    assert len(graph) == 3
+
+    # an added relation replaces the one with its id
+    graph.add_relations([(1, 2, 3)])
+    assert neighbor_ids(graph, 1) == {3, 4}
+    assert neighbor_ids(graph, 3) == {1, 3}
+
+    graph.remove_outgoing(1)
+    assert neighbor_ids(graph, 1) == {3}
+
+    graph.remove_entities([3])
+    assert len(graph) == 0
+    assert list(graph.neighbors(1)) == list(graph.neighbors(2)) == []
+
+
+def test_relation_graph_compacts():
+    """Test the arrays are rebuilt once enough relations changed."""
+    graph = RelationGraph()
+    graph.add_relations(
+        (relation_id, relation_id, relation_id + 1)
+        for relation_id in range(1, RELATION_GRAPH_COMPACT_SIZE + 1)
+    )
+
+    assert graph.added == {}
+    assert len(graph.relation_ids) == RELATION_GRAPH_COMPACT_SIZE
+    assert sorted(graph.neighbors(2)) == [(1, 1, 2), (2, 2, 3)]
+
+
+async def create_entity(entity_repository, name: str) -> Entity:
+    return await entity_repository.create(
+        {
+            "title": name,
+            "entity_type": "test",
+            "permalink": f"test/{name}",
+            "file_path": f"test/{name}.md",
+            "content_type": "text/markdown",
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_relation_graph_follows_writes(
+    session_maker, entity_repository, relation_repository, test_project
+):
+    """Test writes through the repositories update the loaded graph."""
+    a, b, c = [await create_entity(entity_repository, name) for name in ("a", "b", "c")]
+    (ab,) = await relation_repository.add_all(
+        [Relation(from_id=a.id, to_id=b.id, to_name="b", relation_type="links")]
+    )
+
+    cache = get_relation_graph_cache(session_maker, test_project.id)
+    graph = await cache.get(session_maker, test_project.id)
+    assert neighbor_ids(graph, a.id) == {ab.id}
+
+    bc = await relation_repository.add(
+        Relation(from_id=b.id, to_id=c.id, to_name="c", relation_type="links")
+    )
+    assert await cache.get(session_maker, test_project.id) is graph
+    assert neighbor_ids(graph, b.id) == {ab.id, bc.id}
+
+    await relation_repository.delete_outgoing_relations_from_entity(a.id)
+    assert neighbor_ids(graph, b.id) == {bc.id}
+
+    await entity_repository.delete(c.id)
+    assert neighbor_ids(graph, b.id) == set()
+
+    # a write that doesn't say which relations it changed drops the graph
+    await relation_repository.add(
+        Relation(from_id=a.id, to_id=b.id, to_name="b", relation_type="links")
+    )
+    await relation_repository.delete_by_fields(relation_type="links")
+    assert cache.graph is None
+
+
+@pytest.mark.asyncio
+async def test_relation_graph_batch_rollback(
+    session_maker, entity_repository, relation_repository, test_project
+):
+    """Test the graph is dropped when a batch writing to it rolls back."""
+    a, b = [await create_entity(entity_repository, name) for name in ("a", "b")]
+    cache = get_relation_graph_cache(session_maker, test_project.id)
+    graph = await cache.get(session_maker, test_project.id)
+
+    with pytest.raises(RuntimeError):
+        async with db.batch_session(session_maker):
+            await relation_repository.add(
+                Relation(from_id=a.id, to_id=b.id, to_name="b", relation_type="links")
+            )
+            assert len(graph) == 1
+            raise RuntimeError("rollback")
+
+    assert cache.graph is None
+    assert len(await cache.get(session_maker, test_project.id)) == 0
@@ -225,6 +225,44 @@ async def test_find_unresolved_relations(
     assert unresolved[0].id == relation.id
 
 
+@pytest.mark.asyncio
+async def test_resolve_references(
+    relation_repository: RelationRepository, source_entity: Entity, target_entity: Entity
+):
+    """Test resolving forward references by name in one update."""
+    relations = [
+        await relation_repository.create(data)
+        for data in [
+            # resolves
+            {"from_id": source_entity.id, "to_name": "target", "relation_type": "links_to"},
+            # duplicate of the resolved relation above, stays unresolved
+            {"from_id": source_entity.id, "to_name": "Target", "relation_type": "links_to"},
+            # reference to self, stays unresolved
+            {"from_id": target_entity.id, "to_name": "target", "relation_type": "links_to"},
+            # not in targets
+            {"from_id": source_entity.id, "to_name": "missing", "relation_type": "links_to"},
+        ]
+    ]
+
+    unresolved = await relation_repository.find_unresolved_references()
+    assert sorted((r.from_id, r.to_name) for r in unresolved) == sorted(
+        (r.from_id, r.to_name) for r in relations
+    )
+
+    target = (target_entity.id, target_entity.title)
+    await relation_repository.resolve_references({"target": target, "Target": target})
+
+    resolved, duplicate, to_self, missing = [
+        await relation_repository.find_by_id(r.id) for r in relations
+    ]
+    assert resolved.to_id == target_entity.id
+    assert resolved.to_name == target_entity.title
+    assert duplicate.to_id is None
+    assert to_self.to_id is None
+    assert missing.to_id is None
+    assert len(await relation_repository.find_unresolved_references()) == 3
+
+
 @pytest.mark.asyncio
 async def test_delete_by_fields_single_field(
     relation_repository: RelationRepository, multiple_relations: list[Relation]
@@ -299,6 +337,18 @@ async def test_delete_by_fields_all_fields(
     assert len(remaining) == 1  # One other relation_one should remain
 
 
+@pytest.mark.asyncio
+async def test_find_backlinks(relation_repository, source_entity, target_entity, test_relations):
+    """Test finding the relations to an entity, a page at a time."""
+    backlinks = await relation_repository.find_backlinks(target_entity.id)
+    assert [r.id for r in backlinks] == [r.id for r in test_relations]
+    assert backlinks[0].from_entity.permalink == source_entity.permalink
+
+    page = await relation_repository.find_backlinks(target_entity.id, skip=1, limit=1)
+    assert [r.id for r in page] == [test_relations[1].id]
+    assert list(await relation_repository.find_backlinks(source_entity.id)) == []
+
+
 @pytest.mark.asyncio
 async def test_delete_relation_by_id(relation_repository, test_relations):
     """Test deleting a relation by ID."""
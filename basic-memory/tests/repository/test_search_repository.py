@@ -1,6 +1,7 @@
 """Tests for the SearchRepository."""
 
 from datetime import datetime, timezone
+from typing import List
 
 import pytest
 import pytest_asyncio
@@ -9,7 +10,13 @@ from sqlalchemy import text
 from nova_memory import db
 from nova_memory.models import Entity
 from nova_memory.models.project import Project
-from nova_memory.repository.search_repository import SearchRepository, SearchIndexRow
+from nova_memory.repository.search_repository import (
+    ReindexCheckpoint,
+    SearchCursor,
+    SearchIndexRow,
+    SearchRepository,
+    _search_statement,
+)
 from nova_memory.schemas.search import SearchItemType
 
 
@@ -114,6 +121,414 @@ async def test_index_item(search_repository, search_entity):
     assert results[0].project_id == search_repository.project_id
 
 
+@pytest.mark.asyncio
+async def test_index_items(search_repository, search_entity):
+    """Test indexing many items at once replaces existing rows by permalink."""
+
+    def row(id: int, permalink: str, content: str) -> SearchIndexRow:
+        return SearchIndexRow(
+            id=id,
+            type=SearchItemType.OBSERVATION.value,
+            title=content,
+            content_stems=content,
+            content_snippet=content,
+            permalink=permalink,
+            file_path=search_entity.file_path,
+            entity_id=search_entity.id,
+            metadata={},
+            created_at=search_entity.created_at,
+            updated_at=search_entity.updated_at,
+            project_id=search_repository.project_id,
+        )
+
+    await search_repository.index_items([row(i, f"test/bulk/{i}", "original") for i in range(3)])
+    await search_repository.index_items(
+        [row(1, "test/bulk/1", "replaced"), row(3, "test/bulk/3", "added")]
+    )
+    await search_repository.index_items([])
+
+    assert sorted(r.id for r in await search_repository.search(search_text="original")) == [0, 2]
+    assert [r.id for r in await search_repository.search(search_text="replaced")] == [1]
+    assert [r.id for r in await search_repository.search(search_text="added")] == [3]
+
+
+@pytest.mark.asyncio
+async def test_trigram_substring_search(search_repository, search_entity):
+    """Test substrings of titles, paths and observations match through the trigram index."""
+    entity_row = SearchIndexRow(
+        id=search_entity.id,
+        type=SearchItemType.ENTITY.value,
+        title="Kubernetes Deployment",
+        content_stems="Kubernetes Deployment",
+        content_snippet="",
+        permalink="infra/kubernetes-deployment",
+        file_path="infra/kubernetes-deployment.md",
+        entity_id=search_entity.id,
+        metadata={},
+        created_at=search_entity.created_at,
+        updated_at=search_entity.updated_at,
+        project_id=search_repository.project_id,
+    )
+    observation_row = SearchIndexRow(
+        id=2,
+        type=SearchItemType.OBSERVATION.value,
+        title="note: Rollouts use canaries...",
+        content_stems="Rollouts use canaries",
+        content_snippet="Rollouts use canaries",
+        permalink="infra/kubernetes-deployment/observations/note/2",
+        file_path="infra/kubernetes-deployment.md",
+        entity_id=search_entity.id,
+        metadata={},
+        created_at=search_entity.created_at,
+        updated_at=search_entity.updated_at,
+        project_id=search_repository.project_id,
+    )
+    await search_repository.index_items([entity_row, observation_row])
+
+    assert [r.id for r in await search_repository.search(search_text="bernet")] == [entity_row.id]
+    assert [r.id for r in await search_repository.search(search_text="ployment.md")] == [
+        entity_row.id
+    ]
+    assert [r.id for r in await search_repository.search(search_text="anarie")] == [2]
+
+    await search_repository.delete_by_entity_id(search_entity.id)
+    assert await search_repository.search(search_text="bernet") == []
+    async with db.scoped_session(search_repository.session_maker) as session:
+        result = await session.execute(text("SELECT count(*) FROM search_trigram"))
+        assert result.scalar() == 0
+
+
+@pytest.mark.asyncio
+async def test_search_result_cache(search_repository, search_entity, session_maker):
+    """Test search results are cached until the project's index is written."""
+
+    def row(id: int, content: str) -> SearchIndexRow:
+        return SearchIndexRow(
+            id=id,
+            type=SearchItemType.OBSERVATION.value,
+            title=content,
+            content_stems=content,
+            content_snippet=content,
+            permalink=f"test/cached/{id}",
+            file_path=search_entity.file_path,
+            entity_id=search_entity.id,
+            metadata={},
+            created_at=search_entity.created_at,
+            updated_at=search_entity.updated_at,
+            project_id=search_repository.project_id,
+        )
+
+    cache = search_repository.cache
+    await search_repository.index_item(row(1, "cached content"))
+
+    first = await search_repository.search(search_text="cached")
+    hits = cache.hits
+    # another repository for the same database and project shares the cache
+    other_repository = SearchRepository(session_maker, search_repository.project_id)
+    assert await other_repository.search(search_text=" cached ") == first
+    assert cache.hits == hits + 1
+
+    await search_repository.index_item(row(2, "cached again"))
+    assert sorted(r.id for r in await search_repository.search(search_text="cached")) == [1, 2]
+
+    await search_repository.delete_by_permalink("test/cached/1")
+    assert [r.id for r in await search_repository.search(search_text="cached")] == [2]
+
+    # a search during a batch sees its uncommitted writes, so the batch invalidates on rollback
+    with pytest.raises(RuntimeError):
+        async with db.batch_session(session_maker):
+            await search_repository.index_item(row(3, "cached rolled back"))
+            assert len(await search_repository.search(search_text="cached")) == 2
+            raise RuntimeError("rollback")
+    assert [r.id for r in await search_repository.search(search_text="cached")] == [2]
+
+    stats = cache.stats()
+    assert stats.hits == cache.hits
+    assert stats.misses == cache.misses
+    assert 0 < stats.hit_rate < 1
+
+
+@pytest.mark.asyncio
+async def test_search_cursor_pagination(search_repository, search_entity):
+    """Test paging with a cursor returns the same results as paging with an offset."""
+    await search_repository.index_items(
+        [
+            SearchIndexRow(
+                id=i,
+                type=SearchItemType.OBSERVATION.value,
+                title=f"paged {i}",
+                content_stems=" ".join(["paged"] * (i % 3 + 1)),
+                content_snippet="paged",
+                permalink=f"test/paged/{i}",
+                file_path=search_entity.file_path,
+                entity_id=search_entity.id,
+                metadata={},
+                created_at=search_entity.created_at,
+                updated_at=search_entity.updated_at,
+                project_id=search_repository.project_id,
+            )
+            for i in range(8)
+        ]
+        # only matched through the trigram index, after the rows matching the token
+        + [
+            SearchIndexRow(
+                id=i,
+                type=SearchItemType.OBSERVATION.value,
+                title=f"unpaged {i}",
+                content_stems="unpaged",
+                content_snippet="unpaged",
+                permalink=f"test/unpaged/{i}",
+                file_path=search_entity.file_path,
+                entity_id=search_entity.id,
+                metadata={},
+                created_at=search_entity.created_at,
+                updated_at=search_entity.updated_at,
+                project_id=search_repository.project_id,
+            )
+            for i in range(8, 12)
+        ]
+    )
+
+    by_offset = [
+        r.id
+        for offset in range(0, 12, 3)
+        for r in await search_repository.search(search_text="paged", limit=3, offset=offset)
+    ]
+
+    by_cursor = []
+    cursor = None
+    while True:
+        page = await search_repository.search(search_text="paged", limit=3, cursor=cursor)
+        by_cursor.extend(r.id for r in page)
+        if len(page) < 3:
+            break
+        cursor = SearchCursor.decode(SearchCursor.after(page[-1]).encode())
+
+    assert sorted(by_cursor) == list(range(12))
+    assert by_cursor[8:] == [8, 9, 10, 11]
+    assert by_cursor == by_offset
+    assert await search_repository.search_count(search_text="paged") == 12
+    assert await search_repository.search_count(search_text="nothing") == 0
+
+    with pytest.raises(ValueError):
+        SearchCursor.decode("not a cursor")
+
+
+@pytest.mark.asyncio
+async def test_search_filters(search_repository, search_entity):
+    """Test type, entity type and date filters, with and without a full-text match."""
+
+    def row(id: int, type: SearchItemType, entity_type: str, created_at: datetime):
+        return SearchIndexRow(
+            id=id,
+            type=type.value,
+            title=f"filtered {id}",
+            content_stems="",
+            content_snippet="filtered",
+            permalink=f"test/filtered/{id}",
+            file_path=search_entity.file_path,
+            entity_id=search_entity.id,
+            metadata={"entity_type": entity_type},
+            created_at=created_at,
+            updated_at=created_at,
+            project_id=search_repository.project_id,
+        )
+
+    old = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    new = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    await search_repository.index_items(
+        [
+            row(1, SearchItemType.ENTITY, "note", old),
+            row(2, SearchItemType.ENTITY, "it's quoted", new),
+            row(3, SearchItemType.OBSERVATION, "note", new),
+        ]
+    )
+
+    for search_text in (None, "filtered"):
+
+        async def ids(**filters) -> List[int]:
+            results = await search_repository.search(search_text=search_text, **filters)
+            return sorted(r.id for r in results)
+
+        assert await ids(search_item_types=[SearchItemType.ENTITY]) == [1, 2]
+        assert await ids(types=["note"]) == [1, 3]
+        assert await ids(types=["it's quoted"]) == [2]
+        assert await ids(after_date=datetime(2024, 3, 1, tzinfo=timezone.utc)) == [2, 3]
+        assert await ids(search_item_types=[SearchItemType.ENTITY], types=["note"]) == [1]
+
+    # the filter row follows an entity's reindexed rows
+    await search_repository.index_entity_rows(
+        search_entity.id, [row(1, SearchItemType.ENTITY, "spec", old)]
+    )
+    assert [r.id for r in await search_repository.search(types=["spec"])] == [1]
+    assert await search_repository.search(types=["note"]) == []
+    async with db.scoped_session(search_repository.session_maker) as session:
+        result = await session.execute(text("SELECT count(*) FROM search_filter"))
+        assert result.scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_vector_search(search_repository, search_entity):
+    """Test entities are found by the cosine similarity of their embeddings."""
+    await search_repository.index_item(
+        SearchIndexRow(
+            id=search_entity.id,
+            type=SearchItemType.ENTITY.value,
+            title=search_entity.title,
+            content_stems="",
+            content_snippet="embedded content",
+            permalink=search_entity.permalink,
+            file_path=search_entity.file_path,
+            entity_id=search_entity.id,
+            metadata={"entity_type": "test"},
+            created_at=search_entity.created_at,
+            updated_at=search_entity.updated_at,
+            project_id=search_repository.project_id,
+        )
+    )
+    await search_repository.index_vectors({search_entity.id: [3.0, 4.0, 0.0]})
+
+    results = await search_repository.vector_search([0.6, 0.8, 0.0])
+    assert [r.id for r in results] == [search_entity.id]
+    assert results[0].score == pytest.approx(-1.0)
+    assert results[0].content_snippet == "embedded content"
+
+    # orthogonal, filtered out, or embedded with another length
+    assert await search_repository.vector_search([0.0, 0.0, 1.0]) == []
+    assert await search_repository.vector_search([1.0, 0.0, 0.0], types=["other"]) == []
+    assert (
+        await search_repository.vector_search(
+            [1.0, 0.0, 0.0], search_item_types=[SearchItemType.OBSERVATION]
+        )
+        == []
+    )
+    assert await search_repository.vector_search([1.0, 0.0]) == []
+
+    await search_repository.delete_by_entity_id(search_entity.id)
+    async with db.scoped_session(search_repository.session_maker) as session:
+        result = await session.execute(text("SELECT count(*) FROM search_vector"))
+        assert result.scalar() == 0
+
+
+@pytest.mark.asyncio
+async def test_search_column_weights_and_snippets(search_repository, search_entity):
+    """Test title matches outrank content matches and snippets are made when searched."""
+
+    def row(id: int, title: str, content: str) -> SearchIndexRow:
+        return SearchIndexRow(
+            id=id,
+            type=SearchItemType.OBSERVATION.value,
+            title=title,
+            content_stems="",
+            content_snippet=content,
+            permalink=f"test/weighted/{id}",
+            file_path=search_entity.file_path,
+            entity_id=search_entity.id,
+            metadata={},
+            created_at=search_entity.created_at,
+            updated_at=search_entity.updated_at,
+            project_id=search_repository.project_id,
+        )
+
+    filler = " ".join(["words"] * 100)
+    await search_repository.index_items(
+        [
+            row(1, "unrelated", f"{filler} about zeppelins {filler}"),
+            row(2, "Zeppelins", "nothing to see"),
+        ]
+    )
+
+    results = await search_repository.search(search_text="zeppelins")
+    assert [r.id for r in results] == [2, 1]
+    # only the part of the content around the match comes back
+    assert "zeppelins" in results[1].content_snippet
+    assert len(results[1].content_snippet) < len(filler)
+
+    results = await search_repository.search(search_text="zeppelins", highlight=("<b>", "</b>"))
+    assert "<b>zeppelins</b>" in results[1].content_snippet
+
+    with pytest.raises(ValueError):
+        SearchRepository(search_repository.session_maker, 1, column_weights={"bogus": 1.0})
+
+
+@pytest.mark.asyncio
+async def test_shadow_index_swap(
+    search_repository, second_project_repository, search_entity, second_entity
+):
+    """Test a shadow index is invisible until swapped in, and keeps writes made meanwhile."""
+
+    def row(repository, entity, id: int, permalink: str, content: str) -> SearchIndexRow:
+        return SearchIndexRow(
+            id=id,
+            type=SearchItemType.OBSERVATION.value,
+            title=content,
+            content_stems=content,
+            content_snippet=content,
+            permalink=permalink,
+            file_path=entity.file_path,
+            entity_id=entity.id,
+            metadata={},
+            created_at=entity.created_at,
+            updated_at=entity.updated_at,
+            project_id=repository.project_id,
+        )
+
+    await search_repository.index_item(row(search_repository, search_entity, 1, "test/1", "stale"))
+    await second_project_repository.index_item(
+        row(second_project_repository, second_entity, 2, "second/2", "other")
+    )
+
+    await search_repository.create_shadow_index(replace=True)
+    assert await search_repository.shadow_index_exists()
+    await search_repository.index_shadow_items(
+        [row(search_repository, search_entity, 1, "test/1", "rebuilt")]
+    )
+    # written while the shadow index is built
+    await search_repository.index_item(
+        row(search_repository, search_entity, 3, "test/3", "meanwhile")
+    )
+    await second_project_repository.index_item(
+        row(second_project_repository, second_entity, 4, "second/4", "other")
+    )
+
+    assert [r.id for r in await search_repository.search(search_text="stale")] == [1]
+    assert await search_repository.search(search_text="rebuilt") == []
+
+    await search_repository.swap_shadow_index()
+
+    assert not await search_repository.shadow_index_exists()
+    assert await search_repository.search(search_text="stale") == []
+    assert [r.id for r in await search_repository.search(search_text="rebuilt")] == [1]
+    assert [r.id for r in await search_repository.search(search_text="meanwhile")] == [3]
+    results = await second_project_repository.search(search_text="other")
+    assert sorted(r.id for r in results) == [2, 4]
+    # the filter table was swapped in with the index
+    results = await second_project_repository.search(search_item_types=[SearchItemType.OBSERVATION])
+    assert sorted(r.id for r in results) == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_shadow_index_replaced_by_other_project(search_repository, second_project_repository):
+    """Test replacing the shared shadow index forgets another project's interrupted reindex."""
+    assert search_repository.reindex_lock is second_project_repository.reindex_lock
+
+    checkpoint = ReindexCheckpoint(
+        last_entity_id=1,
+        total_entities=2,
+        indexed_entities=1,
+        indexed_rows=1,
+        started_at=datetime.now(timezone.utc),
+    )
+    await search_repository.create_shadow_index(replace=True)
+    await search_repository.save_reindex_checkpoint(checkpoint)
+    await second_project_repository.save_reindex_checkpoint(checkpoint)
+
+    await second_project_repository.create_shadow_index(replace=True)
+
+    assert await search_repository.get_reindex_checkpoint() is None
+    assert await second_project_repository.get_reindex_checkpoint() is not None
+
+
 @pytest.mark.asyncio
 async def test_project_isolation(
     search_repository, second_project_repository, search_entity, second_entity
@@ -175,6 +590,99 @@ async def test_project_isolation(
     assert len(results_cross2) == 0
 
 
+@pytest.mark.asyncio
+async def test_federated_search(
+    search_repository, second_project_repository, search_entity, second_entity
+):
+    """Test searching several projects in one query merges their results by score."""
+    for repository, entity, content in [
+        (search_repository, search_entity, "federated notes"),
+        (second_project_repository, second_entity, "federated federated notes"),
+    ]:
+        await repository.index_item(
+            SearchIndexRow(
+                id=entity.id,
+                type=SearchItemType.ENTITY.value,
+                title=entity.title,
+                content_stems=content,
+                content_snippet=content,
+                permalink=entity.permalink,
+                file_path=entity.file_path,
+                entity_id=entity.id,
+                metadata={"entity_type": entity.entity_type},
+                created_at=entity.created_at,
+                updated_at=entity.updated_at,
+                project_id=repository.project_id,
+            )
+        )
+    project_ids = [search_repository.project_id, second_project_repository.project_id]
+
+    results = await search_repository.search(search_text="federated", project_ids=project_ids)
+    # the second project's entity matches twice, so it ranks first
+    assert [(r.project_id, r.id) for r in results] == [
+        (second_project_repository.project_id, second_entity.id),
+        (search_repository.project_id, search_entity.id),
+    ]
+    assert results[0].score <= results[1].score
+    assert (
+        await search_repository.search_count(search_text="federated", project_ids=project_ids) == 2
+    )
+
+    # filters apply to every project
+    results = await search_repository.search(
+        search_item_types=[SearchItemType.ENTITY], project_ids=project_ids
+    )
+    assert sorted(r.id for r in results) == sorted([search_entity.id, second_entity.id])
+
+    # other projects only, and still just the repository's project by default
+    results = await search_repository.search(
+        search_text="federated", project_ids=[second_project_repository.project_id]
+    )
+    assert [r.id for r in results] == [second_entity.id]
+    results = await search_repository.search(search_text="federated")
+    assert [r.id for r in results] == [search_entity.id]
+
+
+@pytest.mark.asyncio
+async def test_search_statement_reused_per_shape(search_repository, search_entity):
+    """Test searches differing only in their values share one planned statement."""
+    shape, params = search_repository._search_filters(search_text="alpha", types=["note"])
+    other_shape, other_params = search_repository._search_filters(
+        search_text="beta", types=["person"]
+    )
+    assert shape == other_shape
+    assert (params["entity_type_0"], other_params["entity_type_0"]) == ("note", "person")
+    assert _search_statement(shape, search_repository.rank, False) is _search_statement(
+        other_shape, search_repository.rank, False
+    )
+
+    # other filters, or other ways of matching, are other shapes
+    assert search_repository._search_filters(search_text="alpha", types=["a", "b"])[0] != shape
+    assert search_repository._search_filters(search_text="alpha AND beta")[0].text == "boolean"
+    assert search_repository._search_filters(search_text="ab")[0].text == "terms"
+    assert search_repository._search_filters(permalink_match="test/*")[0].permalink_match == "glob"
+
+    # the planned statements still search by the values bound to them
+    await search_repository.index_item(
+        SearchIndexRow(
+            id=search_entity.id,
+            type=SearchItemType.ENTITY.value,
+            title=search_entity.title,
+            content_stems="planned statement",
+            content_snippet="planned statement",
+            permalink=search_entity.permalink,
+            file_path=search_entity.file_path,
+            entity_id=search_entity.id,
+            metadata={"entity_type": search_entity.entity_type},
+            created_at=search_entity.created_at,
+            updated_at=search_entity.updated_at,
+            project_id=search_repository.project_id,
+        )
+    )
+    assert len(await search_repository.search(search_text="planned", types=["test"])) == 1
+    assert await search_repository.search(search_text="planned", types=["other"]) == []
+
+
 @pytest.mark.asyncio
 async def test_delete_by_permalink(search_repository, search_entity):
     """Test deleting an item by permalink respects project isolation."""
@@ -241,6 +749,57 @@ async def test_delete_by_entity_id(search_repository, search_entity):
     assert len(results_after) == 0
 
 
+@pytest.mark.asyncio
+async def test_index_entity_rows_only_writes_changes(search_repository, search_entity):
+    """Test reindexing an entity keeps unchanged rows and rewrites only changed ones."""
+
+    def observation_row(id: int, content: str) -> SearchIndexRow:
+        return SearchIndexRow(
+            id=id,
+            type=SearchItemType.OBSERVATION.value,
+            title=f"note: {content}",
+            content_stems=content,
+            content_snippet=content,
+            permalink=f"{search_entity.permalink}/observations/note/{content}",
+            file_path=search_entity.file_path,
+            category="note",
+            entity_id=search_entity.id,
+            metadata={"tags": []},
+            created_at=search_entity.created_at,
+            updated_at=search_entity.updated_at,
+            project_id=search_repository.project_id,
+        )
+
+    async def indexed_rows():
+        result = await search_repository.execute_query(
+            text("SELECT rowid, id, permalink FROM search_index WHERE entity_id = :entity_id"),
+            {"entity_id": search_entity.id},
+        )
+        return {row.permalink.rsplit("/", 1)[-1]: (row.rowid, row.id) for row in result}
+
+    await search_repository.index_entity_rows(
+        search_entity.id,
+        [observation_row(1, "same"), observation_row(2, "renumbered"), observation_row(3, "old")],
+    )
+    before = await indexed_rows()
+
+    await search_repository.index_entity_rows(
+        search_entity.id,
+        [observation_row(1, "same"), observation_row(5, "renumbered"), observation_row(6, "new")],
+    )
+    after = await indexed_rows()
+
+    assert set(after) == {"same", "renumbered", "new"}
+    # unchanged row is untouched
+    assert after["same"] == before["same"]
+    # row with unchanged content keeps its rowid, with the id updated in place
+    assert after["renumbered"] == (before["renumbered"][0], 5)
+    # changed content replaces the row
+    assert after["new"][1] == 6
+    results = await search_repository.search(search_text="old")
+    assert results == []
+
+
 @pytest.mark.asyncio
 async def test_to_insert_includes_project_id(search_repository):
     """Test that the to_insert method includes project_id."""
@@ -126,6 +126,62 @@ async def test_find_connected_timeframe(
     assert len(entity_ids) == 0  # No accessible entities within timeframe
 
 
+@pytest.mark.asyncio
+async def test_find_related_graph_matches_query(
+    test_graph, search_repository, entity_repository, observation_repository
+):
+    """Test walking the relation graph finds the rows the per-level queries find."""
+    type_id_pairs = [("entity", test_graph["root"].id)]
+    since = datetime.now(UTC) - timedelta(days=1)
+
+    for fan_out in (1, None):
+        graph_service, query_service = [
+            ContextService(
+                search_repository,
+                entity_repository,
+                observation_repository,
+                relation_graph=relation_graph,
+                fan_out=fan_out,
+            )
+            for relation_graph in (True, False)
+        ]
+        for depth in (1, 2, 3):
+            for max_results in (1, 3, 100):
+                for after in (None, since):
+                    kwargs = dict(max_depth=depth, since=after, max_results=max_results)
+                    found = await graph_service.find_related(type_id_pairs, **kwargs)
+                    queried = await query_service.find_related(type_id_pairs, **kwargs)
+                    assert found == queried
+                    assert 0 < len(found) <= max_results
+
+
+@pytest.mark.asyncio
+async def test_find_related_fan_out(
+    test_graph, search_repository, entity_repository, observation_repository
+):
+    """Test only fan_out relations are followed from each entity, the lowest ids first."""
+    # linked from Root and to Connected Entity 2
+    connected = test_graph["connected1"]
+    relations = sorted(
+        r.id for r in test_graph["relations"] if connected.id in (r.from_id, r.to_id)
+    )
+    assert len(relations) > 1
+
+    for relation_graph in (True, False):
+        context_service = ContextService(
+            search_repository,
+            entity_repository,
+            observation_repository,
+            relation_graph=relation_graph,
+            fan_out=1,
+        )
+        results = await context_service.find_related(
+            [("entity", connected.id)], max_depth=1, max_results=100
+        )
+        assert [(r.type, r.id) for r in results if r.depth == 1] == [("relation", relations[0])]
+        assert len([r for r in results if r.type == "entity"]) == 1
+
+
 @pytest.mark.asyncio
 async def test_build_context(context_service, test_graph):
     """Test exact permalink lookup."""
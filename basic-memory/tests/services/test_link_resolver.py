@@ -220,3 +220,45 @@ async def test_folder_title_pattern_with_md_extension(link_resolver, test_entiti
     entity = await link_resolver.resolve_link("components/core-service")
     assert entity is not None
     assert entity.permalink == "components/core-service"
+
+
+@pytest.mark.asyncio
+async def test_resolve_links_matches_resolve_link(link_resolver, test_entities):
+    """Test resolving links in bulk gives the same entities as resolving them one at a time."""
+    link_texts = [
+        "components/core-service",
+        "Core Service",
+        "[[Service Config|config]]",
+        "Image.png",
+        "components/Core Service.md",
+        "specs/subspec/Sub Features 1",
+        "Auth Serv",
+        "New Feature",
+        "NonExistent",
+    ]
+
+    resolved = await link_resolver.resolve_links(link_texts + ["Core Service"])
+
+    for link_text in link_texts:
+        entity = await link_resolver.resolve_link(link_text)
+        if entity is None:
+            assert link_text not in resolved
+        else:
+            assert resolved[link_text].id == entity.id
+            assert resolved[link_text].title == entity.title
+
+
+@pytest.mark.asyncio
+async def test_resolve_links_searches_once(link_resolver, test_entities, monkeypatch):
+    """Test links without an exact match are searched together, not one search each."""
+
+    async def search(*args, **kwargs):
+        raise AssertionError("searched per link")
+
+    monkeypatch.setattr(link_resolver.search_service, "search", search)
+    dangling = [f"Missing Note {i}" for i in range(20)]
+
+    resolved = await link_resolver.resolve_links(dangling + ["Auth Serv", "Core Service"])
+
+    assert set(resolved) == {"Auth Serv", "Core Service"}
+    assert resolved["Core Service"].permalink == "components/core-service"
@@ -123,15 +123,22 @@ async def test_get_system_status(project_service: ProjectService):
 
 
 @pytest.mark.asyncio
-async def test_get_statistics(project_service: ProjectService, test_graph):
+async def test_get_statistics(project_service: ProjectService, test_graph, test_project):
     """Test getting statistics."""
     # Get statistics
-    statistics = await project_service.get_statistics()
+    statistics = await project_service.get_statistics(test_project.id)
 
     # Assert it returns a valid ProjectStatistics object
     assert isinstance(statistics, ProjectStatistics)
     assert statistics.total_entities > 0
     assert "test" in statistics.entity_types
+    assert statistics.most_connected_entities
+
+    # Link statistics only count the given project
+    other = await project_service.get_statistics(test_project.id + 1)
+    assert other.most_connected_entities == []
+    assert other.isolated_entities == 0
+    assert other.total_unresolved_relations == 0
 
 
 @pytest.mark.asyncio
@@ -147,10 +154,10 @@ async def test_get_activity_metrics(project_service: ProjectService, test_graph)
 
 
 @pytest.mark.asyncio
-async def test_get_project_info(project_service: ProjectService, test_graph):
+async def test_get_project_info(project_service: ProjectService, test_graph, test_project):
     """Test getting full project info."""
     # Get project info
-    info = await project_service.get_project_info()
+    info = await project_service.get_project_info(test_project.id)
 
     # Assert it returns a valid ProjectInfoResponse object
     assert isinstance(info, ProjectInfoResponse)
@@ -6,7 +6,10 @@ import pytest
 from sqlalchemy import text
 
 from nova_memory import db
-from nova_memory.schemas.search import SearchQuery, SearchItemType
+from nova_memory.repository.search_repository import SearchCursor, SearchIndexRow
+from nova_memory.schemas.search import SearchQuery, SearchItemType, SearchRetrieval
+from nova_memory.services import search_service as search_service_module
+from nova_memory.services.embedding import HashingEmbedding
 
 
 @pytest.mark.asyncio
@@ -273,6 +276,121 @@ async def test_update_index(search_service, full_entity):
     assert len(results) > 1
 
 
+@pytest.mark.asyncio
+async def test_reindex_all_resumes_after_interruption(search_service, test_graph, monkeypatch):
+    """Test an interrupted reindex resumes after the last page it committed."""
+    monkeypatch.setattr(search_service_module, "REINDEX_BATCH_SIZE", 2)
+    entity_count = len(await search_service.entity_repository.find_all())
+    assert entity_count > 4
+
+    index_shadow_items = search_service.repository.index_shadow_items
+    pages = []
+
+    async def interrupted_index_shadow_items(rows):
+        pages.append(rows)
+        if len(pages) == 2:
+            raise RuntimeError("interrupted")
+        await index_shadow_items(rows)
+
+    monkeypatch.setattr(
+        search_service.repository, "index_shadow_items", interrupted_index_shadow_items
+    )
+    with pytest.raises(RuntimeError):
+        await search_service.reindex_all()
+
+    # only the first page was committed
+    progress = await search_service.get_reindex_progress()
+    assert progress.indexed_entities == 2
+    assert progress.total_entities == entity_count
+
+    monkeypatch.setattr(search_service.repository, "index_shadow_items", index_shadow_items)
+    reported = []
+    await search_service.reindex_all(progress=reported.append)
+
+    assert [p.indexed_entities for p in reported] == list(range(4, entity_count, 2)) + [
+        entity_count
+    ]
+    assert all(p.rows_per_second >= 0 for p in reported)
+    assert await search_service.get_reindex_progress() is None
+
+    results = await search_service.search(
+        SearchQuery(permalink_match="test/*", entity_types=[SearchItemType.ENTITY]), limit=100
+    )
+    assert len(results) == entity_count
+
+
+@pytest.mark.asyncio
+async def test_semantic_search(search_service, test_graph, entity_repository):
+    """Test vector and hybrid search of the entities embedded as they are indexed."""
+    # without an embedding, semantic searches search the full text
+    query = SearchQuery(text="Root tech", retrieval=SearchRetrieval.HYBRID)
+    assert await search_service.search(query) == await search_service.search(
+        SearchQuery(text="Root tech")
+    )
+
+    search_service.embedding = HashingEmbedding()
+    for entity in await entity_repository.find_all():
+        await search_service.index_entity(entity)
+
+    # no note has these words, but the root note has parts of them
+    query = SearchQuery(text="rooted technology")
+    assert await search_service.search(query) == []
+    query.retrieval = SearchRetrieval.VECTOR
+    results = await search_service.search(query)
+    assert results[0].permalink == "test/root"
+    assert all(r.type == SearchItemType.ENTITY.value for r in results)
+    assert await search_service.search(query, limit=1, offset=1) == results[1:2]
+
+    # hybrid search has the full-text matches too, and ranks the root note first
+    results = await search_service.search(
+        SearchQuery(text="Root tech", retrieval=SearchRetrieval.HYBRID)
+    )
+    assert results[0].permalink == "test/root"
+    assert any(r.type == SearchItemType.OBSERVATION.value for r in results)
+
+    # their results aren't ordered by a score a cursor can follow
+    cursor = SearchCursor.after(results[0])
+    for retrieval in (SearchRetrieval.VECTOR, SearchRetrieval.HYBRID):
+        with pytest.raises(ValueError):
+            await search_service.search(
+                SearchQuery(text="Root tech", retrieval=retrieval), cursor=cursor
+            )
+
+
+def test_hashing_embedding():
+    """Test the hashing embedding is deterministic and of unit length."""
+    embedding = HashingEmbedding(dimensions=64)
+    first, second, empty = embedding(["Deploy the service", "deploy the service", "..."])
+    assert len(first) == 64
+    assert first == second
+    assert sum(value * value for value in first) == pytest.approx(1.0)
+    assert empty == [0.0] * 64
+
+    with pytest.raises(ValueError):
+        HashingEmbedding(dimensions=0)
+
+
+def test_reciprocal_rank_fusion():
+    """Test results ranked well in both rankings are fused ahead of the others."""
+
+    def row(id: int) -> SearchIndexRow:
+        return SearchIndexRow(
+            project_id=1,
+            id=id,
+            type=SearchItemType.ENTITY.value,
+            file_path=f"{id}.md",
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            score=1.0,
+        )
+
+    fused = search_service_module.reciprocal_rank_fusion(
+        [[row(1), row(2), row(3)], [row(3), row(4), row(1)]]
+    )
+    assert [r.id for r in fused] == [1, 3, 2, 4]
+    assert fused[0].score < fused[-1].score < 0
+
+
 @pytest.mark.asyncio
 async def test_boolean_and_search(search_service, test_graph):
     """Test boolean AND search."""
@@ -1,18 +1,22 @@
 """Test general sync behavior."""
 
 import asyncio
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 from textwrap import dedent
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from nova_memory import file_utils
 from nova_memory.config import ProjectConfig, NovaMemoryConfig
 from nova_memory.models import Entity
 from nova_memory.repository import EntityRepository
 from nova_memory.schemas.search import SearchQuery
 from nova_memory.services import EntityService, FileService
 from nova_memory.services.search_service import SearchService
+from nova_memory.sync import sync_service as sync_service_module
 from nova_memory.sync.sync_service import SyncService
 
 
@@ -477,6 +481,433 @@ async def test_sync_empty_directories(sync_service: SyncService, project_config:
     assert (project_config.home).exists()
 
 
+@pytest.mark.asyncio
+async def test_scan_directory_bounded_concurrency(
+    sync_service: SyncService, app_config: NovaMemoryConfig, project_config: ProjectConfig
+):
+    """Test scanning more files than the concurrency limit collects every checksum."""
+    app_config.sync_concurrency = 2
+    project_dir = project_config.home
+
+    for i in range(10):
+        await create_test_file(project_dir / f"folder{i % 3}/note{i}.md", f"content {i}")
+    await create_test_file(project_dir / ".hidden/skip.md", "hidden")
+
+    result = await sync_service.scan_directory(project_dir)
+
+    assert len(result.files) == 10
+    assert not result.errors
+    assert ".hidden/skip.md" not in result.files
+    for path, checksum in result.files.items():
+        assert checksum == await sync_service.file_service.compute_checksum(path)
+        assert result.checksums[checksum] == path
+
+
+@pytest.mark.asyncio
+async def test_sync_unreadable_file_not_deleted(
+    sync_service: SyncService, project_config: ProjectConfig, entity_repository: EntityRepository
+):
+    """Test a file that fails to scan is reported as an error, not a deletion."""
+    project_dir = project_config.home
+    await create_test_file(project_dir / "note.md", "# Note\ncontent")
+    await sync_service.sync(project_dir)
+
+    # invalid utf-8 can't be hashed as markdown text
+    (project_dir / "note.md").write_bytes(b"\xff\xfe invalid")
+
+    scan_result = await sync_service.scan_directory(project_dir)
+    assert "note.md" in scan_result.errors
+
+    report = await sync_service.sync(project_dir)
+    assert "note.md" not in report.deleted
+    assert await entity_repository.get_by_file_path("note.md")
+
+
+@pytest.mark.asyncio
+async def test_sync_records_file_stats(
+    sync_service: SyncService, project_config: ProjectConfig, entity_repository: EntityRepository
+):
+    """Test synced files record their size, mtime and inode with the checksum."""
+    project_dir = project_config.home
+    await create_test_file(project_dir / "note.md", "# Note\ncontent")
+    await create_test_file(project_dir / "image.png", "not really a png")
+
+    await sync_service.sync(project_dir)
+
+    for path in ("note.md", "image.png"):
+        entity = await entity_repository.get_by_file_path(path)
+        stat = (project_dir / path).stat()
+        assert entity.file_size == stat.st_size
+        assert entity.file_mtime_ns == stat.st_mtime_ns
+        assert entity.file_inode == stat.st_ino
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_hashing_unchanged_files(
+    sync_service: SyncService, project_config: ProjectConfig, monkeypatch
+):
+    """Test files with unchanged stat values aren't rehashed unless verify is set."""
+    project_dir = project_config.home
+    await create_test_file(project_dir / "note.md", "# Note\ncontent")
+    await sync_service.sync(project_dir)
+
+    hashed = []
+    compute_file_checksum = file_utils.compute_file_checksum
+
+    def counting_checksum(path, *args, **kwargs):
+        hashed.append(Path(path).name)
+        return compute_file_checksum(path, *args, **kwargs)
+
+    # markdown that fits in the sync buffer is hashed as it is read whole
+    read = sync_service_module.FileContent.read
+
+    def counting_read(path):
+        hashed.append(Path(path).name)
+        return read(path)
+
+    monkeypatch.setattr(file_utils, "compute_file_checksum", counting_checksum)
+    monkeypatch.setattr(sync_service_module.FileContent, "read", counting_read)
+
+    report = await sync_service.sync(project_dir)
+    assert report.total == 0
+    assert hashed == []
+
+    report = await sync_service.sync(project_dir, verify=True)
+    assert report.total == 0
+    assert hashed == ["note.md"]
+
+
+@pytest.mark.asyncio
+async def test_sync_verify_detects_change_with_same_stat(
+    sync_service: SyncService, project_config: ProjectConfig
+):
+    """Test verify mode catches edits that keep the same size and mtime."""
+    project_dir = project_config.home
+    note = project_dir / "note.md"
+    await create_test_file(note, "# Note\ncontent a")
+    await sync_service.sync(project_dir)
+
+    stat = note.stat()
+    note.write_text("# Note\ncontent b")
+    os.utime(note, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    report = await sync_service.scan(project_dir)
+    assert "note.md" not in report.modified
+
+    report = await sync_service.scan(project_dir, verify=True)
+    assert "note.md" in report.modified
+
+
+@pytest.mark.asyncio
+async def test_sync_refreshes_stale_file_stats(
+    sync_service: SyncService, project_config: ProjectConfig, entity_repository: EntityRepository
+):
+    """Test unchanged files with missing stat values get them recorded without a resync."""
+    project_dir = project_config.home
+    await create_test_file(project_dir / "note.md", "# Note\ncontent")
+    await sync_service.sync(project_dir)
+
+    entity = await entity_repository.get_by_file_path("note.md")
+    await entity_repository.update(
+        entity.id, {"file_size": None, "file_mtime_ns": None, "file_inode": None}
+    )
+
+    report = await sync_service.sync(project_dir)
+    assert report.total == 0
+    assert "note.md" in report.stat_updates
+
+    entity = await entity_repository.get_by_file_path("note.md")
+    assert entity.file_mtime_ns == (project_dir / "note.md").stat().st_mtime_ns
+
+
+@pytest.mark.asyncio
+async def test_sync_batch_single_transaction(
+    sync_service: SyncService,
+    app_config: NovaMemoryConfig,
+    project_config: ProjectConfig,
+    entity_service: EntityService,
+    monkeypatch,
+):
+    """Test a batch of files syncs in one transaction without falling back to per file sync."""
+    app_config.sync_batch_size = 10
+    project_dir = project_config.home
+
+    for name, target in (("one", "two"), ("two", "three"), ("three", "one")):
+        await create_test_file(
+            project_dir / f"{name}.md",
+            dedent(f"""
+            ---
+            type: knowledge
+            ---
+            # {name}
+
+            ## Observations
+            - [note] {name} observation
+
+            ## Relations
+            - links_to [[{target}]]
+            - links_to [[{target}]]
+            """),
+        )
+
+    async def fail_sync_file(path, new=True, markdown=None, content=None):
+        raise AssertionError(f"batch fell back to sync_file for {path}")
+
+    monkeypatch.setattr(sync_service, "sync_file", fail_sync_file)
+
+    commits = 0
+    commit = AsyncSession.commit
+
+    async def counting_commit(self):
+        nonlocal commits
+        commits += 1
+        await commit(self)
+
+    monkeypatch.setattr(AsyncSession, "commit", counting_commit)
+    await sync_service.sync_batch(
+        [("one.md", True, None, None), ("two.md", True, None, None), ("three.md", True, None, None)]
+    )
+    assert commits == 1
+    monkeypatch.undo()
+
+    await sync_service.resolve_relations()
+    for name in ("one", "two", "three"):
+        entity = await entity_service.get_by_permalink(name)
+        assert entity.checksum is not None
+        assert len(entity.observations) == 1
+        assert len(entity.outgoing_relations) == 1
+        assert entity.outgoing_relations[0].to_id is not None
+
+
+@pytest.mark.asyncio
+async def test_sync_batch_falls_back_on_error(
+    sync_service: SyncService,
+    app_config: NovaMemoryConfig,
+    project_config: ProjectConfig,
+    entity_repository: EntityRepository,
+    monkeypatch,
+):
+    """Test a failing file rolls back its batch and the other files sync individually."""
+    app_config.sync_batch_size = 10
+    project_dir = project_config.home
+    await create_test_file(project_dir / "good.md", "# Good\ncontent")
+    await create_test_file(project_dir / "bad.md", "# Bad\ncontent")
+
+    sync_markdown_file = sync_service.sync_markdown_file
+
+    async def failing_sync_markdown_file(path, new=True, markdown=None, content=None):
+        if path == "bad.md":
+            raise ValueError("bad file")
+        return await sync_markdown_file(path, new, markdown, content)
+
+    monkeypatch.setattr(sync_service, "sync_markdown_file", failing_sync_markdown_file)
+
+    await sync_service.sync(project_dir)
+
+    assert await entity_repository.get_by_file_path("good.md")
+    assert await entity_repository.get_by_file_path("bad.md") is None
+
+
+@pytest.mark.asyncio
+async def test_sync_parses_in_worker_processes(
+    sync_service: SyncService,
+    app_config: NovaMemoryConfig,
+    project_config: ProjectConfig,
+    entity_service: EntityService,
+    monkeypatch,
+):
+    """Test markdown parsed in worker processes is synced in order with other files."""
+    monkeypatch.setattr(sync_service_module, "PARSE_POOL_MIN_FILES", 1)
+    app_config.sync_parse_workers = 2
+    app_config.sync_batch_size = 2
+    project_dir = project_config.home
+    for i in range(5):
+        await create_test_file(
+            project_dir / f"note{i}.md",
+            dedent(f"""
+            ---
+            type: knowledge
+            permalink: note{i}
+            ---
+            # Note {i}
+
+            ## Observations
+            - [note] observation {i}
+
+            ## Relations
+            - links_to [[Note {(i + 1) % 5}]]
+            """),
+        )
+    await create_test_file(project_dir / "image.png", "not really a png")
+    await create_test_file(project_dir / "broken.md", "---\ntype: [unclosed\n---\n# Broken")
+
+    sync_markdown_file = sync_service.sync_markdown_file
+    inline_parsed = []
+
+    async def counting_sync_markdown_file(path, new=True, markdown=None, content=None):
+        # content read for parsing is passed on even when parsing failed
+        assert content is not None
+        if markdown is None:
+            inline_parsed.append(path)
+        return await sync_markdown_file(path, new, markdown, content)
+
+    monkeypatch.setattr(sync_service, "sync_markdown_file", counting_sync_markdown_file)
+
+    await sync_service.sync(project_dir)
+
+    # only the file that failed in the worker is parsed again inline
+    assert set(inline_parsed) == {"broken.md"}
+    for i in range(5):
+        entity = await entity_service.get_by_permalink(f"note{i}")
+        assert len(entity.observations) == 1
+        assert entity.outgoing_relations[0].to_id is not None
+    assert await entity_service.repository.get_by_file_path("image.png")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("buffer_size", [64 * 1024 * 1024, 0])
+async def test_sync_reads_markdown_once(
+    sync_service: SyncService,
+    app_config: NovaMemoryConfig,
+    project_config: ProjectConfig,
+    entity_repository: EntityRepository,
+    monkeypatch,
+    buffer_size: int,
+):
+    """Test each markdown file is read once per sync, hashed in the scan only if not buffered."""
+    app_config.sync_buffer_size = buffer_size
+    project_dir = project_config.home
+    for i in range(3):
+        await create_test_file(
+            project_dir / f"note{i}.md",
+            f"---\ntype: note\npermalink: note{i}\n---\n# Note {i}\n- links_to [[Note 0]]",
+        )
+    await create_test_file(project_dir / "plain.md", "# Plain\nno frontmatter")
+
+    reads = []
+    read = sync_service_module.FileContent.read
+
+    def counting_read(path):
+        reads.append(Path(path).name)
+        return read(path)
+
+    hashed = []
+    compute_file_checksum = file_utils.compute_file_checksum
+
+    def counting_compute_file_checksum(path, *args, **kwargs):
+        hashed.append(Path(path).name)
+        return compute_file_checksum(path, *args, **kwargs)
+
+    monkeypatch.setattr(sync_service_module.FileContent, "read", counting_read)
+    monkeypatch.setattr(file_utils, "compute_file_checksum", counting_compute_file_checksum)
+
+    await sync_service.sync(project_dir)
+
+    names = ["note0.md", "note1.md", "note2.md", "plain.md"]
+    assert sorted(reads) == names
+    assert sorted(hashed) == ([] if buffer_size else names)
+    for name in names:
+        entity = await entity_repository.get_by_file_path(name)
+        content = (project_dir / name).read_text(encoding="utf-8")
+        assert entity.checksum == await file_utils.compute_checksum(content)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_size", [10, 1])
+async def test_sync_indexes_parsed_content(
+    sync_service: SyncService,
+    app_config: NovaMemoryConfig,
+    project_config: ProjectConfig,
+    search_service: SearchService,
+    monkeypatch,
+    batch_size: int,
+):
+    """Test synced markdown is indexed from its parsed content, without reading it again."""
+    app_config.sync_batch_size = batch_size
+    project_dir = project_config.home
+    await create_test_file(project_dir / "new.md", "# New\nfirst zeppelin")
+
+    async def failing_read_entity_content(entity):
+        raise AssertionError(f"{entity.file_path} read again for the search index")
+
+    monkeypatch.setattr(
+        search_service.file_service, "read_entity_content", failing_read_entity_content
+    )
+
+    await sync_service.sync(project_dir)
+    results = await search_service.search(SearchQuery(text="zeppelin"))
+    assert [r.file_path for r in results] == ["new.md"]
+
+    await create_test_file(project_dir / "new.md", "# New\nsecond airship")
+    await sync_service.sync(project_dir, verify=True)
+    assert await search_service.search(SearchQuery(text="zeppelin")) == []
+    results = await search_service.search(SearchQuery(text="airship"))
+    assert [r.file_path for r in results] == ["new.md"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_relations_reindexes_each_source_once(
+    sync_service: SyncService,
+    project_config: ProjectConfig,
+    entity_service: EntityService,
+    search_service: SearchService,
+    monkeypatch,
+):
+    """Test resolving many forward references reindexes each source entity once."""
+    project_dir = project_config.home
+    targets = {"one": "Alpha Target", "two": "Beta Target"}
+    for name, target in targets.items():
+        await create_test_file(
+            project_dir / f"{name}.md",
+            dedent(f"""
+            ---
+            type: knowledge
+            permalink: {name}
+            ---
+            # {name}
+
+            ## Relations
+            - links_to [[{target}]]
+            - depends_on [[{target}]]
+            """),
+        )
+    await sync_service.sync(project_dir)
+    for target in targets.values():
+        await create_test_file(project_dir / f"{target}.md", f"# {target}\ncontent")
+
+    indexed = []
+    index_entity = search_service.index_entity
+
+    index_entities = search_service.index_entities
+
+    async def counting_index_entity(entity, background_tasks=None, content=None):
+        indexed.append(entity.file_path)
+        await index_entity(entity, background_tasks, content)
+
+    async def counting_index_entities(entities, contents=None):
+        indexed.extend(entity.file_path for entity in entities)
+        await index_entities(entities, contents)
+
+    monkeypatch.setattr(search_service, "index_entity", counting_index_entity)
+    monkeypatch.setattr(search_service, "index_entities", counting_index_entities)
+    await sync_service.sync(project_dir)
+
+    # targets are indexed when synced, each source once when its references resolve
+    assert sorted(indexed) == ["Alpha Target.md", "Beta Target.md", "one.md", "two.md"]
+
+    for name, target in targets.items():
+        target_entity = await entity_service.repository.get_by_file_path(f"{target}.md")
+        entity = await entity_service.get_by_permalink(name)
+        assert {(r.relation_type, r.to_id) for r in entity.outgoing_relations} == {
+            ("links_to", target_entity.id),
+            ("depends_on", target_entity.id),
+        }
+
+        # relation rows in the search index now point at the target
+        results = await search_service.search(SearchQuery(permalink_match=f"{name}/depends-on/*"))
+        assert [result.to_id for result in results] == [target_entity.id]
+
+
 @pytest.mark.asyncio
 async def test_sync_file_modified_during_sync(
     sync_service: SyncService, project_config: ProjectConfig
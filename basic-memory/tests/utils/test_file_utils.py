@@ -9,6 +9,7 @@ from nova_memory.file_utils import (
     FileWriteError,
     ParseError,
     compute_checksum,
+    compute_file_checksum,
     ensure_directory,
     has_frontmatter,
     parse_frontmatter,
@@ -35,6 +36,28 @@ async def test_compute_checksum_error():
         await compute_checksum(object())  # pyright: ignore [reportArgumentType]
 
 
+@pytest.mark.asyncio
+async def test_compute_file_checksum(tmp_path: Path):
+    """Test chunked file checksums match in-memory checksums."""
+    test_file = tmp_path / "test.md"
+    test_file.write_bytes(b"line one\r\nline two\n" * 1000)
+
+    # text mode matches hashing read_text(), including newline translation
+    text_checksum = compute_file_checksum(test_file, text=True, chunk_size=7)
+    assert text_checksum == await compute_checksum(test_file.read_text(encoding="utf-8"))
+
+    # binary mode matches hashing the raw bytes
+    bytes_checksum = compute_file_checksum(test_file, chunk_size=7)
+    assert bytes_checksum == await compute_checksum(test_file.read_bytes())
+    assert bytes_checksum != text_checksum
+
+
+def test_compute_file_checksum_error(tmp_path: Path):
+    """Test chunked checksum error handling."""
+    with pytest.raises(FileError):
+        compute_file_checksum(tmp_path / "missing.md")
+
+
 @pytest.mark.asyncio
 async def test_ensure_directory(tmp_path: Path):
     """Test directory creation."""